@@ -11,30 +11,25 @@ Output:
     - "kluge_lex0.xml" : section "L" annotated according to TEI Lex-0
     - "literature.xml", "periodicals.xml", "terminology.xml": tagged chapters necessary to link information
     - CSV-files as interstage products: "pos_tofill.csv", "usg_tofill.csv", "languages.csv", "languages_cap.csv", "term.csv"
+
+The stages and their inputs and outputs are listed in S_28_stages.py; a stage module is imported when the stage is run.
+Usage: python S_00_run_kluge2lex0.py [--from S_08] [--to S_12] [--config file.json] [--list] [--profile]
+    --from, --to: run only the stages of this range (the TEI string is passed on by "kluge_markup.xml", see 'markup_file')
+    --config: JSON file with parameters of this script (e.g. {"section": "K", "lexis_csv": "data/lexis.csv"})
 '''
 # === Imports ===
 
-import S_01_helpers
-import S_03_kluge2validtei
-import S_04_create_csv_pos_lexis
-import S_05_mark_entry_head
-import S_06_mark_bibl
-import S_07_mark_lang
-import S_08_mark_etym
-import S_09_mark_translation_addition
-import S_10_mark_term_chapter
-import S_11_mark_term
-import S_12_finish_markup
-import S_13_mark_literature_list
-import S_14_mark_periodicals_list
-import S_15_add_attributes
-import S_16_sort_attributes
+import os
+import S_20_stage_cache
+import S_28_stages
+import S_29_artifacts
 
 
 # === Parameters ===
 
-htmlfile = "kluge_L.html"
-headerfile = "header_L.txt"
+section = "L"
+htmlfile = "kluge_" + section + ".html"
+headerfile = "header_" + section + ".txt"
 
 # --- lexis/style ---
 lexis_file = "lexis.txt"
@@ -54,33 +49,107 @@ term_file = "terminology.txt"
 term_header = "header_terminology.txt"
 reg_file = "register.txt"
 
+# --- OCR correction (script 02, only run if the range starts with S_02) ---
+fr_html_file = "kluge_L_FR_output.html"
+fr_corrected_file = "Kluge_L_FR_postprocessed.html"
+
 # --- literature and periodicals ---
 literature_file = "literature.txt"
 literature_header = "header_literature.txt"
 literature_xml = "literature.xml"
+literature_index = "literature_index.pickle"    # index of the list for script 15, named after 'literature_xml' (see S_25.index_file())
 periodicals_file = "periodicals.txt"
 periodicals_header = "header_periodicals.txt"
 periodicals_xml = "periodicals.xml"
+periodicals_index = "periodicals_index.pickle"
+
+# --- output ---
+output_file = "kluge_lex0.xml"
+
+# --- parallel markup of scripts 05-12 (see S_17) ---
+parallel = False
+workers = None      # number of processes; None: number of CPUs
+chunksize = 4       # number of entries handed to a process at once
+
+# --- streaming mode of scripts 15 and 16: the entries are enriched and written one at a time (see S_15.stream_main()) ---
+stream = False
+markup_file = "kluge_markup.xml"    # output of script 12, read by script 15 (and the TEI string between partial runs)
+
+# --- concurrent stages: scripts 04, 10, 13 and 14 run in a pool of processes beside scripts 03-12 (see S_28.run_concurrent()) ---
+concurrent = True
+stage_workers = None    # number of processes; None: number of CPUs (with 1 the stages are run one after the other)
+
+# --- artifacts passed between the stages (languages.csv, term.csv, literature.xml, ...; see S_29) ---
+persist = True      # write them into files in the background; False: in memory only (used only without cache and without concurrent stages)
+
+# --- checkpoint cache of the stages (see S_20) ---
+cache = True
+S_20_stage_cache.cache_dir = "stage_cache"
+
+
+# === Functions ===
+
+def stage(function, args, reads=(), writes=(), key_args=None):
+    '''Runs a stage, with the checkpoint cache if 'cache' is set (see S_20 for the arguments).'''
+
+    if cache:
+        return S_20_stage_cache.run(function, args, reads, writes, key_args)
+    return function(*args)
+
+
+def parameters():
+    '''Returns the parameters of this script used by the stages (see S_28).'''
+
+    return {name: globals()[name] for name in S_28_stages.parameters}
+
+
+def configure(file):
+    '''
+    Sets the parameters of this script from a configuration file (see S_28.read_config()).
+    'htmlfile' and 'headerfile' follow a changed 'section' unless they are set as well.
+    '''
+
+    config = S_28_stages.read_config(file)
+    if 'section' in config:
+        config.setdefault('htmlfile', "kluge_" + config['section'] + ".html")
+        config.setdefault('headerfile', "header_" + config['section'] + ".txt")
+    globals().update(config)
 
 
 # === Coordinating function ===
 
-def main():
-    tei = S_03_kluge2validtei.main(htmlfile, headerfile)
-    S_04_create_csv_pos_lexis.main(lexis_file, pos_file)
-    tei = S_05_mark_entry_head.main(tei, lexis_csv, pos_csv)
-    tei = S_06_mark_bibl.main(tei)
-    tei = S_07_mark_lang.main(tei, lang_file)
-    tei = S_08_mark_etym.main(tei, pos_csv)
-    tei = S_09_mark_translation_addition.main(tei)
-    S_10_mark_term_chapter.main(term_file, term_header, reg_file)
-    tei = S_11_mark_term.main(tei, reg_file)
-    tei = S_12_finish_markup.main(tei)
-    S_13_mark_literature_list.main(literature_file, literature_header)
-    S_14_mark_periodicals_list.main(periodicals_file, periodicals_header)
-    tei = S_15_add_attributes.main(tei, periodicals_xml, literature_xml, lang_csv, lang_cap_csv)
-    tei = S_16_sort_attributes.main(tei)
-    S_01_helpers.save_file(tei, "kluge_lex0.xml")
+def main(first=None, last=None):
+    stages = S_28_stages.select(first, last, parallel, stream)
+    pool = concurrent and (stage_workers or os.cpu_count()) > 1
+    # the checkpoint cache and the processes of the pool read the files
+    S_29_artifacts.persist = persist or cache or pool
+    if pool:
+        S_28_stages.run_concurrent(stages, parameters(), stage, stage_workers)
+    else:
+        S_28_stages.run(stages, parameters(), stage)
     
 
-main()
\ No newline at end of file
+# the guard is required by the process pool of S_17
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Converts section L of Kluge into TEI Lex-0.")
+    parser.add_argument("--from", dest="first", help="first stage (default: " + S_28_stages.first_stage + ")")
+    parser.add_argument("--to", dest="last", help="last stage (default: " + S_28_stages.last_stage + ")")
+    parser.add_argument("--config", help="JSON file with parameters of this script")
+    parser.add_argument("--list", action="store_true", help="print the stages of the range with their inputs and outputs")
+    parser.add_argument("--profile", action="store_true", help="measure every function of scripts 01-17 (see S_21), the checkpoint cache is not used")
+    arguments = parser.parse_args()
+    if arguments.config:
+        configure(arguments.config)
+    if arguments.list:
+        stages = S_28_stages.select(arguments.first, arguments.last, parallel, stream)
+        print(S_28_stages.describe(stages, S_28_stages.dependencies(stages, parameters())))
+    elif arguments.profile:
+        import importlib
+        import S_21_profiler
+        cache = False
+        concurrent = False
+        modules = ["S_01_helpers"] + [stage.module for stage in S_28_stages.registry[1:]] + ["S_17_parallel_markup"]
+        S_21_profiler.profile(lambda: main(arguments.first, arguments.last), [importlib.import_module(module) for module in modules])
+    else:
+        main(arguments.first, arguments.last)
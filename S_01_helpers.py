@@ -5,45 +5,61 @@ This script contains functions that are called multiple times during the markup
 
 Used packages:
     re (see: https://docs.python.org/3/library/re.html)
-    pandas (see: https://pandas.pydata.org/pandas-docs/stable/)
     ElementTree XML (see: https://docs.python.org/2/library/xml.etree.elementtree.html)
 '''
 
 # === Imports ===
 
 import re
-import pandas as pd
+import collections
 import xml.etree.ElementTree as ET
+import S_18_rule_engine as engine
+import S_19_lexicon as lexicon
+import S_29_artifacts as artifacts
+
+# === Parameters ===
+
+tei_namespace = '{http://www.tei-c.org/ns/1.0}'
 
 # === Functions ===
 
 # --- Reading and Parsing ---
 
 def read_file(file):
-    '''Reads file (TXT, HTML, XML) and returns string.'''
+    '''Reads file (TXT, HTML, XML) and returns string (taken from the store if a stage has put the file there, see S_29).'''
     
+    if file in artifacts.store:
+        return artifacts.store[file]
     with open(file, "r", encoding="utf8") as infile: 
         str = infile.read()
         return str
     
     
-def read_csv(csvfile, index):
+
+def split_list(txt, separator=" = "):
     '''
-    Reads CSV file and returns dataframe with \t as delimiter.
-    'index' specifies which column is set as index.
+    Splits the lines of a list (e.g. "abbreviation = expansion") in one pass and returns the columns as two lists:
+    the text in front of the first separator and the text between the first and the second separator.
     '''
-    data = pd.read_csv(csvfile, delimiter="\t")
-    data = data.set_index(index)
-    return data
+    rows = [line.split(separator) for line in txt.split("\n")]
+    return [row[0] for row in rows], [row[1] for row in rows]
+
+
+def strip_namespace(element):
+    '''Removes the TEI namespace from the tag of the element.'''
+
+    if element.tag[:len(tei_namespace)] == tei_namespace:
+        element.tag = element.tag[len(tei_namespace):]
 
 
 def parse_xml(xml):
     '''Parses string (in XML-structure) into ElementTree object. Returns the root of the XML tree.
-       The namespace declaration in the root element is deleted temporarily for reasons of easier handling.
+       The TEI namespace is removed from the tags for reasons of easier handling (S_16 declares it again when writing).
     '''
     
-    xml = xml.replace('<TEI xmlns="http://www.tei-c.org/ns/1.0">', '<TEI>')  
     root = ET.fromstring(xml)
+    for element in root.iter():
+        strip_namespace(element)
     return root
 
 
@@ -65,10 +81,16 @@ def save_file(string, name):
 
 # --- Working with XML ---
 
+
+change_brackets_rules = engine.compile_rules('S_01', 'change_brackets', [
+    (r'(\s)>(\w+)<(\s|[.,])', r'\1»\2«\3'),
+])
+
+
 def change_brackets(txt):
     '''Replaces angle brackets with guillemets.'''
 
-    txt = re.sub(r'(\s)>(\w+)<(\s|[.,])', r'\1»\2«\3', txt)
+    txt = engine.apply_rules(txt, change_brackets_rules)
     return txt
 
 
@@ -85,42 +107,50 @@ def transform2xml(txt, headerfile):
 
 # --- Searching and replacing ---
 
-def replace_abbr(str, str_tagged, text, match, tei):
-    ''' This function is called in mark_abbr_usg_pos(), mark_pattern_df() and split_bibl().
-        It replaces a string with its tagging.
-        Input:
-            - str: string that has to be replaced
-            - str_tagged: tagged string
-            - match: found text passage 
-            - text: part of match containing str (and probably already replaced sections)
-            - tei: complete text string
-        Output:
-            - tei with replacement
-            - text with replacement
+def splice(tei, edits):
+    ''' Builds the new string from the untouched slices of 'tei' and the edits.
+        'edits' is a list of (start, end, replacement) sorted by position and without overlaps (e.g. collected from finditer()).
     '''
-    
-    text_replaced = text.replace(str, str_tagged)     
-    replaceStr = match[1] + text_replaced + match[3]  
-    searchStr = match[1] + text + match[3]
-    text = text_replaced  
-    tei = tei.replace(searchStr, replaceStr)
-    return tei, text
+
+    parts = []
+    pos = 0
+    for start, end, repl in edits:
+        parts.append(tei[pos:start])
+        parts.append(repl)
+        pos = end
+    parts.append(tei[pos:])
+    return ''.join(parts)
+
+
+def find_abbr(str, abbr_index):
+    ''' Returns the abbreviations that equal 'str' or 'str' without a following comma, in the order of the abbreviation list.
+        'abbr_index' maps the abbreviations to their position in the list.
+    '''
+
+    found = {abbr for abbr in (str, str[:-1]) if abbr in abbr_index and (abbr == str or abbr + "," == str)}
+    return sorted(found, key=abbr_index.get)
+
+
+mark_abbr_usg_pos_rules = engine.compile_rules('S_01', 'mark_abbr_usg_pos', [
+    # case POS is separated by "/": the generated two <gramGrp>s are merged
+    (r'</gramGrp>(\s+/)<gramGrp>', r'\1'),
+])
 
 
 def mark_abbr_usg_pos(pattern, csv_wortschatz, csv_wortarten, tei):
     '''
     Searches for pattern in the passed string ('tei') and taggs grammatical and lexical/stylistical information using the passed CSV files.
+    The pattern consists of three groups, only the second one is tagged.
     Returns the string ('tei') with inserted tagging.
     '''
     
-    # read CSV into dataframe
-    data_wortschatz = read_csv(csv_wortschatz, 'abbr')
-    data_wortarten = read_csv(csv_wortarten, 'abbr')
-    
-    # getting lists of abbreviations
-    abbr_list_wortschatz = data_wortschatz.index.tolist() 
-    abbr_list_wortarten = data_wortarten.index.tolist()
+    # getting taggings of the abbreviations and their position in the list (see S_19)
+    tagging_wortschatz = lexicon.get_map(csv_wortschatz, 'abbr', 'tagging')
+    tagging_wortarten = lexicon.get_map(csv_wortarten, 'abbr', 'tagging')
+    index_wortschatz = lexicon.get_positions(csv_wortschatz, 'abbr')
+    index_wortarten = lexicon.get_positions(csv_wortarten, 'abbr')
     
+    edits = []
     regex = re.compile(pattern)
     for match in regex.finditer(tei):
         # text contains abbreviated grammatical and lexical/stylistical information
@@ -137,59 +167,214 @@ def mark_abbr_usg_pos(pattern, csv_wortschatz, csv_wortarten, tei):
                     strlist.append(item)
                 
         # searching for and tagging of abbreviations
+        pos_tagged = False
         for str in strlist:
-            for abbr in abbr_list_wortarten:
-                if abbr == str or abbr + "," == str:  
-                    str_tagged = str.replace(abbr, data_wortarten.loc[abbr, 'tagging'])  
-                    tei, text = replace_abbr(str, str_tagged, text, match, tei)
-                    # case POS is separated by "/": the generated two <gramGrp>s are merged
-                    tei = re.sub(r'</gramGrp>(\s+/)<gramGrp>', r'\1', tei) 
-            for abbr in abbr_list_wortschatz:
-                if abbr == str or abbr + "," == str:
-                    str_tagged = str.replace(abbr, data_wortschatz.loc[abbr, 'tagging'])  
-                    tei, text = replace_abbr(str, str_tagged, text, match, tei)
-    return tei
+            for abbr in find_abbr(str, index_wortarten):
+                text = text.replace(str, str.replace(abbr, tagging_wortarten[abbr]))
+                pos_tagged = True
+            for abbr in find_abbr(str, index_wortschatz):
+                text = text.replace(str, str.replace(abbr, tagging_wortschatz[abbr]))
+
+        if pos_tagged:
+            # case POS is separated by "/": the generated two <gramGrp>s are merged
+            text = engine.apply_rules(text, mark_abbr_usg_pos_rules)
+        if text != match[2]:
+            edits.append((match.start(2), match.end(2), text))
+
+    return splice(tei, edits)
 
 
 def mark_pattern_df(pattern, df, delim, tei):
     '''
     Searches for pattern in the passed string ('tei'), splits the found string using 'delim' as separator and taggs abbreviations using the passed dataframe.
+    'df' is a dataframe with the abbreviations as index and column 'tagging' or a dictionary abbreviation -> tagging (see S_19).
+    The pattern consists of three groups, only the second one is tagged.
     Returns the string ('tei') with inserted tagging.
     '''
  
     regex = re.compile(pattern)
-    # getting list of abbreviations  
-    abbr_list = df.index.tolist()
-          
+    # getting abbreviations and taggings
+    if isinstance(df, dict):
+        tagging = df
+    else:
+        tagging = {abbr: df.loc[abbr, 'tagging'] for abbr in df.index.tolist()}
+    
+    edits = []
     for match in regex.finditer(tei):
         text = match[2]
         strlist = text.split(delim)
         
         for str in strlist:
-            for abbr in abbr_list:
-                if abbr == str:  
-                    str_tagged = str.replace(abbr, df.loc[abbr, 'tagging'])
-                    tei, text = replace_abbr(str, str_tagged, text, match, tei)
+            if str in tagging:
+                text = text.replace(str, tagging[str])
         
-    return tei
-
+        if text != match[2]:
+            edits.append((match.start(2), match.end(2), text))
+        
+    return splice(tei, edits)
 
 
 def split_bibl(pattern, tei):
     '''
     Searches for pattern in the passed string ('tei'), separates found string using ';' as separator. Adds <bibl>-tag around splitted strings.
+    The pattern consists of three groups, only the second one is tagged.
     Returns the string ('tei') with inserted tagging.
     '''
 
+    edits = []
     regex = re.compile(pattern)
     for match in regex.finditer(tei):
         text = match[2]
         strlist = text.split(";")
         for str in strlist:
-            str_tagged = "<bibl>" + str + "</bibl>"
-            tei, text = replace_abbr(str, str_tagged, text, match, tei)
+            text = text.replace(str, "<bibl>" + str + "</bibl>")
+        edits.append((match.start(2), match.end(2), text))
             
-    return tei
+    return splice(tei, edits)
+
+
+# --- Tagging of word lists (used by S_07, S_11 and S_15) ---
+
+def trie_regex(words):
+    '''Writes a list of words as regular expression in the form of a trie.
+       Alternatives are tried longest first, i.e. the expression matches the longest word at a position.
+    '''
+
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True     # '' marks the end of a word
+
+    def node2regex(node):
+        alts = [re.escape(char) + node2regex(node[char]) for char in sorted(node) if char != '']
+        if not alts:
+            return ''
+        if len(alts) == 1 and '' not in node:
+            return alts[0]
+        regex = '(?:' + '|'.join(alts) + ')'
+        if '' in node:
+            regex += '?'
+        return regex
+
+    return node2regex(trie)
+
+
+def word_prefixes(words):
+    '''Returns a dictionary: word -> all (position, word) of the list the word starts with.
+       Used to get all words found at a position from the longest match of trie_regex().
+    '''
+
+    prefixes = {}
+    for word in words:
+        if word not in prefixes:
+            prefixes[word] = [(i, other) for i, other in enumerate(words) if word.startswith(other)]
+    return prefixes
+
+
+def select_tags(candidates):
+    '''Decides which of the found occurrences are tagged.
+       'candidates' contains tuples (rank, start of context, end of context, start, end, opening tag, closing tag),
+       the rank gives the order of the former replacements (one str.replace() per word and context).
+       An occurrence is tagged unless an earlier tag was inserted into its context or it overlaps an occurrence
+       tagged by the same replacement, i.e. the result equals replacing one word after the other.
+       Returns a list of (start, end, opening tag, closing tag) sorted by position.
+    '''
+
+    tags = []
+    inserted = set()
+    last_rank, last_end = None, -1
+    for rank, context_start, context_end, start, end, opening, closing in sorted(candidates):
+        if rank == last_rank and context_start < last_end:
+            continue
+        if any(pos in inserted for pos in range(context_start + 1, context_end)):
+            continue
+        tags.append((start, end, opening, closing))
+        inserted.add(start)
+        inserted.add(end)
+        last_rank, last_end = rank, context_end
+    return sorted(tags)
+
+
+def insert_tags(txt, tags):
+    '''Inserts the tags selected by select_tags() into the string.
+       Returns the new string and the positions of the opening tags in the new string.
+    '''
+
+    # (position, 0 = closing tag / 1 = opening tag, number of the tag); a tag may be closed where the next one is opened
+    inserts = []
+    for n, (start, end, opening, closing) in enumerate(tags):
+        inserts.append((start, 1, n))
+        if end != start:
+            inserts.append((end, 0, n))
+    inserts.sort()
+
+    parts = []
+    positions = [0] * len(tags)
+    pos = 0
+    length = 0
+    for insert, kind, n in inserts:
+        parts.append(txt[pos:insert])
+        length += insert - pos
+        start, end, opening, closing = tags[n]
+        if kind == 0:
+            tag = closing
+        else:
+            positions[n] = length
+            tag = opening + closing if end == start else opening
+        parts.append(tag)
+        length += len(tag)
+        pos = insert
+    parts.append(txt[pos:])
+
+    return ''.join(parts), positions
+
+
+def create_automaton(words):
+    '''Builds an Aho-Corasick automaton for the list of words, used by find_words().
+       Returns (goto, fail, output): transitions per state, fallback state per state, positions of the words ending in a state.
+    '''
+
+    goto, output = [{}], [[]]
+    for i, word in enumerate(words):
+        state = 0
+        for char in word:
+            if char not in goto[state]:
+                goto[state][char] = len(goto)
+                goto.append({})
+                output.append([])
+            state = goto[state][char]
+        output[state].append(i)
+
+    # breadth first: the fallback of a state is the longest proper suffix of its path that is a state as well
+    fail = [0] * len(goto)
+    queue = collections.deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for char, next in goto[state].items():
+            queue.append(next)
+            f = fail[state]
+            while f and char not in goto[f]:
+                f = fail[f]
+            fail[next] = goto[f].get(char, 0)
+            output[next] = output[next] + output[fail[next]]
+
+    return goto, fail, output
+
+
+def find_words(automaton, txt):
+    '''Returns the set of positions (in the list of create_automaton()) of all words occurring in the string, in one scan.'''
+
+    goto, fail, output = automaton
+    found = set(output[0])
+    state = 0
+    for char in txt:
+        while state and char not in goto[state]:
+            state = fail[state]
+        state = goto[state].get(char, 0)
+        found.update(output[state])
+    return found
 
 
 # --- Tagging of literature and periodicals ---
@@ -199,9 +384,14 @@ def mark_listBibl(txt):
     return txt
 
 
+mark_bibl_rules = engine.compile_rules('S_01', 'mark_bibl', [
+    (r'\n([^\n^<]+)\n', r'\n<bibl>\1</bibl>\n'),
+    (r'\n([^\n^<]+)\n', r'\n<bibl>\1</bibl>\n'),
+])
+
+
 def mark_bibl(txt):
-    txt = re.sub(r'\n([^\n^<]+)\n', r'\n<bibl>\1</bibl>\n', txt)
-    txt = re.sub(r'\n([^\n^<]+)\n', r'\n<bibl>\1</bibl>\n', txt)
+    txt = engine.apply_rules(txt, mark_bibl_rules)
     return txt
 
 
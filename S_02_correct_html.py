@@ -7,94 +7,192 @@ Systematic OCR-errors are corrected automatically.
 Input: Finereader-Output in HTML
 Output: postprocessed text in HTML
 
+The rules are compiled once (see S_18.compile_rule_set(): literal rules are applied by str.replace() or in one combined scan).
+The file is read in chunks that end behind a paragraph ('</p>'), no rule matches across the end of a paragraph,
+so the result is the same as for the whole file. With 'workers' > 1 the chunks are corrected in a pool of processes.
+The number of corrections per rule is printed at the end.
+
+Usage: python S_02_correct_html.py [input file] [output file] [--workers n]
+
 Used package:
     re (see: https://docs.python.org/3/library/re.html)
+    multiprocessing (see: https://docs.python.org/3/library/multiprocessing.html)
 '''
 
 # === Imports ===
 
-import re
-import S_01_helpers as helpers
+import argparse
+import collections
+import multiprocessing
+import S_18_rule_engine as engine
 
 # === Parameters ===
 
 html_file = "kluge_L_FR_output.html"
+output_file = "Kluge_L_FR_postprocessed.html"
+
+# number of characters read at once, a chunk ends behind the last 'boundary' read
+chunk_size = 2**20
+boundary = '</p>'
+
+# number of processes (1: in the current process)
+workers = 1
 
 # === Functions ===
 
-def correct_arrows(html):
-    '''Corrects incorrectly recognized arrows.'''
-    
+correct_arrows_rules = engine.compile_rules('S_02', 'correct_arrows', [
     # Replacing &nbsp; (no-break space) with regulare whitespace
-    html = re.sub(r'&nbsp;', r' ', html) 
-    
-    # Variants of misrecognized arrow as " / " 
-    html = re.sub(r'\/\'', r'↗', html) 
-    html = re.sub(r'\s\/', r' ↗', html)  
-    html = re.sub(r'(<span[^>]+>)/', r'\1↗', html)      
-   
+    (r'&nbsp;', r' '),
+    # Variants of misrecognized arrow as " / "
+    (r'\/\'', r'↗'),
+    (r'\s\/', r' ↗'),
+    (r'(<span[^>]+>)/', r'\1↗'),
     # Misrecognized arrow as bracket
-    html = re.sub(r'(\(|{)/', r'(↗', html) 
-    
-    # Variants of misrecognized arrow as s or S; 
-    html = re.sub(r'(\s|\()(s|S)\s(?!(mobile|</span><span class="font\d" style="font-style:italic;">mobile))', r' ↗', html) 
-    html = re.sub(r'(<span[^>]+>)(s|S)\s(?!mobile)', r'\1↗', html) 
-    html = re.sub(r'(<span class="font\d" style="font-style:italic;">)S(?![fmng])', r'\1↗', html) 
-    html = re.sub(r'(<span class="font\d" style="font-style:italic;">[^<]+)s([A-Z][^<]+</span>)', r'\1↗\2', html) 
-    html = re.sub(r'(<span class="font\d" style="font-style:italic;">[^<]*)S([A-Z]([^<]|<sup>[^<]</sup>)+</span>)', r'\1↗\2', html)  
-    
+    (r'(\(|{)/', r'(↗'),
+    # Variants of misrecognized arrow as s or S;
+    (r'(\s|\()(s|S)\s(?!(mobile|</span><span class="font\d" style="font-style:italic;">mobile))', r' ↗'),
+    (r'(<span[^>]+>)(s|S)\s(?!mobile)', r'\1↗'),
+    (r'(<span class="font\d" style="font-style:italic;">)S(?![fmng])', r'\1↗'),
+    (r'(<span class="font\d" style="font-style:italic;">[^<]+)s([A-Z][^<]+</span>)', r'\1↗\2'),
+    (r'(<span class="font\d" style="font-style:italic;">[^<]*)S([A-Z]([^<]|<sup>[^<]</sup>)+</span>)', r'\1↗\2'),
     # Misrecognized arrow as Z
-    html = re.sub(r'(<span class="font\d" style="font-style:italic;">)Z', r'\1↗', html)     
-    
+    (r'(<span class="font\d" style="font-style:italic;">)Z', r'\1↗'),
     # Deletes whitespace behind the arrow
-    html = re.sub(r'↗\s', r'↗', html)   # entfernt Leerzeichen hinter ↗
-    
+    (r'↗\s', r'↗'),   # entfernt Leerzeichen hinter ↗
+])
+
+
+def correct_arrows(html):
+    '''Corrects incorrectly recognized arrows.'''
+
+    html = engine.apply_rules(html, correct_arrows_rules)
     return html
 
 
+correct_punctuation_rules = engine.compile_rules('S_02', 'correct_punctuation', [
+    ("\'", r'‘'),
+])
+
+
 def correct_punctuation(html):
     '''Corrects quotation marks which surround meaning information.'''
-    
-    html = re.sub("\'", r'‘', html)  
+
+    html = engine.apply_rules(html, correct_punctuation_rules)
     return html
 
 
+correct_latin_rules = engine.compile_rules('S_02', 'correct_latin', [
+    (r'1(. </span><span class="font\d" style="font-style:italic;">)', r'l\1'),
+])
+
+
 def correct_latin(html):
     '''Replaces "1." with the correct language abbreviation "l." in front of Latin word forms.'''
-    
-    html = re.sub(r'1(. </span><span class="font\d" style="font-style:italic;">)', r'l\1', html)
+
+    html = engine.apply_rules(html, correct_latin_rules)
     return html
 
 
+correct_bib_rules = engine.compile_rules('S_02', 'correct_bib', [
+    ("EWN1", "EWNl"),
+    ("EWNl3", "EWNl 3"),
+    ("b;", "f.;"),
+    ("E;", "f.;"),
+    ("Í;", "f.;"),
+])
+
+
 def correct_bib(html):
     '''Corrects frequent errors in the bibliography section of the entries.'''
-    
-    html = re.sub("EWN1", "EWNl", html)
-    html = re.sub("EWNl3", "EWNl 3", html)
-    html = re.sub("b;", "f.;", html)
-    html = re.sub("E;", "f.;", html)
-    html = re.sub("Í;", "f.;", html)
+
+    html = engine.apply_rules(html, correct_bib_rules)
     return html
 
 
+correct_missingWS_rules = engine.compile_rules('S_02', 'correct_missingWS', [
+    (r'(f.\s?</span><span class="font5">\s?‘)', r' \1'),
+])
+
+
 def correct_missingWS(html):
-    '''Adds missing whitespace behind the gender specification "f." if it's printed in italics and it's followed by meaning information in a new font style.''' 
-    
-    html = re.sub(r'(f.\s?</span><span class="font5">\s?‘)', r' \1', html)
+    '''Adds missing whitespace behind the gender specification "f." if it's printed in italics and it's followed by meaning information in a new font style.'''
+
+    html = engine.apply_rules(html, correct_missingWS_rules)
+    return html
+
+
+# all rules in their order, compiled for correct()
+correction_steps = engine.compile_rule_set(correct_arrows_rules + correct_punctuation_rules + correct_latin_rules
+                                           + correct_bib_rules + correct_missingWS_rules)
+
+
+def correct(html):
+    '''Applies all corrections in their order (the same as correct_arrows(), correct_punctuation(), ... one after the other).'''
+
+    html = engine.apply_rule_set(html, correction_steps)
     return html
 
+
+def iter_chunks(file):
+    '''Yields the content of the file in chunks of about 'chunk_size' characters, each ending behind a 'boundary' (except the last one).'''
+
+    pending = ''
+    with open(file, "r", encoding="utf8") as infile:
+        for block in iter(lambda: infile.read(chunk_size), ''):
+            pending += block
+            end = pending.rfind(boundary)
+            if end >= 0:
+                end += len(boundary)
+                yield pending[:end]
+                pending = pending[end:]
+    if pending:
+        yield pending
+
+
+def correct_chunk(html):
+    '''Wrapper for the pool: returns the corrected chunk and the rule statistics of the chunk.'''
+
+    engine.reset_stats()
+    html = correct(html)
+    return html, dict(engine.stats)
+
+
+def correct_file(infile, outfile, workers=1):
+    '''Corrects the file chunk by chunk and writes the result (with 'workers' > 1 in a pool of processes; at most 2 * workers chunks are kept in memory).'''
+
+    with open(outfile, "w", encoding="utf8") as output:
+        if workers == 1:
+            for chunk in iter_chunks(infile):
+                output.write(correct(chunk))
+            return
+
+        with multiprocessing.Pool(workers) as pool:
+            pending = collections.deque()
+            for chunk in iter_chunks(infile):
+                pending.append(pool.apply_async(correct_chunk, (chunk,)))
+                if len(pending) >= 2 * workers:
+                    html, stats = pending.popleft().get()
+                    output.write(html)
+                    engine.merge_stats(stats)
+            while pending:
+                html, stats = pending.popleft().get()
+                output.write(html)
+                engine.merge_stats(stats)
+
 # === Coordinating function ===
 
-def main():
+def main(infile=html_file, outfile=output_file, workers=workers):
     print("--- 02_correct_html.py running")
-    html = helpers.read_file(html_file)
-    html = correct_arrows(html)
-    html = correct_punctuation(html)
-    html = correct_latin(html)
-    html = correct_bib(html)
-    html = correct_missingWS(html)
-    helpers.save_file(html, "Kluge_L_FR_postprocessed.html")
+    correct_file(infile, outfile, workers)
+    engine.print_stats(stage='S_02')
     print("... done!")
-    
 
-main()
\ No newline at end of file
+
+# the guard is required by the process pool
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Corrects systematic OCR errors of the Finereader output.")
+    parser.add_argument("infile", nargs="?", default=html_file)
+    parser.add_argument("outfile", nargs="?", default=output_file)
+    parser.add_argument("--workers", type=int, default=workers, help="number of processes")
+    arguments = parser.parse_args()
+    main(arguments.infile, arguments.outfile, arguments.workers)
@@ -5,6 +5,12 @@ Script for turning the postprocessed Finereader-output in HTML into valid XML-TE
 Input: postprocessed Finereader-output in HTML
 Output: XML-TEI
 
+The HTML is read in chunks that end behind a tag (iter_chunks()), iter_tei() renames the tags,
+deletes the whitespace between elements and yields the XML-TEI one paragraph at a time.
+While iter_tei() runs, only one chunk of the HTML is kept in memory, not the whole HTML and its intermediate copies.
+main() still joins the paragraphs and returns the XML-TEI as one string (scripts 05-12 work on the whole string),
+so the memory of the pipeline is not reduced: the whole document exists once, without the copies of the HTML.
+
 Used package:
     re (see: https://docs.python.org/3/library/re.html)
 '''
@@ -14,22 +20,16 @@ Used package:
 import re
 import S_01_helpers as helpers
 
-# === Functions ===
+# === Parameters ===
 
-def get_body(html):
-    ''' Deletes the <html>-tag and <head>-element and returns the <body> as string.'''
+# number of characters read at once
+chunk_size = 2**16
 
-    string = str(html)
-    body = re.sub(r'<!DOCTYPE(.*?)</head>', r'', string, 0, re.DOTALL)
-    body = re.sub(r'</html>', r'', body)
-    
-    return body
+bom = '﻿'
+whitespace_pattern = re.compile(r'(?<=>)\s+(?=<)')
+head_pattern = re.compile(r'<!DOCTYPE(.*?)</head>', re.DOTALL)
 
-def add_text_element(body):
-    '''Adds <text>-tags.'''
-    
-    text = "<text>" + body + "</text>\n</TEI>"
-    return text
+# === Functions ===
 
 def rename_elements(text):
     '''Renames the HTML-tags into corresponding XML-TEI-tags:
@@ -45,33 +45,68 @@ def rename_elements(text):
     
     return text
 
-    
-def merge(text, headerfile):
-    '''Merges TEI-Header (passed by headerfile) and text.'''
-    
-    header = helpers.read_file(headerfile)
-    xmltei = header + text
-    
-    return xmltei
-
 
 def undo_pretty_printing(xmltei):
     '''Deletes whitespace between elements.'''
-    xmltei = xmltei.replace(r'﻿', r'')  
-    xmltei = re.sub(r'(?<=>)\s+(?=<)', r'', xmltei)   
+    xmltei = xmltei.replace(bom, r'')  
+    xmltei = whitespace_pattern.sub(r'', xmltei)   
     return xmltei
 
 
+def iter_chunks(htmlfile):
+    '''
+    Reads the file in blocks of 'chunk_size' characters and yields the HTML in chunks ending behind a '>' (no tag is cut).
+    The HTML from <!DOCTYPE to </head> and the </html>-tag are left out (the chunk ends in front of a <!DOCTYPE until its </head> is read).
+    '''
+
+    pending = ''
+    with open(htmlfile, "r", encoding="utf8") as infile:
+        for block in iter(lambda: infile.read(chunk_size), ''):
+            pending += block
+            pending = head_pattern.sub(r'', pending)
+            pending = pending.replace(r'</html>', r'')
+            limit = pending.find('<!DOCTYPE')
+            end = pending.rfind('>', 0, len(pending) if limit < 0 else limit) + 1
+            if end:
+                yield pending[:end]
+                pending = pending[end:]
+    if pending:
+        yield pending
+
+
+def iter_tei(htmlfile, headerfile):
+    '''
+    Yields the XML-TEI in pieces: TEI-Header (passed by headerfile) with the first paragraph, the following paragraphs one at a time,
+    the end of the document. The joined pieces are the XML-TEI:
+        - the HTML from <!DOCTYPE to </head> and the </html>-tag are left out, <text>-tags are added,
+        - the HTML-tags are renamed (see rename_elements()),
+        - whitespace between elements is deleted (see undo_pretty_printing()).
+    The chunks are converted one after the other; the whitespace between two chunks is deleted as well,
+    because the character in front of a chunk is passed to the rule. The same holds for the end of the document
+    (the character in front of the last paragraph, e.g. '>' of '</p>' in front of trailing whitespace).
+    '''
+
+    paragraph = undo_pretty_printing(helpers.read_file(headerfile) + '<text>')
+    last = paragraph[-1:]
+    # character in front of 'paragraph' (none for the header)
+    before = ''
+    for chunk in iter_chunks(htmlfile):
+        chunk = undo_pretty_printing(last + rename_elements(chunk))[len(last):]
+        last = chunk[-1:] or last
+        paragraphs = (paragraph + chunk).split('</p>')
+        for paragraph in paragraphs[:-1]:
+            yield paragraph + '</p>'
+            before = '>'
+        paragraph = paragraphs[-1]
+    yield undo_pretty_printing(before + paragraph + '</text>\n</TEI>')[len(before):]
+
+
 # === Coordinating function ===
     
 def main(htmlfile, headerfile):
+    '''Returns the XML-TEI as one string (the joined pieces of iter_tei()).'''
     print("--- 03_kluge2validtei.py running")
-    html = helpers.read_file(htmlfile)
-    body = get_body(html)
-    text = add_text_element(body)
-    text = rename_elements(text)
-    xmltei = merge(text, headerfile)
-    xmltei = undo_pretty_printing(xmltei)
+    xmltei = ''.join(iter_tei(htmlfile, headerfile))
     #helpers.save_file(xmltei, "kluge_L.xml")
     print("... done!")
     return xmltei
@@ -10,52 +10,46 @@ Output: CSV file with columns: 'abbr' (abbreviation), 'expand' (expansion), 'usg
 
 Used packages:
     re (see: https://docs.python.org/3/library/re.html)
-    pandas (see: https://pandas.pydata.org/pandas-docs/stable/)
 '''
 
 # === Imports ===
 
 import re
-import pandas as pd
 import S_01_helpers as helpers
+import S_27_tsv as tsv
 
 
 # === Functions ===
 
+# templates of column 'tagging': (opening tag in front of expansion, tag between expansion and abbreviation, closing tag)
+tagging_templates = {
+    "lexic": ('<usg type="placeholder" expand="', '">', '</usg>'),
+    "pos": ('<gramGrp><gram type="placeholder" expand="', '">', '</gram></gramGrp>'),
+}
+
+
 def create_dataframe(text, key):
-    ''' Takes list of abbreviations as TXT file and writes information into a dataframe.
-        Depending on the key ('lexic' or 'pos') the dataframe contains an additional column 'usg' and column 'tagging' is filled with a different string.'''
-    
-    if key == "lexic":
-        dataframe = pd.DataFrame(columns=['abbr', 'expand', 'usg', 'tagging'])
-    if key == "pos":
-        dataframe = pd.DataFrame(columns=['abbr', 'expand', 'tagging'])
+    ''' Takes list of abbreviations as TXT file and writes information into a table (dictionary: column -> list of values, see S_27).
+        Depending on the key ('lexic' or 'pos') the table contains an additional column 'usg' and column 'tagging' is filled with a different string.
+        The lines are split in one pass and every column is built at once.'''
     
-    lines = text.split("\n")
+    abbrs, expansions = helpers.split_list(text)
+    table = {'abbr': abbrs, 'expand': expansions}
     
-    for line in lines:
-        values = line.split(" = ")
-        dataframe = dataframe.append({'abbr': values[0], 'expand': values[1]}, ignore_index=True)
-        
     if key == "lexic":
-        for index, row in dataframe.iterrows():
-            dataframe.loc[index]['tagging'] = '<usg type="placeholder" expand="{}">{}</usg>'.format(dataframe.loc[index]['expand'], dataframe.loc[index]['abbr'])
-                
-    if key == "pos":
-        for index, row in dataframe.iterrows():
-            dataframe.loc[index]['tagging'] = '<gramGrp><gram type="placeholder" expand="{}">{}</gram></gramGrp>'.format(dataframe.loc[index]['expand'], dataframe.loc[index]['abbr'])
+        table['usg'] = [None] * len(abbrs)
+    
+    opening, between, closing = tagging_templates[key]
+    table['tagging'] = [opening + expand + between + abbr + closing for abbr, expand in zip(abbrs, expansions)]
                     
-    return dataframe
+    return table
 
 
-def save_dataframe(dataframe, key, title):
+def save_dataframe(table, key, title):
     """
-    Saves the dataframe as CSV file.
+    Saves the table as CSV file (see S_27).
     """
-    if key == "lexic":
-        dataframe.to_csv(title, sep='\t', columns=['abbr', 'expand', 'usg', 'tagging'], encoding="utf-8")
-    if key == "pos":
-        dataframe.to_csv(title, sep='\t', columns=['abbr', 'expand', 'tagging'], encoding="utf-8")
+    tsv.write_table(title, table)
 
 
 # === Coordinating function ===
@@ -14,6 +14,7 @@ Used package:
 
 import re
 import S_01_helpers as helpers
+import S_18_rule_engine as engine
 
 
 # === Functions ===
@@ -26,25 +27,46 @@ def mark_entry(tei):
     return tei
 
 
+mark_lemma_rules = engine.compile_rules('S_05', 'mark_lemma', [
+    (r'(?P<entry><entry><p>)<hi rendition="font1" style="font-weight:bold;">(?P<lemma>([^<]|<hi[^<]+</hi>)+)</hi>', r'\g<entry><form type="lemma"><orth>\g<lemma></orth></form>'),
+])
+
+
 def mark_lemma(tei):
     '''Marks the lemma with <orth> and <form type="lemma"> and deletes <hi> around the lemma.'''
     
-    tei = re.sub(r'(?P<entry><entry><p>)<hi rendition="font1" style="font-weight:bold;">(?P<lemma>([^<]|<hi[^<]+</hi>)+)</hi>', r'\g<entry><form type="lemma"><orth>\g<lemma></orth></form>', tei)
+    tei = engine.apply_rules(tei, mark_lemma_rules)
     
     return tei
 
+
+sublemma_pattern = re.compile(r'(?P<start><form type="sublemma"><orth>)(?P<sublem>[^<]+)(?P<end></orth></form>)')
+
+
+mark_sublemma_rules_1 = engine.compile_rules('S_05', 'mark_sublemma', [
+    (r'<hi rendition="font1" style="font-weight:bold;">(?P<sublem>([^<]|<hi[^<]+</hi>)+\.?)</hi>', r'<form type="sublemma"><orth>\g<sublem></orth></form>'),
+])
+
+
+mark_sublemma_rules_2 = engine.compile_rules('S_05', 'mark_sublemma', [
+    # special case: sublemma in '()'
+    (r'(?P<start><form type="lemma"><orth>)(?P<lemma>[\u002D\w]+\s)(?P<sublem>\([\u002D\w]+(<hi[^<]+</hi>)?\)\s?)(?P<end></orth></form>)', r'\g<start>\g<lemma>\g<end><form type="sublemma"><orth>\g<sublem>\g<end>'),
+    ### step 3: move punctuation and whitespace
+    (r'(?P<start><form type="sublemma"><orth>)(?P<front>\s*\(*)(?P<sublemma>[\u002D\u2197\w]+(<hi[^<]+</hi>)?)(?P<back>[\s,.;)]*)(?P<end></orth></form>)', r'\g<front>\g<start>\g<sublemma>\g<end>\g<back>'),
+])
+
+
 def mark_sublemma(tei):
     '''Marks the sublemmata with <orth> and <form type="sublemma">.'''
 
     ### step 1: tagging whole content of <hi rendition="font1" style="font-weight:bold;"> 
-    tei = re.sub(r'<hi rendition="font1" style="font-weight:bold;">(?P<sublem>([^<]|<hi[^<]+</hi>)+\.?)</hi>', r'<form type="sublemma"><orth>\g<sublem></orth></form>', tei)
+    tei = engine.apply_rules(tei, mark_sublemma_rules_1)
     
 
     ### step 2: tagging various sublemmata seperately
 
     # searching for parts that are tagged as sublemma
-    regex = re.compile(r'(?P<start><form type="sublemma"><orth>)(?P<sublem>[^<]+)(?P<end></orth></form>)')
-    for match in regex.finditer(tei):
+    for match in sublemma_pattern.finditer(tei):
         text = match[2]               # text contains one ore several sublemmata
         
         ### splitting at whitespace
@@ -85,36 +107,42 @@ def mark_sublemma(tei):
 
      ### end step 2
         
-        # special case: sublemma in '()'
-        tei = re.sub(r'(?P<start><form type="lemma"><orth>)(?P<lemma>[\u002D\w]+\s)(?P<sublem>\([\u002D\w]+(<hi[^<]+</hi>)?\)\s?)(?P<end></orth></form>)', r'\g<start>\g<lemma>\g<end><form type="sublemma"><orth>\g<sublem>\g<end>', tei)
-        
-     ### step 3: move punctuation and whitespace 
-        tei = re.sub(r'(?P<start><form type="sublemma"><orth>)(?P<front>\s*\(*)(?P<sublemma>[\u002D\u2197\w]+(<hi[^<]+</hi>)?)(?P<back>[\s,.;)]*)(?P<end></orth></form>)', r'\g<front>\g<start>\g<sublemma>\g<end>\g<back>', tei)
+        tei = engine.apply_rules(tei, mark_sublemma_rules_2)
     
     return tei
 
 
+mark_def_rules = engine.compile_rules('S_05', 'mark_def', [
+    # special case 1: change of typography within meaning paraphrase
+    (r'(‘[^<’]*)</hi><hi rendition="font5" style="font-style:italic;">([^<]+)</hi><hi rendition="font5">([^<]*’)', r'\1<hi rend="italics">\2</hi>\3'),
+    # special case 2: change of typography after the first word of meaning paraphrase
+    (r'</hi><hi rendition="font5" style="font-style:italic;">‘([^<]+)</hi>(<hi rendition="font5">)([^<]*’)', r'</hi>‘<hi rend="italics">\1</hi>\3\2'),
+    # special case 3: change of typography after the last word of meaning paraphrase
+    (r'(‘[^<]*)</hi><hi rendition="font5" style="font-style:italic;">([^<’]*)(’[^<]?)</hi>', r'</hi>\1<hi rend="italics">\2</hi>\3'),
+    ### inserting <def></def>
+    (r'(‘[^’]+’)', r'<def>\1</def>'),
+    ### deleting <hi> around <def>
+    (r'<hi rendition[^>]+>\s?(?P<d><def>[^<]+</def>)(?P<add>[^<]?(\([^<]+\))?\s?)</hi>', r'\g<d>\g<add>'),
+])
+
+
 def mark_def(tei):
     '''Marks meaning information with <def>.'''
     
     ### adapting <hi>-annotation
     
-    # special case 1: change of typography within meaning paraphrase
-    tei = re.sub(r'(‘[^<’]*)</hi><hi rendition="font5" style="font-style:italic;">([^<]+)</hi><hi rendition="font5">([^<]*’)', r'\1<hi rend="italics">\2</hi>\3', tei)
-    # special case 2: change of typography after the first word of meaning paraphrase
-    tei = re.sub(r'</hi><hi rendition="font5" style="font-style:italic;">‘([^<]+)</hi>(<hi rendition="font5">)([^<]*’)', r'</hi>‘<hi rend="italics">\1</hi>\3\2', tei)
-    # special case 3: change of typography after the last word of meaning paraphrase    
-    tei = re.sub(r'(‘[^<]*)</hi><hi rendition="font5" style="font-style:italic;">([^<’]*)(’[^<]?)</hi>', r'</hi>\1<hi rend="italics">\2</hi>\3', tei)
-    
-    ### inserting <def></def> 
-    tei = re.sub(r'(‘[^’]+’)', r'<def>\1</def>', tei)
-    
-    ### deleting <hi> around <def>
-    tei = re.sub(r'<hi rendition[^>]+>\s?(?P<d><def>[^<]+</def>)(?P<add>[^<]?(\([^<]+\))?\s?)</hi>', r'\g<d>\g<add>', tei)
+    tei = engine.apply_rules(tei, mark_def_rules)
     
     return tei
 
 
+mark_usg_pos_rules = engine.compile_rules('S_05', 'mark_usg_pos', [
+    # case 8: additional POS information in '()'
+    # move <hi>-tagging
+    (r'(?P<before></gramGrp></hi><hi[^>]+>)(?P<between>\s?\([^<]+)(?P<hiEnd></hi>)(?P<hiStart><hi[^>]+>)?(?P<after>[^)^<]+\)\s)', r'\g<before>\g<hiEnd>\g<between>\g<after>\g<hiStart>'),
+])
+
+
 def mark_usg_pos(tei, lexis_csv, pos_csv):
     '''Marks grammatical and lexical/stylistical information.'''
     
@@ -183,9 +211,7 @@ def mark_usg_pos(tei, lexis_csv, pos_csv):
     pattern = r'(</def>\s?</hi><hi rendition="font5" style="font-style:italic;">)([^<]+)(</hi>)'   
     tei = helpers.mark_abbr_usg_pos(pattern, lexis_csv, pos_csv, tei)
     
-    # case 8: additional POS information in '()'
-    # move <hi>-tagging
-    tei = re.sub(r'(?P<before></gramGrp></hi><hi[^>]+>)(?P<between>\s?\([^<]+)(?P<hiEnd></hi>)(?P<hiStart><hi[^>]+>)?(?P<after>[^)^<]+\)\s)', r'\g<before>\g<hiEnd>\g<between>\g<after>\g<hiStart>', tei)
+    tei = engine.apply_rules(tei, mark_usg_pos_rules)
     # tagging
     pattern = r'(</gramGrp></hi>\s\()([^)]+)(\))'   
     tei = helpers.mark_abbr_usg_pos(pattern, lexis_csv, pos_csv, tei)
@@ -203,56 +229,62 @@ def mark_usg_pos(tei, lexis_csv, pos_csv):
     return tei
 
 
-def delete_hi_pos_usg(tei):
-    '''Deletes or moves <hi>-tags around <gramGrp> and <usg>.'''
-    
+delete_hi_pos_usg_rules = engine.compile_rules('S_05', 'delete_hi_pos_usg', [
     # deletes <hi> around <usg>
-    tei = re.sub(r'<hi rendition="font5" style="font-style:italic;">(?P<keep>\s?(<usg[^<]+</usg>\s?)+[^<]*)</hi>', r'\g<keep>', tei)
-    
+    (r'<hi rendition="font5" style="font-style:italic;">(?P<keep>\s?(<usg[^<]+</usg>\s?)+[^<]*)</hi>', r'\g<keep>'),
     # moves </hi> in front of <usg> (case: <hi> contains additional text in front of <usg>)
-    tei = re.sub(r'(<usg[^<]+</usg>\s?[^<]*)+(</hi>)', r'\2\1', tei)
-    
+    (r'(<usg[^<]+</usg>\s?[^<]*)+(</hi>)', r'\2\1'),
     # deletes <hi> around <gramGrp>
-    tei = re.sub(r'<hi rendition="font5" style="font-style:italic;">(?P<keep>\s?<gramGrp>(<gram[^<]+</gram>(\s\/)?){1,4}</gramGrp>\s?(\u2197[^<]+(<hi[^<]+</hi>[^<]?)?)?[^<]?)\s?</hi>', r'\g<keep>', tei)
-    
+    (r'<hi rendition="font5" style="font-style:italic;">(?P<keep>\s?<gramGrp>(<gram[^<]+</gram>(\s\/)?){1,4}</gramGrp>\s?(\u2197[^<]+(<hi[^<]+</hi>[^<]?)?)?[^<]?)\s?</hi>', r'\g<keep>'),
     # deletes <hi> around <gramGrp> + <usg>
-    tei = re.sub(r'<hi rendition="font5" style="font-style:italic;">(?P<keep><gramGrp>(<gram[^<]+</gram>(\s+/)?){1,4}</gramGrp>\s{0,2}(<usg[^<]+</usg>\s?){1,3}(\w+\.)?)</hi>', r'\g<keep>', tei)
+    (r'<hi rendition="font5" style="font-style:italic;">(?P<keep><gramGrp>(<gram[^<]+</gram>(\s+/)?){1,4}</gramGrp>\s{0,2}(<usg[^<]+</usg>\s?){1,3}(\w+\.)?)</hi>', r'\g<keep>'),
+])
+
+
+def delete_hi_pos_usg(tei):
+    '''Deletes or moves <hi>-tags around <gramGrp> and <usg>.'''
+    
+    tei = engine.apply_rules(tei, delete_hi_pos_usg_rules)
        
     return tei
 
 
-def mark_lemmaGroup(tei):
-    ''' Inserts <form type="lemmaGroup"> around <form type="lemma"> (+ possibly sublemmata) and <gramGrp>.'''
-
+mark_lemmaGroup_rules = engine.compile_rules('S_05', 'mark_lemmaGroup', [
     # standard case
-    tei = re.sub(r'(<form type="lemma"><orth>([^<]|<hi[^<]+</hi>)+</orth></form>\s?<gramGrp>(<gram[^<]+</gram>(\s+/)?){1,4}</gramGrp>)', r'<form type="lemmaGroup">\1</form>', tei)
-    
+    (r'(<form type="lemma"><orth>([^<]|<hi[^<]+</hi>)+</orth></form>\s?<gramGrp>(<gram[^<]+</gram>(\s+/)?){1,4}</gramGrp>)', r'<form type="lemmaGroup">\1</form>'),
     # special case 1: sublemmata
-    tei = re.sub(r'(<form type="lemma"><orth>([^<]|<hi[^<]+</hi>)+</orth></form>(<hi[^>]+>)?\([^)]+\)\s?(</hi>)?<gramGrp>(<gram[^<]+</gram>(\s+/)?){1,4}</gramGrp>)', r'<form type="lemmaGroup">\1</form>', tei)
-    
+    (r'(<form type="lemma"><orth>([^<]|<hi[^<]+</hi>)+</orth></form>(<hi[^>]+>)?\([^)]+\)\s?(</hi>)?<gramGrp>(<gram[^<]+</gram>(\s+/)?){1,4}</gramGrp>)', r'<form type="lemmaGroup">\1</form>'),
     # special case 2: homographs
-    tei = re.sub(r'(<form type="lemma"><orth>([^<]|<hi[^<]+</hi>)+</orth></form>(<hi[^>]+>\d\)\s(</hi>)?<gramGrp>(<gram[^<]+</gram>){1,4}</gramGrp>){1,3})', r'<form type="lemmaGroup">\1</form>', tei)
-
+    (r'(<form type="lemma"><orth>([^<]|<hi[^<]+</hi>)+</orth></form>(<hi[^>]+>\d\)\s(</hi>)?<gramGrp>(<gram[^<]+</gram>){1,4}</gramGrp>){1,3})', r'<form type="lemmaGroup">\1</form>'),
     # special case 3: additonal POS in '()'
-    tei = re.sub(r'(</gramGrp>)(</form>)(\s\(([^<]+)?<gramGrp><gram[^>]+>[^<]+</gram></gramGrp>\s?\))', r'\1\3\2', tei)
+    (r'(</gramGrp>)(</form>)(\s\(([^<]+)?<gramGrp><gram[^>]+>[^<]+</gram></gramGrp>\s?\))', r'\1\3\2'),
+])
+
+
+def mark_lemmaGroup(tei):
+    ''' Inserts <form type="lemmaGroup"> around <form type="lemma"> (+ possibly sublemmata) and <gramGrp>.'''
+
+    tei = engine.apply_rules(tei, mark_lemmaGroup_rules)
 
     return tei
 
 
-def mark_sense(tei):
-    ''' Inserts <sense> around <def> in entry head.'''
-    
-    # possible addition in '()' 
-    tei = re.sub(r'(</gramGrp></form>)(<def>[^<]+</def>(\s\([^)]+\))?)', r'\1<sense>\2</sense>', tei)
-    
+mark_sense_rules = engine.compile_rules('S_05', 'mark_sense', [
+    # possible addition in '()'
+    (r'(</gramGrp></form>)(<def>[^<]+</def>(\s\([^)]+\))?)', r'\1<sense>\2</sense>'),
     # reference in '()' including change of typography
-    tei = re.sub(r'(?P<before></gramGrp></form>)(?P<child>(<hi rendition="font5">\s)<def>[^<]+</def>(\s\([^)]+\))\s?</hi>)', r'\g<before><sense>\g<child></sense>', tei)
-
+    (r'(?P<before></gramGrp></form>)(?P<child>(<hi rendition="font5">\s)<def>[^<]+</def>(\s\([^)]+\))\s?</hi>)', r'\g<before><sense>\g<child></sense>'),
     # multiple <def>s + additional text
-    tei = re.sub(r'(?P<before></gramGrp></form>)<hi rendition[^>]+>(?P<sense>(([^<]+)?<def>[^<]+</def>([^<]+)?)*)</hi>', r'\g<before><sense>\g<sense></sense>', tei)
-
+    (r'(?P<before></gramGrp></form>)<hi rendition[^>]+>(?P<sense>(([^<]+)?<def>[^<]+</def>([^<]+)?)*)</hi>', r'\g<before><sense>\g<sense></sense>'),
     # <def> behind <usg>
-    tei = re.sub(r'(</gramGrp></form>\s(<usg[^<]+</usg>)+)(<def>[^<]+</def>)', r'\1<sense>\3</sense>', tei)
+    (r'(</gramGrp></form>\s(<usg[^<]+</usg>)+)(<def>[^<]+</def>)', r'\1<sense>\3</sense>'),
+])
+
+
+def mark_sense(tei):
+    ''' Inserts <sense> around <def> in entry head.'''
+    
+    tei = engine.apply_rules(tei, mark_sense_rules)
     
     # deleting empty <sense>-elements
     tei = tei.replace('<sense></sense>', '')
@@ -272,103 +304,97 @@ def mark_missing_usg(tei, lexis_csv, pos_csv):
     return tei
 
 
-def mark_ref(tei):
-    '''Marks references and deletes <hi>-elements.'''
-    
-    ### finding references (indication: arrow) and inserting tagging
-    tei = re.sub(r'(?P<arrow>\u2197)(?P<ref>\-?\w+(\(\w+\))?(\w+)?(\(\w+\))?\-?(<hi[^<]+</hi>)?)', r'<xr><lbl>\g<arrow></lbl><ref type="entry"><hi rend="italics">\g<ref></hi></ref></xr>', tei)
-
+mark_ref_rules = engine.compile_rules('S_05', 'mark_ref', [
+    (r'(?P<arrow>\u2197)(?P<ref>\-?\w+(\(\w+\))?(\w+)?(\(\w+\))?\-?(<hi[^<]+</hi>)?)', r'<xr><lbl>\g<arrow></lbl><ref type="entry"><hi rend="italics">\g<ref></hi></ref></xr>'),
     ### deleting <hi>-elements in <ref>
-    
     # case: sublemmata
-    tei = re.sub(r'(?P<before><form type="sublemma"><orth><xr><lbl>↗</lbl><ref type="entry">)<hi rend="italics">(?P<ref>\w+(<hi[^<]+</hi>)?)</hi>(?P<after></ref></xr>)', r'\g<before>\g<ref>\g<after>', tei)
+    (r'(?P<before><form type="sublemma"><orth><xr><lbl>↗</lbl><ref type="entry">)<hi rend="italics">(?P<ref>\w+(<hi[^<]+</hi>)?)</hi>(?P<after></ref></xr>)', r'\g<before>\g<ref>\g<after>'),
     # case: multiple references
-    tei = re.sub(r'<hi\srendition[^>]+>(?P<keep>(\(?\s?<xr><lbl>↗</lbl><ref type="entry"><hi rend="italics">([^<]|<hi[^<]+</hi>)+</hi></ref></xr>([,;]?\s)?)+[^<]*)</hi>', r'\g<keep>', tei)
-    
+    (r'<hi\srendition[^>]+>(?P<keep>(\(?\s?<xr><lbl>↗</lbl><ref type="entry"><hi rend="italics">([^<]|<hi[^<]+</hi>)+</hi></ref></xr>([,;]?\s)?)+[^<]*)</hi>', r'\g<keep>'),
     # case: without indication of language
-    tei = re.sub(r'(?P<before><hi rendition="font(4|5)" style="font-style:italic;">[^<]+)(?P<ref>(<xr><lbl>↗</lbl><ref type="entry">(<hi rend="italics">)?([^<]|<hi[^<]+</hi>)+(</hi>)?</ref></xr>([,;]\s)?)*[^<]{,3}\s?)</hi>', r'\g<before></hi>\g<ref>', tei)
-    
-    # case: in etymological section; reference in '()' 
-    tei = re.sub(r'(?P<before><(hi|p) rendition="font5"[^>]+>[^<]*)(?P<ref>\((<xr><lbl>↗</lbl><ref type="entry">(<hi rend="italics">)?([^<]|<hi[^<]+</hi>)+(</hi>)?</ref></xr>([,;]?\s?))+\)[^<]*)</hi>', r'\g<before></hi>\g<ref>', tei)
-    tei = re.sub(r'(?P<before><(hi|p) rendition="font[^>]+>)(?P<ref>([^<]*\(?<xr><lbl>↗</lbl><ref type="entry">(<hi rend="italics">)?([^<]|<hi[^<]+</hi>)+(</hi>)?</ref></xr>([,;]?\s?))+\)[^<]*)</hi>', r'\g<before></hi>\g<ref>', tei)
-    
+    (r'(?P<before><hi rendition="font(4|5)" style="font-style:italic;">[^<]+)(?P<ref>(<xr><lbl>↗</lbl><ref type="entry">(<hi rend="italics">)?([^<]|<hi[^<]+</hi>)+(</hi>)?</ref></xr>([,;]\s)?)*[^<]{,3}\s?)</hi>', r'\g<before></hi>\g<ref>'),
+    # case: in etymological section; reference in '()'
+    (r'(?P<before><(hi|p) rendition="font5"[^>]+>[^<]*)(?P<ref>\((<xr><lbl>↗</lbl><ref type="entry">(<hi rend="italics">)?([^<]|<hi[^<]+</hi>)+(</hi>)?</ref></xr>([,;]?\s?))+\)[^<]*)</hi>', r'\g<before></hi>\g<ref>'),
+    (r'(?P<before><(hi|p) rendition="font[^>]+>)(?P<ref>([^<]*\(?<xr><lbl>↗</lbl><ref type="entry">(<hi rend="italics">)?([^<]|<hi[^<]+</hi>)+(</hi>)?</ref></xr>([,;]?\s?))+\)[^<]*)</hi>', r'\g<before></hi>\g<ref>'),
     # delete empty <hi>-elements
-    tei = re.sub(r'<hi rendition="font(4|5)" style="font-style:italic;"></hi>', r'', tei)
+    (r'<hi rendition="font(4|5)" style="font-style:italic;"></hi>', r''),
+])
+
+
+def mark_ref(tei):
+    '''Marks references and deletes <hi>-elements.'''
+    
+    ### finding references (indication: arrow) and inserting tagging
+    tei = engine.apply_rules(tei, mark_ref_rules)
     
     return tei
 
-        
-def mark_dateGroup(tei):
-    ''' Mark date information in entry head.
-    Note: This annotation is going to be modified in S_12 because it became evident
-    that according to TEI <def> isn't allowed in <usg> or <seg>.
-    '''
 
-    ### correct OCR errors:
-    tei = re.sub(r'ıo. Jh.', r'10. Jh.', tei)
-    tei = re.sub(r'ıı. Jh.', r'11. Jh.', tei)
-    
+mark_dateGroup_rules = engine.compile_rules('S_05', 'mark_dateGroup', [
+    (r'ıo. Jh.', r'10. Jh.'),
+    (r'ıı. Jh.', r'11. Jh.'),
     ### move <hi> behind date information
-    
     # case 1a: one date (standard)
-    tei = re.sub(r'(<hi rendition[^>]+>)(\(\d{1,2}.\sJh.\))', r'\2\1', tei)
+    (r'(<hi rendition[^>]+>)(\(\d{1,2}.\sJh.\))', r'\2\1'),
     # case 1b: one date + explanation
-    tei = re.sub(r'(<hi rendition="font5">)([^(^<]+\(\d{,2}.\sJh.(,[^)^<]+)?\))', r'\2\1', tei)
+    (r'(<hi rendition="font5">)([^(^<]+\(\d{,2}.\sJh.(,[^)^<]+)?\))', r'\2\1'),
     # case 2: two dates Daten; "form"/explanation
-    tei = re.sub(r'(<hi rendition="font5">)(\s?\(\d{,2}.\sJh.\,\s[^\d]+\d{,2}.\sJh.\))', r'\2\1', tei)
+    (r'(<hi rendition="font5">)(\s?\(\d{,2}.\sJh.\,\s[^\d]+\d{,2}.\sJh.\))', r'\2\1'),
     # case 3a: one date + word form
-    tei = re.sub(r'<hi rendition="font5">(?P<date>\s?\(\d{1,2}.\sJh.\,\s[^<]+)</hi><hi[^>]+>(?P<etym>[^<]+)</hi>(?P<end><hi[^>]+>)\)', r'\g<date><hi rend="italics">\g<etym></hi>)\g<end>', tei)
-    # case 3b: one date sublemma 
-    tei = re.sub(r'<hi rendition="font5">\s?(?P<date>\(\d{1,2}.\sJh.\,\s[^<]+)</hi>(?P<sublem><form type="sublemma"><orth>[^<]+</orth></form>\))', r'\g<date>\g<sublem>', tei)
-    # case 4a: two dates; word form as label 
-    tei = re.sub(r'<hi rendition="font5">(?P<dateFirst>\s\(\d{,2}.\sJh.,\s[^<]*)</hi><hi[^>]+>(?P<etym>[^<]+</hi>)(?P<hi><hi[^>]+>)(?P<dateForm>\s?\d{,2}.\sJh.\))', r'\g<dateFirst><hi rend="italics">\g<etym>\g<dateForm>\g<hi>', tei)
-    tei = re.sub(r'(\(\d{1,2}.\sJh.,[^<]+<hi[^<]+</hi>)(<hi[^>]+>)(\d{1,2}.\sJh.\))', r'\1\3\2', tei)
+    (r'<hi rendition="font5">(?P<date>\s?\(\d{1,2}.\sJh.\,\s[^<]+)</hi><hi[^>]+>(?P<etym>[^<]+)</hi>(?P<end><hi[^>]+>)\)', r'\g<date><hi rend="italics">\g<etym></hi>)\g<end>'),
+    # case 3b: one date sublemma
+    (r'<hi rendition="font5">\s?(?P<date>\(\d{1,2}.\sJh.\,\s[^<]+)</hi>(?P<sublem><form type="sublemma"><orth>[^<]+</orth></form>\))', r'\g<date>\g<sublem>'),
+    # case 4a: two dates; word form as label
+    (r'<hi rendition="font5">(?P<dateFirst>\s\(\d{,2}.\sJh.,\s[^<]*)</hi><hi[^>]+>(?P<etym>[^<]+</hi>)(?P<hi><hi[^>]+>)(?P<dateForm>\s?\d{,2}.\sJh.\))', r'\g<dateFirst><hi rend="italics">\g<etym>\g<dateForm>\g<hi>'),
+    (r'(\(\d{1,2}.\sJh.,[^<]+<hi[^<]+</hi>)(<hi[^>]+>)(\d{1,2}.\sJh.\))', r'\1\3\2'),
     # case 4b: two dates; word form as label + meaning
-    tei = re.sub(r'<hi rendition="font5">(?P<dateFirst>\s\(\d{,2}.\sJh.,\s)</hi><hi[^>]+>(?P<etym>[^<]+</hi>)(?P<hi><hi[^>]+>)(?P<def>\s<def>[^<]+</def>)(?P<dateForm>\s\d{,2}.\sJh.\))', r'\g<dateFirst><hi rend="italics">\g<etym>\g<def>\g<dateForm>\g<hi>', tei)
+    (r'<hi rendition="font5">(?P<dateFirst>\s\(\d{,2}.\sJh.,\s)</hi><hi[^>]+>(?P<etym>[^<]+</hi>)(?P<hi><hi[^>]+>)(?P<def>\s<def>[^<]+</def>)(?P<dateForm>\s\d{,2}.\sJh.\))', r'\g<dateFirst><hi rend="italics">\g<etym>\g<def>\g<dateForm>\g<hi>'),
     # case 5: two dates; meaning as label
-    tei = re.sub(r'(<hi rendition="font5">)(\s\(\d{,2}.\sJh.,\s<def>[^<]+</def>\s\d{,2}.\sJh.\))', r'\2\1', tei)
-
+    (r'(<hi rendition="font5">)(\s\(\d{,2}.\sJh.,\s<def>[^<]+</def>\s\d{,2}.\sJh.\))', r'\2\1'),
     ### tagging
     # case 1a
-    tei = re.sub(r'(?P<before></usg>([^<]{,5}</hi>)?\s?\()(?P<date>\d{,2}.\sJh.)(?P<after>\))', r'\g<before><usg type="time" ana="date"><date><date type="firstOccurrence">\g<date></date></date></usg>\g<after>', tei)
+    (r'(?P<before></usg>([^<]{,5}</hi>)?\s?\()(?P<date>\d{,2}.\sJh.)(?P<after>\))', r'\g<before><usg type="time" ana="date"><date><date type="firstOccurrence">\g<date></date></date></usg>\g<after>'),
     # case 1b
-    tei = re.sub(r'(?P<before></usg>([^(^<]+)\()(?P<date>\d{,2}.\sJh.)(?P<add>,[^)^<^\d]+)(?P<after>\))', r'\g<before><usg type="time" ana="date"><date><date type="firstOccurrence">\g<date></date></date>\g<add></usg>\g<after>', tei)
-    
+    (r'(?P<before></usg>([^(^<]+)\()(?P<date>\d{,2}.\sJh.)(?P<add>,[^)^<^\d]+)(?P<after>\))', r'\g<before><usg type="time" ana="date"><date><date type="firstOccurrence">\g<date></date></date>\g<add></usg>\g<after>'),
     # case 2
-    tei = re.sub(r'(?P<before></usg>([^<]{,5}</hi>)?\s?\()(?P<date1>\d{,2}.\sJh.)\,(?P<label>[^\d^‘]+)(?P<date2>\d{1,2}\.\sJh.)(?P<after>\))', r'\g<before><usg type="time" ana="date"><date><date type="firstOccurrence">\g<date1></date></date>, <date><seg type="dateLabel">\g<label></seg><date type="form">\g<date2></date></date></usg>\g<after>', tei)
-    
+    (r'(?P<before></usg>([^<]{,5}</hi>)?\s?\()(?P<date1>\d{,2}.\sJh.)\,(?P<label>[^\d^‘]+)(?P<date2>\d{1,2}\.\sJh.)(?P<after>\))', r'\g<before><usg type="time" ana="date"><date><date type="firstOccurrence">\g<date1></date></date>, <date><seg type="dateLabel">\g<label></seg><date type="form">\g<date2></date></date></usg>\g<after>'),
     # case 3a
-    tei = re.sub(r'(?P<before></usg>\s?\()(?P<date>\d{1,2}.\sJh.)(?P<add>,[^<]*)<hi[^>]+>(?P<etym>[^<]+)</hi>(?P<end>\))', r'\g<before><usg type="time" ana="date"><date><date type="firstOccurrence">\g<date></date></date>\g<add><cit type="etymologicalForm"><form xml:lang=""><orth><hi rend="italics">\g<etym></hi></orth></form></cit></usg>\g<end>', tei)
-    
+    (r'(?P<before></usg>\s?\()(?P<date>\d{1,2}.\sJh.)(?P<add>,[^<]*)<hi[^>]+>(?P<etym>[^<]+)</hi>(?P<end>\))', r'\g<before><usg type="time" ana="date"><date><date type="firstOccurrence">\g<date></date></date>\g<add><cit type="etymologicalForm"><form xml:lang=""><orth><hi rend="italics">\g<etym></hi></orth></form></cit></usg>\g<end>'),
     # case 3b
-    tei = re.sub(r'(?P<before></usg>([^<]{,5}</hi>)?\s?\()(?P<date1>\d{,2}.\sJh.)\,\s(?P<betw>[^<]+)(?P<subl><form type="sublemma"><orth>[^<]+</orth></form>)\)', r'\g<before><usg type="time" ana="date"><date><date type="firstOccurrence">\g<date1></date></date>, \g<betw>\g<subl></usg>)', tei)
-    
+    (r'(?P<before></usg>([^<]{,5}</hi>)?\s?\()(?P<date1>\d{,2}.\sJh.)\,\s(?P<betw>[^<]+)(?P<subl><form type="sublemma"><orth>[^<]+</orth></form>)\)', r'\g<before><usg type="time" ana="date"><date><date type="firstOccurrence">\g<date1></date></date>, \g<betw>\g<subl></usg>)'),
     # case 4a
-    tei = re.sub(r'(?P<before></usg>([^<]{,5}</hi>)?\s?\()(?P<date1>\d{,2}.\sJh.)\,\s(?P<etym><hi[^>]+>[^<]+</hi>)\s(?P<date2>\d{,2}.\sJh.)(?P<after>\))', r'\g<before><usg type="time" ana="date"><date><date type="firstOccurrence">\g<date1></date></date>, <date><seg type="dateLabel"><cit type="etymologicalForm"><form xml:lang="">\g<etym></form></cit></seg> <date type="form">\g<date2></date></date></usg>\g<after>', tei)
-    
+    (r'(?P<before></usg>([^<]{,5}</hi>)?\s?\()(?P<date1>\d{,2}.\sJh.)\,\s(?P<etym><hi[^>]+>[^<]+</hi>)\s(?P<date2>\d{,2}.\sJh.)(?P<after>\))', r'\g<before><usg type="time" ana="date"><date><date type="firstOccurrence">\g<date1></date></date>, <date><seg type="dateLabel"><cit type="etymologicalForm"><form xml:lang="">\g<etym></form></cit></seg> <date type="form">\g<date2></date></date></usg>\g<after>'),
     # case 4b
-    tei = re.sub(r'(?P<before></usg>([^<]{,5}</hi>)?\s?\()(?P<date1>\d{,2}.\sJh.)\,\s(?P<etym><hi[^>]+>[^<]+</hi>)\s(?P<def><def>[^<]+</def>\s)(?P<date2>\d{,2}.\sJh.)(?P<after>\))', r'\g<before><usg type="time" ana="date"><date><date type="firstOccurrence">\g<date1></date></date>, <date><seg type="dateLabel"><cit type="etymologicalForm"><form xml:lang=""><orth>\g<etym></orth></form></cit>\g<def></seg><date type="form"> \g<date2></date></date></usg>\g<after>', tei)
-    
+    (r'(?P<before></usg>([^<]{,5}</hi>)?\s?\()(?P<date1>\d{,2}.\sJh.)\,\s(?P<etym><hi[^>]+>[^<]+</hi>)\s(?P<def><def>[^<]+</def>\s)(?P<date2>\d{,2}.\sJh.)(?P<after>\))', r'\g<before><usg type="time" ana="date"><date><date type="firstOccurrence">\g<date1></date></date>, <date><seg type="dateLabel"><cit type="etymologicalForm"><form xml:lang=""><orth>\g<etym></orth></form></cit>\g<def></seg><date type="form"> \g<date2></date></date></usg>\g<after>'),
     # case 5a: two dates; meaning as label
-    tei = re.sub(r'(?P<before></usg>([^<]{,5}</hi>)?\s\()(?P<date1>\d{,2}.\sJh.),\s(?P<meaning><def>[^<]+</def>)(?P<date2>\s\d{1,2}.\sJh.)(?P<after>\))', r'\g<before><usg type="time" ana="date"><date><date type="firstOccurrence">\g<date1></date></date>, <date><seg type="dateLabel">\g<meaning></seg><date type="meaning">\g<date2></date></date></usg>\g<after>', tei)
-    
+    (r'(?P<before></usg>([^<]{,5}</hi>)?\s\()(?P<date1>\d{,2}.\sJh.),\s(?P<meaning><def>[^<]+</def>)(?P<date2>\s\d{1,2}.\sJh.)(?P<after>\))', r'\g<before><usg type="time" ana="date"><date><date type="firstOccurrence">\g<date1></date></date>, <date><seg type="dateLabel">\g<meaning></seg><date type="meaning">\g<date2></date></date></usg>\g<after>'),
     # case 5b: two dates; meaning + explanation as label
-    tei = re.sub(r'(?P<before></usg>([^<]{,5}</hi>)?\s\()(?P<date1>\d{,2}.\sJh.),\s(?P<meaning>[^<]*<def>[^<]+</def>[^<]*)(?P<date2>\s\d{1,2}.\sJh.)(?P<after>\))', r'\g<before><usg type="time" ana="date"><date><date type="firstOccurrence">\g<date1></date></date>, <date><seg type="dateLabel">\g<meaning></seg> <date type="meaning">\g<date2></date></date></usg>\g<after>', tei)
-    
+    (r'(?P<before></usg>([^<]{,5}</hi>)?\s\()(?P<date1>\d{,2}.\sJh.),\s(?P<meaning>[^<]*<def>[^<]+</def>[^<]*)(?P<date2>\s\d{1,2}.\sJh.)(?P<after>\))', r'\g<before><usg type="time" ana="date"><date><date type="firstOccurrence">\g<date1></date></date>, <date><seg type="dateLabel">\g<meaning></seg> <date type="meaning">\g<date2></date></date></usg>\g<after>'),
     # case 6: language acronym between <usg> and <date>
-    tei = re.sub(r'(?P<before>\w+.</usg>(<hi rendition="font5">)?\s{,2}\w+.\s?(</hi>)?\s?\()(?P<date>\d{1,2}\.\sJh.)(?P<after>\))', r'\g<before><usg type="time" ana="date"><date><date type="firstOccurrence">\g<date></date></date></usg>\g<after>', tei)
-    
+    (r'(?P<before>\w+.</usg>(<hi rendition="font5">)?\s{,2}\w+.\s?(</hi>)?\s?\()(?P<date>\d{1,2}\.\sJh.)(?P<after>\))', r'\g<before><usg type="time" ana="date"><date><date type="firstOccurrence">\g<date></date></date></usg>\g<after>'),
     # case 7: missing date information, indicated by '-'
-    tei = re.sub(r'(\()(-)(\))', r'\1<usg type="time" ana="date"><date><date type="firstOccurrence">\2</date></date></usg>\3', tei)
+    (r'(\()(-)(\))', r'\1<usg type="time" ana="date"><date><date type="firstOccurrence">\2</date></date></usg>\3'),
+])
+
+
+def mark_dateGroup(tei):
+    ''' Mark date information in entry head.
+    Note: This annotation is going to be modified in S_12 because it became evident
+    that according to TEI <def> isn't allowed in <usg> or <seg>.
+    '''
+
+    ### correct OCR errors:
+    tei = engine.apply_rules(tei, mark_dateGroup_rules)
     
     return tei
 
           
-# === Coordinating function ===
+# === Coordinating functions ===
 
-def main(tei, lexis_csv, pos_csv):
-    print("--- 05_mark_entry_head.py running")
-    tei = mark_entry(tei)
+def markup(tei, lexis_csv, pos_csv):
+    '''Applies the rules that only look inside one entry (everything but mark_entry()).
+       Called by main() for the whole document and by S_17 for single entries.
+    '''
     tei = mark_lemma(tei)
     tei = mark_sublemma(tei)
     tei = mark_def(tei)
@@ -379,6 +405,13 @@ def main(tei, lexis_csv, pos_csv):
     tei = mark_sense(tei)
     tei = mark_missing_usg(tei, lexis_csv, pos_csv)
     tei = mark_dateGroup(tei)
+    return tei
+
+
+def main(tei, lexis_csv, pos_csv):
+    print("--- 05_mark_entry_head.py running")
+    tei = mark_entry(tei)
+    tei = markup(tei, lexis_csv, pos_csv)
     print("... done!")
     return tei
     
\ No newline at end of file
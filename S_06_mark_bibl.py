@@ -9,101 +9,138 @@ Used package:
 
 # === Imports ===
 
-import re
 import S_01_helpers as helpers
+import S_18_rule_engine as engine
 
 
 # === Functions ===
 
+mark_refSection_rules = engine.compile_rules('S_06', 'mark_refSection', [
+    (r'(<p(><hi|) rendition="font4")', r'<note type="referencingSection">\1'),
+    (r'(<note type="referencingSection">((?:(?!</entry>).)*?)</p>)', r'\1</note>'),
+])
+
+
+def mark_refSection_in_entry(entry):
+    '''Inserts <note type='referencingSection' (in one entry, so that the note ends at the next </p> of the same entry).'''
+    
+    entry = engine.apply_rules(entry, mark_refSection_rules)
+    
+    return entry
+
+
+mark_refSection_entry_rules = engine.compile_entry_rules('S_06', [mark_refSection_in_entry])
+
+
 def mark_refSection(tei):
-    '''Inserts <note type='referencingSection'.'''
+    '''Inserts <note type='referencingSection' in every entry.'''
     
-    tei = re.sub(r'(<p(><hi|) rendition="font4")', r'<note type="referencingSection">\1', tei)
-    tei = re.sub(r'(<note type="referencingSection">(.*?)</p>)', r'\1</note>', tei)  
+    tei = engine.apply_entry_rules(tei, mark_refSection_entry_rules)
     
     return tei
 
-    
+
+move_hyphen_rules = engine.compile_rules('S_06', 'move_hyphen', [
+    (r'(.\s)(-)(\s?)(</hi>)(<hi rendition="font4")', r'\1\4\2\3\5'),
+    (r'(?P<hi><hi rendition="font4"([^>]+)?>)(?P<hyphen>\s?-\s)', r'\g<hyphen>\g<hi>'),
+])
+
+
 def move_hyphen(tei):
     ''' Moves hyphen (beginning of bibliography section) out of <hi>.'''
     
-    tei = re.sub(r'(.\s)(-)(\s?)(</hi>)(<hi rendition="font4")', r'\1\4\2\3\5', tei)
-    tei = re.sub(r'(?P<hi><hi rendition="font4"([^>]+)?>)(?P<hyphen>\s?-\s)', r'\g<hyphen>\g<hi>', tei)
+    tei = engine.apply_rules(tei, move_hyphen_rules)
     
     return tei
 
 
-def mark_bibl_list(tei):
-    ''' Annotates bibliography section with <bibl type='list'> and the including hyphen with <pc unit="bibl">.'''
-
-    ### inserting <bibl type='list'>
-    
+mark_bibl_list_rules = engine.compile_rules('S_06', 'mark_bibl_list', [
     # case 1: - introduces bibliography section
-    tei = re.sub(r'(?P<hyphen>-)(?P<white>\s?)<hi rendition="font4"([^>]+)?>(?P<bibl>[^<]+)</hi></p>', r'<bibl type="list"><pc unit="bibl">\g<hyphen></pc>\g<white>\g<bibl></bibl></p>', tei)
-    
+    (r'(?P<hyphen>-)(?P<white>\s?)<hi rendition="font4"([^>]+)?>(?P<bibl>[^<]+)</hi></p>', r'<bibl type="list"><pc unit="bibl">\g<hyphen></pc>\g<white>\g<bibl></bibl></p>'),
     # case 2a: referencing section contains only bibliography section
-    tei = re.sub(r'(?P<before><note type="referencingSection"><p>)<hi rendition="font4" style="font-variant:small-caps;">(?P<bibl>[^<]+)</hi></p>', r'\g<before><bibl type="list">\g<bibl></bibl></p>', tei)
-    
-    # case 2b: missing typography attribute small:caps 
-    tei = re.sub(r'(?P<before><note type="referencingSection">)<p rendition="font4">(?P<bibl>(EWNl|RGA|HWPh|LM|Wortbildung)[^<]+)</p>', r'\g<before><bibl type="list">\g<bibl></bibl>', tei)
-        
+    (r'(?P<before><note type="referencingSection"><p>)<hi rendition="font4" style="font-variant:small-caps;">(?P<bibl>[^<]+)</hi></p>', r'\g<before><bibl type="list">\g<bibl></bibl></p>'),
+    # case 2b: missing typography attribute small:caps
+    (r'(?P<before><note type="referencingSection">)<p rendition="font4">(?P<bibl>(EWNl|RGA|HWPh|LM|Wortbildung)[^<]+)</p>', r'\g<before><bibl type="list">\g<bibl></bibl>'),
     # case 3a: additional text in <hi>; with change of typography
-    tei = re.sub(r'(?P<before>\.\s)(?P<hyphen>-)(?P<bibl>\s?<hi.*?</hi>)(?P<after></p>)', r'\g<before><bibl type="list"><pc unit="bibl">\g<hyphen></pc>\g<bibl></bibl>\g<after>', tei)
-    
+    (r'(?P<before>\.\s)(?P<hyphen>-)(?P<bibl>\s?<hi(?:(?!</entry>).)*?</hi>)(?P<after></p>)', r'\g<before><bibl type="list"><pc unit="bibl">\g<hyphen></pc>\g<bibl></bibl>\g<after>'),
     # case 3b: additional text in <hi>; without change of typography
-    tei = re.sub(r'(?P<before>\.\s)(?P<hyphen>-)(?P<bibl>.*?)(?P<after></hi></p>)', r'\g<before><bibl type="list"><pc unit="bibl">\g<hyphen></pc>\g<bibl></bibl>\g<after>', tei)
-
+    (r'(?P<before>\.\s)(?P<hyphen>-)(?P<bibl>(?:(?!</entry>).)*?)(?P<after></hi></p>)', r'\g<before><bibl type="list"><pc unit="bibl">\g<hyphen></pc>\g<bibl></bibl>\g<after>'),
     # case 4: addition in '()' + change of typography
-    tei = re.sub(r'(?P<before>(<p>|-\s))(?P<bib><hi rendition="font4"[^>]*>.*?)</p>', r'\g<before><bibl type="list">\g<bib></bibl></p>', tei)
-    
+    (r'(?P<before>(<p>|-\s))(?P<bib><hi rendition="font4"[^>]*>(?:(?!</entry>).)*?)</p>', r'\g<before><bibl type="list">\g<bib></bibl></p>'),
     ### inserting <pc unit="bibl">
-    tei = re.sub(r'(-)(\s?)(<bibl type="list">)', r'\3<pc unit="bibl">\1</pc>\2', tei)
-    
-    return tei
+    (r'(-)(\s?)(<bibl type="list">)', r'\3<pc unit="bibl">\1</pc>\2'),
+])
 
 
-def adapt_hi_italics(tei):
-    '''Changes <hi rendition="font4"/"font5" style="font-style:italic;"> to <hi rend="italics">.'''
+def mark_bibl_list(tei):
+    ''' Annotates bibliography section with <bibl type='list'> and the including hyphen with <pc unit="bibl">.'''
+
+    ### inserting <bibl type='list'>
     
-    tei = tei.replace(r'<hi rendition="font4" style="font-style:italic;">', r'<hi rend="italics">')
-    tei = tei.replace(r'<hi rendition="font5" style="font-style:italic;">', r'<hi rend="italics">')
+    tei = engine.apply_rules(tei, mark_bibl_list_rules)
     
+    return tei
+
+
+adapt_hi_italics_rules = engine.compile_rules('S_06', 'adapt_hi_italics', [
     # move punctuation characters form <hi>
     # ')' + punctuation mark
-    tei = re.sub(r'(<hi rend="italics">[^<^\(]+)(\)[.,;]+\s?)(</hi>)', r'\1\3\2', tei)
-    # two punctuation characters 
-    tei = re.sub(r'(<hi rend="italics">[^<]+)((?<!(\s|\/)[fmn])[.,;]\s?)(</hi>)', r'\1\4\2', tei)
+    (r'(<hi rend="italics">[^<^\(]+)(\)[.,;]+\s?)(</hi>)', r'\1\3\2'),
+    # two punctuation characters
+    (r'(<hi rend="italics">[^<]+)((?<!(\s|\/)[fmn])[.,;]\s?)(</hi>)', r'\1\4\2'),
     # one punctuation character unless it's part of gender abbreviation
-    tei = re.sub(r'(<hi rend="italics">[^<]+)((?<!(\s|\/)[fmn])[.,;]\s?)(</hi>)', r'\1\4\2', tei)
+    (r'(<hi rend="italics">[^<]+)((?<!(\s|\/)[fmn])[.,;]\s?)(</hi>)', r'\1\4\2'),
     # ')'
-    tei = re.sub(r'(<hi rend="italics">[^<^\(]+)([\)]+\s?)(</hi>)', r'\1\3\2', tei)
+    (r'(<hi rend="italics">[^<^\(]+)([\)]+\s?)(</hi>)', r'\1\3\2'),
     # '('
-    tei = re.sub(r'(<hi rend="italics">)(\()([^<^\)]+\s?</hi>)', r'\2\1\3', tei)
-    
+    (r'(<hi rend="italics">)(\()([^<^\)]+\s?</hi>)', r'\2\1\3'),
     # exceptions: keeping the point in <hi> in case of
     # gender abbreviation
-    tei = re.sub(r'(<hi rend="italics">[mfn])(</hi>)(\.)', r'\1\3\2', tei)
+    (r'(<hi rend="italics">[mfn])(</hi>)(\.)', r'\1\3\2'),
     # POS abbreviation
-    tei = re.sub(r'(<hi rend="italics">(Vst|Vsw))(</hi>)(\.)', r'\1\4\3', tei)
+    (r'(<hi rend="italics">(Vst|Vsw))(</hi>)(\.)', r'\1\4\3'),
     # number abbreviation
-    tei = re.sub(r'(<hi rend="italics">([^<]+)?(Sg|Pl))(</hi>)(\.)', r'\1\5\4', tei)
+    (r'(<hi rend="italics">([^<]+)?(Sg|Pl))(</hi>)(\.)', r'\1\5\4'),
+])
+
+
+def adapt_hi_italics(tei):
+    '''Changes <hi rendition="font4"/"font5" style="font-style:italic;"> to <hi rend="italics">.'''
+    
+    tei = tei.replace(r'<hi rendition="font4" style="font-style:italic;">', r'<hi rend="italics">')
+    tei = tei.replace(r'<hi rendition="font5" style="font-style:italic;">', r'<hi rend="italics">')
+    
+    tei = engine.apply_rules(tei, adapt_hi_italics_rules)
     
     return tei
 
 
+delete_hi_bibl_list_rules_1 = engine.compile_rules('S_06', 'delete_hi_bibl_list', [
+    # deleting <hi>
+    (r'(?P<before>(<bibl type="list">)(<pc unit="bibl">(?:(?!</entry>).)*?</pc>\s)?)<hi rendition[^>]+>(?P<bibl>(?:(?!</entry>).)*?)</hi>', r'\g<before>\g<bibl>'),
+])
+
+
+delete_hi_bibl_list_rules_2 = engine.compile_rules('S_06', 'delete_hi_bibl_list', [
+    (r'(?P<before>(<bibl type="list">)(<pc unit="bibl">(?:(?!</entry>).)*?</pc>)?((?:(?!</entry>).)*?))<hi rendition="font4"([^>]+)?>(?P<bibl>(?:(?!</entry>).)*?(<hi rend="superscript">\d</hi>)?(?:(?!</entry>).)*?)</hi>', r'\g<before>\g<bibl>'),
+])
+
+
+delete_hi_bibl_list_rules_3 = engine.compile_rules('S_06', 'delete_hi_bibl_list', [
+    # moving </hi> behind </bibl> in front of <bibl>
+    (r'(<bibl type="list">(<pc unit="bibl">-</pc>)?[^<]+</bibl>)(</hi>)', r'\3\1'),
+])
+
+
 def delete_hi_bibl_list(tei):
     ''' Deletes or moves <hi>-tags in <bibl type="list">.'''
     
-    # deleting <hi>
-    tei = re.sub(r'(?P<before>(<bibl type="list">)(<pc unit="bibl">.*?</pc>\s)?)<hi rendition[^>]+>(?P<bibl>.*?)</hi>', r'\g<before>\g<bibl>', tei)
+    tei = engine.apply_rules(tei, delete_hi_bibl_list_rules_1)
    
-    n = 0
-    for n in range(0,3):
-        tei = re.sub(r'(?P<before>(<bibl type="list">)(<pc unit="bibl">.*?</pc>)?(.*?))<hi rendition="font4"([^>]+)?>(?P<bibl>.*?(<hi rend="superscript">\d</hi>)?.*?)</hi>', r'\g<before>\g<bibl>', tei)
-        n += 1
+    # repeated until all <hi>-elements are deleted
+    tei = engine.apply_fixpoint(tei, delete_hi_bibl_list_rules_2)
     
-    # moving </hi> behind </bibl> in front of <bibl>
-    tei= re.sub(r'(<bibl type="list">(<pc unit="bibl">-</pc>)?[^<]+</bibl>)(</hi>)', r'\3\1', tei)
+    tei = engine.apply_rules(tei, delete_hi_bibl_list_rules_3)
     
     return tei
 
@@ -112,31 +149,34 @@ def mark_bibl(tei):
     '''Marking single bibliographical data with <bibl>'''
     
     # with <pc unit="bibl">
-    pattern = r'(<bibl type="list"><pc unit="bibl">-</pc>)(.*?)(</bibl>)'
+    pattern = r'(<bibl type="list"><pc unit="bibl">-</pc>)((?:(?!</entry>).)*?)(</bibl>)'
     tei = helpers.split_bibl(pattern, tei)
     
     # without <pc unit="bibl">
-    pattern = r'(<bibl type="list">(?!<pc))(.*?)(</bibl>)'
+    pattern = r'(<bibl type="list">(?!<pc))((?:(?!</entry>).)*?)(</bibl>)'
     tei = helpers.split_bibl(pattern, tei)
     
     return tei
 
 
+delete_def_bibl_rules = engine.compile_rules('S_06', 'delete_def_bibl', [
+    (r'(?P<before><bibl>[^<]+(<hi[^<]+</hi>[^<]+)?)<def>(?P<between>(?:(?!</entry>).)*?)</def>(?P<after>(<hi[^<]+</hi>[^<]+)?(?:(?!</entry>).)*?</bibl>)', r'\g<before>\g<between>\g<after>'),
+])
+
+
 def delete_def_bibl(tei):
     ''' Deletes <def>s in <bibl>.'''
 
-    n = 0
-    for n in range (0,3):
-        tei = re.sub(r'(?P<before><bibl>[^<]+(<hi[^<]+</hi>[^<]+)?)<def>(?P<between>.*?)</def>(?P<after>(<hi[^<]+</hi>[^<]+)?.*?</bibl>)', r'\g<before>\g<between>\g<after>', tei)
-        n =+ 1
+    # repeated until all <def>s are deleted
+    tei = engine.apply_fixpoint(tei, delete_def_bibl_rules)
         
     return tei
            
 
-# === Coordinating function ===
+# === Coordinating functions ===
 
-def main(tei):
-    print("--- 06_mark_bibl.py running")
+def markup(tei):
+    '''Applies all rules of this script in their order (called by main() and by S_17 for single entries).'''
     tei = mark_refSection(tei)
     tei = move_hyphen(tei)
     tei = mark_bibl_list(tei)
@@ -144,6 +184,12 @@ def main(tei):
     tei = delete_hi_bibl_list(tei)
     tei = mark_bibl(tei)
     tei = delete_def_bibl(tei)
+    return tei
+
+
+def main(tei):
+    print("--- 06_mark_bibl.py running")
+    tei = markup(tei)
     print("... done!")
     return tei
     
\ No newline at end of file
@@ -7,19 +7,21 @@ CSV has to be updated with normed language tags manually. Updated version is use
 
 Used packages:
     re (see: https://docs.python.org/3/library/re.html)
-    pandas (see: https://pandas.pydata.org/pandas-docs/stable/)
 '''
 
 # === Imports ===
 
 import re
-import pandas as pd
 import S_01_helpers as helpers
+import S_18_rule_engine as engine
+import S_19_lexicon as lexicon
+import S_27_tsv as tsv
+import S_29_artifacts as artifacts
 
 
 # === Functions ===
 
-def create_lang_dict(langfile):
+def parse_langfile(langfile):
     ''' Takes list of language abbreviations as TXT file ('langfile') and writes the information into two dictionaries:
         - lang_dict: contains abbreviations and expansions as in langfile
         - lang_dict_cap: abbreviations with beginning capital letter
@@ -27,49 +29,115 @@ def create_lang_dict(langfile):
     
     txt = helpers.read_file(langfile)
 
-    lang_dict = {}
-    lines = txt.split("\n")
-    
-    for line in lines:
-        values = line.split(" = ")
-        lang_dict[values[0]] = values[1]
+    langs, expansions = helpers.split_list(txt)
+    lang_dict = dict(zip(langs, expansions))
     
     # creating lang_dict_cap
-    lang_dict_cap= {}
-    for lang in lang_dict.keys():
-        lang_dict_cap[lang.capitalize()] = lang_dict[lang]
+    lang_dict_cap = dict(zip([lang.capitalize() for lang in lang_dict], lang_dict.values()))
     
     return lang_dict, lang_dict_cap
 
+
+def create_lang_dict(langfile):
+    ''' Returns the dictionaries of parse_langfile(), the file is parsed only once (see S_19).'''
+
+    lang_dict, lang_dict_cap = lexicon.load(langfile, parse_langfile)
+    return dict(lang_dict), dict(lang_dict_cap)
+
     
 def save_lang_dict(langfile):
-    '''Saves dictionary with language abbreviations and expansions as CSV file.'''
+    '''Saves dictionary with language abbreviations and expansions as CSV file (written from the shared dictionaries, see S_27).
+       The tables are put into the store of S_29, the files are written in the background.'''
 
-    lang_dict, lang_dict_cap = create_lang_dict(langfile)
-    lang_df = pd.DataFrame.from_dict(lang_dict, orient = 'index', columns = ['expand'])
-    lang_df_cap = pd.DataFrame.from_dict(lang_dict_cap, orient = 'index', columns = ['expand'])
+    for lang_dict, csvfile in zip(lexicon.load(langfile, parse_langfile), ['languages.csv', 'languages_cap.csv']):
+        table, index = {'expand': list(lang_dict.values())}, list(lang_dict)
+        artifacts.put(csvfile, tsv.as_read(table, index), tsv.write_table, csvfile, table, index)
 
-    lang_df.to_csv('languages.csv', sep='\t', encoding="utf-8")
-    lang_df_cap.to_csv('languages_cap.csv', sep='\t', encoding="utf-8")
+
+# === Language tagger ===
+
+# opening context of the language abbreviations in the font5 display
+hi_font5 = '<hi rendition="font5">'
+
+# compiled taggers per dictionary (built once, also reused for every entry in S_17)
+lang_taggers = {}
+
+
+def create_lang_tagger(dict):
+    '''Builds the automaton for the abbreviations of the passed dictionary:
+        - regex: finds the longest abbreviation behind every ' ', '(' and '>' in one scan
+        - prefixes: abbreviation -> all abbreviations (with their position in the dictionary) it starts with
+    '''
+
+    langs = list(dict)
+    regex = re.compile(r'(?<=[ (>])(?=(' + helpers.trie_regex(langs) + '))')
+    prefixes = helpers.word_prefixes(langs)
+
+    return regex, prefixes
+
+
+def get_lang_tagger(dict):
+    '''Returns the compiled tagger for the passed dictionary.'''
+
+    key = tuple(dict.items())
+    if key not in lang_taggers:
+        lang_taggers[key] = create_lang_tagger(dict)
+    return lang_taggers[key]
+
+
+def lang_contexts(tei, start, end):
+    '''Yields the contexts in which the abbreviation tei[start:end] is tagged, in the order of the former replacements:
+       (number of the context, start of the context, end of the context, position of </lang>)
+    '''
+
+    space = tei[start - 1] == ' '
+    bracket = tei[start - 1] == '('
+    hi = start >= len(hi_font5) and tei.startswith(hi_font5, start - len(hi_font5))
+    hi_start = start - len(hi_font5)
+    following = tei[end:end + 1]
+    closing_hi = tei.startswith('</hi>', end)
+
+    # language acronym with following whitespace
+    if space and following == ' ':
+        yield 0, start - 1, end + 1, end + 1
+    if hi and following == ' ':
+        yield 1, hi_start, end + 1, end + 1
+    # following </hi>
+    if space and closing_hi:
+        yield 2, start - 1, end + 5, end
+    if hi and closing_hi:
+        yield 3, hi_start, end + 5, end
+    # language acronym in '()'
+    if bracket and following == ')':
+        yield 4, start - 1, end + 1, end
+    if bracket:
+        yield 5, start - 1, end, end
+    # with hyphen
+    if bracket and tei.startswith('-)', end):
+        yield 6, start - 1, end + 2, end + 1
 
 
-    
 def helper_mark_lang(dict, tei):
-    ''' Marks language abbreviations using the passed dictionary with abbreviations and corresponding expansions.'''
-   
-    for lang in dict:
-        # language acronym with following whitespace
-        tei = tei.replace(' ' + lang + ' ', ' <lang expand="'+ dict[lang] + '">' + lang + ' </lang>') 
-        tei = tei.replace('<hi rendition="font5">' + lang + ' ', '<hi rendition="font5"><lang expand="'+ dict[lang] + '">' + lang + ' </lang>')
-        # following </hi>
-        tei = tei.replace(' ' + lang + '</hi>', ' <lang expand="'+ dict[lang] + '">' + lang + '</lang></hi>') 
-        tei = tei.replace('<hi rendition="font5">' + lang + '</hi>', '<hi rendition="font5"><lang expand="'+ dict[lang] + '">' + lang + '</lang></hi>')
-        # language acronym in '()'
-        tei = tei.replace('(' + lang + ')', '(<lang expand="'+ dict[lang] + '">' + lang + '</lang>)')
-        tei = tei.replace('(' + lang , '(<lang expand="'+ dict[lang] + '">' + lang + '</lang>')
-        # with hyphen
-        tei = tei.replace('(' + lang + '-)', '(<lang expand="'+ dict[lang] + '">' + lang + '-</lang>)')
-    
+    ''' Marks language abbreviations using the passed dictionary with abbreviations and corresponding expansions.
+        All occurrences are found in one scan. Overlapping occurrences are decided in the order of the dictionary
+        and the contexts (see lang_contexts()), so that the result equals replacing one abbreviation after the other.
+    '''
+
+    regex, prefixes = get_lang_tagger(dict)
+
+    # collecting all occurrences: (rank, start of context, end of context, start, end, opening tag, closing tag)
+    candidates = []
+    for match in regex.finditer(tei):
+        start = match.start()
+        for i, lang in prefixes[match[1]]:
+            end = start + len(lang)
+            opening = '<lang expand="' + dict[lang] + '">'
+            for n, context_start, context_end, close in lang_contexts(tei, start, end):
+                candidates.append((i * 7 + n, context_start, context_end, start, close, opening, '</lang>'))
+
+    tags = helpers.select_tags(candidates)
+    tei = helpers.insert_tags(tei, tags)[0]
+
     return tei
 
 
@@ -91,38 +159,60 @@ def mark_lang(tei, langfile):
     return tei
 
 
+delete_lang_bibl_rules = engine.compile_rules('S_07', 'delete_lang_bibl', [
+    (r'(?P<before><bibl>[^<]+(<hi[^<]+</hi>[^<]+)?)<lang expand="[^"]+">(?P<between>[^<]+)</lang>(?P<after>(<hi[^<]+</hi>[^<]+)?(?:(?!</entry>).)*?</bibl>)', r'\g<before>\g<between>\g<after>'),
+])
+
+
 def delete_lang_bibl(tei):
     '''Deletes <lang> in bibliography section.'''
     
-    tei = re.sub(r'(?P<before><bibl>[^<]+(<hi[^<]+</hi>[^<]+)?)<lang expand="[^"]+">(?P<between>[^<]+)</lang>(?P<after>(<hi[^<]+</hi>[^<]+)?.*?</bibl>)', r'\g<before>\g<between>\g<after>', tei)
+    tei = engine.apply_rules(tei, delete_lang_bibl_rules)
     return tei
 
 
+delete_hi_lang_rules = engine.compile_rules('S_07', 'delete_hi_lang', [
+    (r'<hi rendition="font(4|5)">(?P<keep>([^<]*?<def>[^<]+</def>)*(|[^<]+)(<lang[^<]+</lang>[^>]*?)*)</hi>', r'\g<keep>'),
+    # case: <lang> behind <usg> in entry head
+    (r'<hi rend="italics">(?P<keep>(<usg[^<]+</usg>\s){,2}<lang[^<]+</lang>\s?)</hi>', r'\g<keep>'),
+    # case: <lang> behind date information in entry head
+    (r'<hi rendition="font5">(?P<keep>\s?\(<usg(?:(?!</entry>).)+?</usg>\)[^<]+<lang[^<]+</lang>\s?)</hi>', r'\g<keep>'),
+])
+
+
 def delete_hi_lang(tei):
     ''' Deletes <hi>-tags around <lang>. '''
     
-    tei = re.sub(r'<hi rendition="font(4|5)">(?P<keep>([^<]*?<def>[^<]+</def>)*(|[^<]+)(<lang[^<]+</lang>[^>]*?)*)</hi>', r'\g<keep>', tei)
-    # case: <lang> behind <usg> in entry head
-    tei = re.sub(r'<hi rend="italics">(?P<keep>(<usg[^<]+</usg>\s){,2}<lang[^<]+</lang>\s?)</hi>', r'\g<keep>', tei)
-    # case: <lang> behind date information in entry head
-    tei = re.sub(r'<hi rendition="font5">(?P<keep>\s?\(<usg.+?</usg>\)[^<]+<lang[^<]+</lang>\s?)</hi>', r'\g<keep>', tei)
+    tei = engine.apply_rules(tei, delete_hi_lang_rules)
 
     return tei
 
+
+move_lang_usg_rules = engine.compile_rules('S_07', 'move_lang_usg', [
+    (r'(</usg>)(\s*<lang expand[^<]+</lang>)', r'\2\1'),
+])
+
+
 def move_lang_usg(tei):
     '''Moves <lang> into <usg> when language is mentioned as addition to lexical information'''
-    tei = re.sub(r'(</usg>)(\s*<lang expand[^<]+</lang>)', r'\2\1', tei)
+    tei = engine.apply_rules(tei, move_lang_usg_rules)
     return tei
 
-# === Coordinating function ===
+# === Coordinating functions ===
 
-def main(tei, langfile):
-    print("--- 07_mark_lang.py running")
+def markup(tei, langfile):
+    '''Applies all rules of this script in their order (called by main() and by S_17 for single entries).'''
     tei = mark_lang(tei, langfile)
-    save_lang_dict(langfile)
     tei = delete_lang_bibl(tei)
     tei = delete_hi_lang(tei)
     tei = move_lang_usg(tei)
+    return tei
+
+
+def main(tei, langfile):
+    print("--- 07_mark_lang.py running")
+    tei = markup(tei, langfile)
+    save_lang_dict(langfile)
     print("... done!")
     return tei
     
@@ -11,133 +11,155 @@ Used package:
 
 import re
 import S_01_helpers as helpers
+import S_18_rule_engine as engine
+import S_19_lexicon as lexicon
 
 # === Functions ===
 
+seperate_hi_italics_rules = engine.compile_rules('S_08', 'seperate_hi_italics', [
+    (r'(<hi rend="italics">[^<^,]+)(,)([^<]+</hi>)', r'\1</hi>\2<hi rend="italics">\3'),
+])
+
+
 def seperate_hi_italics(tei):
     '''Splits the contant of <hi rend="italics"> when separated by commas.'''
     
-    n = 0
-    for n in range (0,5):
-        tei = re.sub(r'(<hi rend="italics">[^<^,]+)(,)([^<]+</hi>)', r'\1</hi>\2<hi rend="italics">\3', tei)
-        n =+ 1
+    # repeated until no <hi> contains a comma
+    tei = engine.apply_fixpoint(tei, seperate_hi_italics_rules)
     return tei
 
 
+mark_pos_etym_rules = engine.compile_rules('S_08', 'mark_pos_etym', [
+    # moving <hi> in front of <gramGrp>
+    (r'(?P<begin><hi rend="italics">)(?P<keep>[^<]*)(?P<gram><gramGrp>(<gram[^<]+</gram>\/?)+</gramGrp>[^<]*)(?P<end></hi>)', r'\g<begin>\g<keep>\g<end>\g<gram>'),
+    # deleting empty <hi>-elements
+    (r'<hi rend="italics">\s*</hi>', r''),
+    # annotating grammatical person and number and moving into <gramGrp>
+    (r'(\d\.\s)(<hi rend="italics">)(<gramGrp>)(<gram [^>]+>(Sg.|Pl.)</gram>)', r'\2\3<gram type="person">\1</gram>\4'),
+    # merging two following <gramGrp>s
+    (r'</gramGrp>\s{1,2}<gramGrp>', r''),
+])
+
+
 def mark_pos_etym(tei, pos_csv):
     ''' Annotates grammatical information in the etymological section.'''
 
-    data_wortarten = helpers.read_csv(pos_csv, 'abbr')
+    data_wortarten = lexicon.get_map(pos_csv, 'abbr', 'tagging')
     
     pattern = '(<hi rend="italics">)([^<]+)(</hi>)'
     tei = helpers.mark_pattern_df(pattern, data_wortarten, " ", tei)  
     
-    # moving <hi> in front of <gramGrp>
-    tei = re.sub(r'(?P<begin><hi rend="italics">)(?P<keep>[^<]*)(?P<gram><gramGrp>(<gram[^<]+</gram>\/?)+</gramGrp>[^<]*)(?P<end></hi>)', r'\g<begin>\g<keep>\g<end>\g<gram>', tei)
-    
-    # deleting empty <hi>-elements
-    tei = re.sub(r'<hi rend="italics">\s*</hi>', r'', tei)
-    
-    # annotating grammatical person and number and moving into <gramGrp>
-    tei = re.sub(r'(\d\.\s)(<hi rend="italics">)(<gramGrp>)(<gram [^>]+>(Sg.|Pl.)</gram>)', r'\2\3<gram type="person">\1</gram>\4', tei)
-    
-    # merging two following <gramGrp>s 
-    tei = re.sub(r'</gramGrp>\s{1,2}<gramGrp>', r'', tei)
+    tei = engine.apply_rules(tei, mark_pos_etym_rules)
     
     return tei
 
+
+move_hi_from_gram_rules = engine.compile_rules('S_08', 'move_hi_from_gram', [
+    # case 1: word form + gramGrp
+    (r'(<hi rend="italics">[^<]+)(<gramGrp>(<gram[^<]+</gram>\/?){1,3}</gramGrp>\s{0,2})(</hi>)', r'\1\4\2'),
+    # case 2: word form + gramGrp + 'u.ä.' or 'Pl.'
+    (r'(<hi rend="italics">[^<]+)(<gramGrp>(<gram[^<]+</gram>\/?){1,3}</gramGrp>\s{1,2}(u\.ä|Pl\.))(</hi>)', r'\1\5\2'),
+    # case 3: gramGrp + word form
+    (r'(<hi rend="italics">)\s?(<gramGrp>(<gram[^<]+</gram>){1,3}</gramGrp>)([^<]+</hi>)', r'\2\1\4'),
+    # case 4: only gramGroup in <hi>
+    (r'(<hi rend="italics">)(<gramGrp>(<gram[^<]+</gram>){1,3}</gramGrp>)(</hi>)', r'\2'),
+])
+
+
 def move_hi_from_gram(tei):
     '''Moves <gramGrp> out of <hi rend=italics>.'''
     
     ### different cases according to content of <hi>:
     
-    # case 1: word form + gramGrp
-    tei = re.sub(r'(<hi rend="italics">[^<]+)(<gramGrp>(<gram[^<]+</gram>\/?){1,3}</gramGrp>\s{0,2})(</hi>)', r'\1\4\2', tei)
-    # case 2: word form + gramGrp + 'u.ä.' or 'Pl.'
-    tei = re.sub(r'(<hi rend="italics">[^<]+)(<gramGrp>(<gram[^<]+</gram>\/?){1,3}</gramGrp>\s{1,2}(u\.ä|Pl\.))(</hi>)', r'\1\5\2', tei)
-    # case 3: gramGrp + word form
-    tei = re.sub(r'(<hi rend="italics">)\s?(<gramGrp>(<gram[^<]+</gram>){1,3}</gramGrp>)([^<]+</hi>)', r'\2\1\4', tei)
-    # case 4: only gramGroup in <hi>
-    tei = re.sub(r'(<hi rend="italics">)(<gramGrp>(<gram[^<]+</gram>){1,3}</gramGrp>)(</hi>)', r'\2', tei)
+    tei = engine.apply_rules(tei, move_hi_from_gram_rules)
     
     return tei
 
 
+mark_orth_rules = engine.compile_rules('S_08', 'mark_orth', [
+    (r'((?<!<orth>)<hi rend="italics">[^<]+</hi>)', r'<orth>\1</orth>'),
+    # exception: no <orth> in case of references
+    (r'(<ref type="entry">)<orth>(<hi rend="italics">[^>]+</hi>)</orth>(</ref>)', r'\1\2\3'),
+])
+
+
 def mark_orth(tei):
     '''Marks word forms (remaining content of <hi rend="italics">) with <orth>.'''
    
-    tei = re.sub(r'((?<!<orth>)<hi rend="italics">[^<]+</hi>)', r'<orth>\1</orth>', tei)
-    
-    # exception: no <orth> in case of references
-    tei = re.sub(r'(<ref type="entry">)<orth>(<hi rend="italics">[^>]+</hi>)</orth>(</ref>)', r'\1\2\3', tei)
+    tei = engine.apply_rules(tei, mark_orth_rules)
     
     return tei
 
 
-def mark_form(tei):
-    ''' Inserting '<form xml:lang="xxx">' around <orth> or <orth> + following <gramGrp>.'''
-    
+mark_form_rules = engine.compile_rules('S_08', 'mark_form', [
     # <orth> + <gramGrp>
-    tei = re.sub(r'(<orth><hi rend="italics">[^<]+</hi></orth><gramGrp>(<gram[^<]+</gram>\/?)*</gramGrp>)', r'<form xml:lang="xxx">\1</form>', tei)
+    (r'(<orth><hi rend="italics">[^<]+</hi></orth><gramGrp>(<gram[^<]+</gram>\/?)*</gramGrp>)', r'<form xml:lang="xxx">\1</form>'),
     # <lang> in front of <orth>
-    tei = re.sub(r'(<lang[^<]+</lang>[^<]*)(<orth><hi rend="italics">[^<]+</hi></orth>)', r'\1<form xml:lang="xxx">\2</form>', tei)
+    (r'(<lang[^<]+</lang>[^<]*)(<orth><hi rend="italics">[^<]+</hi></orth>)', r'\1<form xml:lang="xxx">\2</form>'),
     # text in front of <orth>
-    tei = re.sub(r'([^<^>]+)(<orth><hi rend="italics">[^<]+</hi></orth>)', r'\1<form xml:lang="xxx">\2</form>', tei)
+    (r'([^<^>]+)(<orth><hi rend="italics">[^<]+</hi></orth>)', r'\1<form xml:lang="xxx">\2</form>'),
     # </hi> oder </sense> in front of <orth>
-    tei = re.sub(r'(</hi>|</sense>)(<orth><hi rend="italics">[^<]+</hi></orth>)', r'\1<form xml:lang="xxx">\2</form>', tei)
+    (r'(</hi>|</sense>)(<orth><hi rend="italics">[^<]+</hi></orth>)', r'\1<form xml:lang="xxx">\2</form>'),
     # <lang> or ',' + <gramGrp> + <orth>
-    tei = re.sub(r'(</lang>|,)(<gramGrp>(<gram [^<]+</gram>)*</gramGrp><orth><hi rend="italics">[^<]+</hi></orth>)', r'\1<form xml:lang="xxx">\2</form>', tei)
-    
+    (r'(</lang>|,)(<gramGrp>(<gram [^<]+</gram>)*</gramGrp><orth><hi rend="italics">[^<]+</hi></orth>)', r'\1<form xml:lang="xxx">\2</form>'),
     # deleting empty <orth>-elements
-    tei = re.sub(r'<orth><hi rend="italics">\s?</hi></orth>', r'', tei)
-    
-    return tei
+    (r'<orth><hi rend="italics">\s?</hi></orth>', r''),
+])
 
 
-def mark_cit(tei):
-    '''Inserts '<cit type="etymologicalForm">' around <form> + possibly preceding <lang>.'''
-    
-    ### deleting whitespace between elements
-    tei = re.sub(r'</lang>\s{1,2}<form', r'</lang><form', tei)
-    tei = re.sub(r'</form>\s{1,2}<def>', r'</form><def>', tei)
+def mark_form(tei):
+    ''' Inserting '<form xml:lang="xxx">' around <orth> or <orth> + following <gramGrp>.'''
     
-    ### inserting <cit> + <mark/> (in order to prevent the future finding of already tagged cases) 
+    tei = engine.apply_rules(tei, mark_form_rules)
     
+    return tei
+
+
+mark_cit_rules_1 = engine.compile_rules('S_08', 'mark_cit', [
+    (r'</lang>\s{1,2}<form', r'</lang><form'),
+    (r'</form>\s{1,2}<def>', r'</form><def>'),
+    ### inserting <cit> + <mark/> (in order to prevent the future finding of already tagged cases)
     # case 1a: lang + form (1. orth, 2. gramGrp) + def
-    tei = re.sub(r'(<lang[^<]+</lang>([^<]+)?)(<form[^>]+><orth><hi[^<]+</hi></orth>(<gramGrp>(<gram [^<]+</gram>)*</gramGrp>)?</form>\s?<def>[^<]+</def>(,\s<gramGrp>(<gram [^<]+</gram>)*</gramGrp>\s<def>[^<]+</def>)?)', r'<cit type="etymologicalForm">\1<mark/>\3</cit>', tei)
+    (r'(<lang[^<]+</lang>([^<]+)?)(<form[^>]+><orth><hi[^<]+</hi></orth>(<gramGrp>(<gram [^<]+</gram>)*</gramGrp>)?</form>\s?<def>[^<]+</def>(,\s<gramGrp>(<gram [^<]+</gram>)*</gramGrp>\s<def>[^<]+</def>)?)', r'<cit type="etymologicalForm">\1<mark/>\3</cit>'),
     # case 1b: lang + form (1. gramGrp, 2. orth) + def
-    tei = re.sub(r'(<lang[^<]+</lang>([^<]+)?)(<form[^>]+><gramGrp>(<gram [^<]+</gram>)*</gramGrp><orth><hi[^<]+</hi></orth></form>\s?<def>[^<]+</def>)', r'<cit type="etymologicalForm">\1<mark/>\3</cit>', tei)
+    (r'(<lang[^<]+</lang>([^<]+)?)(<form[^>]+><gramGrp>(<gram [^<]+</gram>)*</gramGrp><orth><hi[^<]+</hi></orth></form>\s?<def>[^<]+</def>)', r'<cit type="etymologicalForm">\1<mark/>\3</cit>'),
     # case 2a: lang + form (1. orth, 2. gramGrp)
-    tei = re.sub(r'((?<!>)(<lang[^<]+</lang>)+)(<form[^>]+><orth><hi[^<]+</hi></orth>(<gramGrp>(<gram [^<]+</gram>)*</gramGrp>)?</form>)', r'<cit type="etymologicalForm">\1<mark/>\3</cit>', tei)
-    # case 2b: </hi> between lang and <form> 
-    tei = re.sub(r'(?<!>)(<lang[^<]+</lang>([^<]+)?)(</hi>)(<form[^>]+><orth><hi[^<]+</hi></orth>(<gramGrp>(<gram [^<]+</gram>)*</gramGrp>)?</form>)', r'\3<cit type="etymologicalForm">\1<mark/>\4</cit>', tei)
+    (r'((?<!>)(<lang[^<]+</lang>)+)(<form[^>]+><orth><hi[^<]+</hi></orth>(<gramGrp>(<gram [^<]+</gram>)*</gramGrp>)?</form>)', r'<cit type="etymologicalForm">\1<mark/>\3</cit>'),
+    # case 2b: </hi> between lang and <form>
+    (r'(?<!>)(<lang[^<]+</lang>([^<]+)?)(</hi>)(<form[^>]+><orth><hi[^<]+</hi></orth>(<gramGrp>(<gram [^<]+</gram>)*</gramGrp>)?</form>)', r'\3<cit type="etymologicalForm">\1<mark/>\4</cit>'),
     # case 2c: lang + form (1. gramGrp, 2. orth)
-    tei = re.sub(r'((?<!>)<lang[^<]+</lang>([^<]+)?)(<form[^>]+><gramGrp>(<gram [^<]+</gram>)*</gramGrp><orth><hi[^<]+</hi></orth></form>)', r'<cit type="etymologicalForm">\1<mark/>\3</cit>', tei)
+    (r'((?<!>)<lang[^<]+</lang>([^<]+)?)(<form[^>]+><gramGrp>(<gram [^<]+</gram>)*</gramGrp><orth><hi[^<]+</hi></orth></form>)', r'<cit type="etymologicalForm">\1<mark/>\3</cit>'),
     # case 3: lang + form (gram seperated by "/")
-    tei = re.sub(r'(<lang[^<]+</lang>[^<]*<form[^>]+><orth([^<]|<hi[^<]+</hi>)+</orth><gramGrp><gram [^<]+</gram>(/<gram[^<]+</gram>)+</gramGrp></form>)', r'<cit type="etymologicalForm">\1<mark/></cit>', tei)
-    
+    (r'(<lang[^<]+</lang>[^<]*<form[^>]+><orth([^<]|<hi[^<]+</hi>)+</orth><gramGrp><gram [^<]+</gram>(/<gram[^<]+</gram>)+</gramGrp></form>)', r'<cit type="etymologicalForm">\1<mark/></cit>'),
     ### move variants (several belonging forms) in one single <cit>
-    
-    # cit is followed by <form> (and possibly) <def> 
-    tei = re.sub(r'(</cit>)((\s?,<form[^>]+><orth><hi[^<]+</hi></orth>(<gramGrp>(<gram [^<]+</gram>\/?)*</gramGrp>)?</form>)+(\s?<def>[^<]+</def>)?)', r'\2\1',tei)
+    # cit is followed by <form> (and possibly) <def>
+    (r'(</cit>)((\s?,<form[^>]+><orth><hi[^<]+</hi></orth>(<gramGrp>(<gram [^<]+</gram>\/?)*</gramGrp>)?</form>)+(\s?<def>[^<]+</def>)?)', r'\2\1'),
     # case: order: 1. gramGrp, 2. orth
-    tei = re.sub(r'(</cit>)((\s?,<form[^>]+><gramGrp>(<gram [^<]+</gram>)*</gramGrp><orth><hi[^<]+</hi></orth></form>)+(\s?<def>[^<]+</def>)?)', r'\2\1',tei)
+    (r'(</cit>)((\s?,<form[^>]+><gramGrp>(<gram [^<]+</gram>)*</gramGrp><orth><hi[^<]+</hi></orth></form>)+(\s?<def>[^<]+</def>)?)', r'\2\1'),
     # special case: variant in '()' + gramGrp (optional) + def (optional)
-    tei = re.sub(r'(</cit>\s?)(\(oder\s)(<form[^>]+><orth><hi[^<]+</hi></orth></form>\)(\s?<gramGrp>(<gram [^<]+</gram>)+</gramGrp>)?(\s?<def>[^<]+</def>)?)', r'\2<mark/>\3\1', tei)
-    
-    
+    (r'(</cit>\s?)(\(oder\s)(<form[^>]+><orth><hi[^<]+</hi></orth></form>\)(\s?<gramGrp>(<gram [^<]+</gram>)+</gramGrp>)?(\s?<def>[^<]+</def>)?)', r'\2<mark/>\3\1'),
     ### inserting <cit> - remaining cases
-   
     # case 4a:  text + form + def (optional)
-    tei = re.sub(r'((?<![,>])<form xml:lang[^>]+><orth><hi[^<]+</hi></orth>(\s?<gramGrp>(<gram [^<]+</gram>)+</gramGrp>)?</form>(<def>[^<]+</def>)?)', r'<cit type="etymologicalForm">\1</cit>', tei)
+    (r'((?<![,>])<form xml:lang[^>]+><orth><hi[^<]+</hi></orth>(\s?<gramGrp>(<gram [^<]+</gram>)+</gramGrp>)?</form>(<def>[^<]+</def>)?)', r'<cit type="etymologicalForm">\1</cit>'),
     # case 4b: </hi> in front of form
-    tei = re.sub(r'(</hi>)(<form xml:lang[^>]+><orth><hi[^<]+</hi></orth>(\s?<gramGrp>(<gram [^<]+</gram>)+</gramGrp>)?</form>(<def>[^<]+</def>)?)', r'\1<cit type="etymologicalForm">\2</cit>', tei)
+    (r'(</hi>)(<form xml:lang[^>]+><orth><hi[^<]+</hi></orth>(\s?<gramGrp>(<gram [^<]+</gram>)+</gramGrp>)?</form>(<def>[^<]+</def>)?)', r'\1<cit type="etymologicalForm">\2</cit>'),
+])
+
+
+mark_cit_rules_2 = engine.compile_rules('S_08', 'mark_cit', [
+    (r'(</cit>\s?,)((<form[^>]+><orth><hi[^<]+</hi></orth>(<gramGrp>(<gram [^<]+</gram>)*</gramGrp>)?</form>)+(\s?<def>[^<]+</def>)?)', r'\1<cit type="etymologicalForm">\2</cit>'),
+])
+
+
+def mark_cit(tei):
+    '''Inserts '<cit type="etymologicalForm">' around <form> + possibly preceding <lang>.'''
+    
+    ### deleting whitespace between elements
+    tei = engine.apply_rules(tei, mark_cit_rules_1)
     
     # case 5: enumeration of <form>s (which aren't variants)
-    n = 0
-    for n in range(0,5):
-        tei = re.sub(r'(</cit>\s?,)((<form[^>]+><orth><hi[^<]+</hi></orth>(<gramGrp>(<gram [^<]+</gram>)*</gramGrp>)?</form>)+(\s?<def>[^<]+</def>)?)', r'\1<cit type="etymologicalForm">\2</cit>', tei)
-        n =+1
+    # repeated until every <form> of the enumeration is in a <cit>
+    tei = engine.apply_fixpoint(tei, mark_cit_rules_2)
         
     # delete <mark/>
     tei = tei.replace('<mark/>', '')
@@ -145,53 +167,88 @@ def mark_cit(tei):
     return tei
 
 
-def mark_variants(tei):
-    '''Adds attribute type="variant" to <form>-elements that are variants (several <form>-elements in one <cit>).'''
+variants_pattern = re.compile('(?P<begin><cit type="etymologicalForm"><lang[^<]+</lang>)(?P<form>(<form[^<]+\s?(<orth><hi[^<]+</hi></orth>)?(<gramGrp>(<gram [^<]+</gram>)+</gramGrp>)?(<orth><hi[^<]+</hi></orth>)?</form>\,?)+)(?P<end>(<def>[^<]+</def>)?</cit>)')
+
 
-    matches = re.finditer('(?P<begin><cit type="etymologicalForm"><lang[^<]+</lang>)(?P<form>(<form[^<]+\s?(<orth><hi[^<]+</hi></orth>)?(<gramGrp>(<gram [^<]+</gram>)+</gramGrp>)?(<orth><hi[^<]+</hi></orth>)?</form>\,?)+)(?P<end>(<def>[^<]+</def>)?</cit>)', tei)
-    for match in matches:
+mark_variants_rules = engine.compile_rules('S_08', 'mark_variants', [
+    (r'(<form)', r'\1 type="variant"'),
+])
+
+
+def mark_variants_in_entry(entry):
+    '''Adds attribute type="variant" to <form>-elements that are variants (several <form>-elements in one <cit>) in one entry.'''
+
+    def replace(match):
         if match[0].count('<form') > 1:
-            repl = re.sub(r'(<form)', r'\1 type="variant"', match.group('form'))  
-            replaceStr = match.group('begin') + repl + match.group('end')
-            tei = tei.replace(match[0], replaceStr)
-    
-    return tei
+            repl = engine.apply_rules(match.group('form'), mark_variants_rules)
+            return match.group('begin') + repl + match.group('end')
+        return match[0]
 
+    return variants_pattern.sub(replace, entry)
 
-def mark_cit_relatedForm(tei):
-    '''Inserts '<cit type="related"> around sublemmata in the etymological section.'''
 
-    ### step 1: mask sublemmta in entry head by replacing the attribute value
+mark_variants_entry_rules = engine.compile_entry_rules('S_08', [mark_variants_in_entry])
+
+
+def mark_variants(tei):
+    '''Adds attribute type="variant" to <form>-elements that are variants in every entry.'''
+
+    return engine.apply_entry_rules(tei, mark_variants_entry_rules)
 
-    matches = re.finditer('<form type="lemmaGroup"><form type="lemma"><orth>[^<]+(<hi[^<]+</hi>)?</orth></form>(\([^\)]+\)\s?)?\s?<gramGrp>(<gram [^<]+</gram>)*</gramGrp></form>(\s\([^\)]+\))?(,\s<form type="sublemma">)?', tei)
-    for match in matches:
-        repl = re.sub('sublemma', 'placeholder', match[0])
-        tei = tei.replace(match[0], repl)
+
+lemmaGroup_pattern = re.compile('<form type="lemmaGroup"><form type="lemma"><orth>[^<]+(<hi[^<]+</hi>)?</orth></form>(\([^\)]+\)\s?)?\s?<gramGrp>(<gram [^<]+</gram>)*</gramGrp></form>(\s\([^\)]+\))?(,\s<form type="sublemma">)?')
+
+
+mark_cit_relatedForm_rules = engine.compile_rules('S_08', 'mark_cit_relatedForm', [
+    (r'(<form type="sublemma"><orth>[^<]+(<hi[^<]+</hi>)?</orth></form>(\s?<gramGrp>(<gram[^<]+</gram>)+</gramGrp>)?(\s?<def[^<]+</def>)?)', r'<cit type="relatedForm">\1</cit>'),
+    # sublemma is reference:
+    (r'(<form type="sublemma"><orth><xr><lbl>↗</lbl><ref type="entry">[^<]+(<hi[^<]+</hi>)?</ref></xr></orth></form>)', r'<cit type="relatedForm">\1</cit>'),
+    (r'(<form type="sublemma"><orth><xr><lbl>↗</lbl><ref type="entry"><hi[^<]+(<hi[^<]+</hi>)?</hi></ref></xr></orth></form>)', r'<cit type="relatedForm">\1</cit>'),
+])
+
+
+def mark_cit_relatedForm_in_entry(entry):
+    '''Inserts '<cit type="related"> around sublemmata in the etymological section of one entry.'''
+
+    ### step 1: mask sublemmta in entry head by replacing the attribute value
+    entry = lemmaGroup_pattern.sub(lambda match: match[0].replace('sublemma', 'placeholder'), entry)
     
     ### step 2: insert <cit>
-    tei = re.sub(r'(<form type="sublemma"><orth>[^<]+(<hi[^<]+</hi>)?</orth></form>(\s?<gramGrp>(<gram[^<]+</gram>)+</gramGrp>)?(\s?<def[^<]+</def>)?)', r'<cit type="relatedForm">\1</cit>', tei)
-    # sublemma is reference:
-    tei = re.sub(r'(<form type="sublemma"><orth><xr><lbl>↗</lbl><ref type="entry">[^<]+(<hi[^<]+</hi>)?</ref></xr></orth></form>)', r'<cit type="relatedForm">\1</cit>', tei)
-    tei = re.sub(r'(<form type="sublemma"><orth><xr><lbl>↗</lbl><ref type="entry"><hi[^<]+(<hi[^<]+</hi>)?</hi></ref></xr></orth></form>)', r'<cit type="relatedForm">\1</cit>', tei)
+    entry = engine.apply_rules(entry, mark_cit_relatedForm_rules)
     
     ### step 3: undo masking
-    tei = tei.replace('placeholder', 'sublemma')
+    entry = entry.replace('placeholder', 'sublemma')
     
-    return tei
+    return entry
+
+
+mark_cit_relatedForm_entry_rules = engine.compile_entry_rules('S_08', [mark_cit_relatedForm_in_entry])
+
+
+def mark_cit_relatedForm(tei):
+    '''Inserts '<cit type="related"> around sublemmata in the etymological section of every entry.'''
+
+    return engine.apply_entry_rules(tei, mark_cit_relatedForm_entry_rules)
     
 
-# === Coordinating function ===
+# === Coordinating functions ===
 
-def main(tei, pos_csv):
-    print("--- 08_mark_etym.py running")
+def markup(tei, pos_csv):
+    '''Applies all rules of this script in their order (called by main() and by S_17 for single entries).'''
     tei = seperate_hi_italics(tei)
     tei = mark_pos_etym(tei, pos_csv)
     tei = move_hi_from_gram(tei)
     tei = mark_orth(tei)
     tei = mark_form(tei)
     tei = mark_cit(tei)
-    tei = mark_variants(tei)
-    tei = mark_cit_relatedForm(tei)
+    # mark_variants() and mark_cit_relatedForm() in one pass over the entries
+    tei = engine.apply_entry_rules(tei, mark_variants_entry_rules + mark_cit_relatedForm_entry_rules)
+    return tei
+
+
+def main(tei, pos_csv):
+    print("--- 08_mark_etym.py running")
+    tei = markup(tei, pos_csv)
     print("... done!")
     return tei
     
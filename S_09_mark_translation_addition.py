@@ -10,10 +10,14 @@ Used package:
 # === Imports ===
 
 import re
-import pandas as pd
 import S_01_helpers as helpers
+import S_18_rule_engine as engine
 
 
+mark_note_translation_rules = engine.compile_rules('S_09', 'mark_note_translation', [
+    (r'(Ebenso (<cit type="etymologicalForm"><lang[^<]+</lang>(<form[^<]+<orth><hi[^<]+</hi></orth></form>\,?)+(<def>[^<]+</def>)?</cit>(\,\s)?)+(\.|;))', r'<note type="translation">\1<trans/></note>'),
+])
+
 
 def mark_note_translation(tei):
     '''Marks translation section by inserting '<note type="translation">'.
@@ -21,30 +25,111 @@ def mark_note_translation(tei):
        Empty <trans/> is inserted as aid to find the element's closing tag in S_12.
     '''
     
-    tei = re.sub(r'(Ebenso (<cit type="etymologicalForm"><lang[^<]+</lang>(<form[^<]+<orth><hi[^<]+</hi></orth></form>\,?)+(<def>[^<]+</def>)?</cit>(\,\s)?)+(\.|;))', r'<note type="translation">\1<trans/></note>', tei)
+    tei = engine.apply_rules(tei, mark_note_translation_rules)
     return tei
 
 
-def note_translation_variants(tei):
-    '''Inserts <cit> around mistaken variants in translation section.'''
+translation_pattern = re.compile('<note type="translation">(?:(?!</entry>).)*?</note>')
+
+
+note_translation_variants_rules = engine.compile_rules('S_09', 'note_translation_variants', [
+    (r'(</form>)(,)(<form)', r'\1</cit>\2<cit type="etymologicalForm">\3'),
+])
+
+
+def note_translation_variants_in_entry(entry):
+    '''Inserts <cit> around mistaken variants in the translation section of one entry.'''
     
-    matches = re.finditer('<note type="translation">.*?</note>', tei)
-    for match in matches:
+    def replace(match):
         if 'form type="variant"' in match[0]:
             repl = match[0].replace('type="variant"', '')  
-            repl = re.sub(r'(</form>)(,)(<form)', r'\1</cit>\2<cit type="etymologicalForm">\3', repl)  
-            tei = tei.replace(match[0], repl)
+            return engine.apply_rules(repl, note_translation_variants_rules)
+        return match[0]
         
-    return tei
+    return translation_pattern.sub(replace, entry)
+
+
+note_translation_variants_entry_rules = engine.compile_entry_rules('S_09', [note_translation_variants_in_entry])
+
+
+def note_translation_variants(tei):
+    '''Inserts <cit> around mistaken variants in translation section.'''
+    
+    return engine.apply_entry_rules(tei, note_translation_variants_entry_rules)
+
+
+def type_translationEquivalent_in_entry(entry):
+    '''Changes type-attribute of <cit> to "translationEquivalent" within the translation section of one entry.'''
+    
+    return translation_pattern.sub(lambda match: match[0].replace('etymologicalForm', 'translationEquivalent'), entry)
+
+
+type_translationEquivalent_entry_rules = engine.compile_entry_rules('S_09', [type_translationEquivalent_in_entry])
+
 
 def type_translationEquivalent(tei):
     '''Changes type-attribute of <cit> to "translationEquivalent" within the translation section. '''
     
-    matches = re.finditer('<note type="translation">.*?</note>', tei)
-    for match in matches:
-        repl = match[0].replace('etymologicalForm', 'translationEquivalent')
-        tei = tei.replace(match[0], repl)
-    return tei
+    return engine.apply_entry_rules(tei, type_translationEquivalent_entry_rules)
+
+
+mark_note_addition_rules_1 = engine.compile_rules('S_09', 'mark_note_addition', [
+    # case 1: translation section + addition section + bibliographical section
+    (r'(</note>(?!</entry>))', r'\1<note type="addition">'),
+    (r'(<bibl type="list">)', r'<add/></note>\1'),
+])
+
+
+mark_note_addition_rules_2 = engine.compile_rules('S_09', 'mark_note_addition', [
+    # case 2: addition section + bibliographical section
+    (r'(<note type="referencingSection"><p[^>]*?>)(?!<bibl)', r'\1<note type="addition">'),
+    (r'(<bibl type="list">)', r'<add/></note>\1'),
+])
+
+
+mark_note_addition_rules_3 = engine.compile_rules('S_09', 'mark_note_addition', [
+    # case 3: translation section + addition section
+    (r'(</note>(?!</entry>))', r'\1<note type="addition">'),
+    (r'((?<!</bibl>)(</p>)?</note></entry>)', r'<add/></note>\1'),
+])
+
+
+mark_note_addition_rules_4 = engine.compile_rules('S_09', 'mark_note_addition', [
+    # case 4: only addition section
+    (r'(<note type="referencingSection"><p[^>]*?>)', r'\1<note type="addition">'),
+    (r'((</p>)?</note></entry>)', r'<add/></note>\1'),
+])
+
+
+def mark_note_addition_in_entry(entry):
+    '''Annotate section "Weitere Informationen" of one entry with <note type="addition">.'''
+
+    if 'referencingSection' not in entry:   # no referencing section exists
+        return entry
+
+    #case 1: translation section + addition section + bibliographical section
+    if '<note type="translation">' in entry and '<bibl type="list">' in entry:
+        if '</note> <bibl' not in entry:  # sonst gibt es kein addition
+            entry = engine.apply_rules(entry, mark_note_addition_rules_1)
+        
+    # case 2: addition section + bibliographical section
+    elif '<bibl type="list">' in entry:
+        if '<p><bibl type="list">' not in entry and '<note type="referencingSection"><bibl' not in entry: # otherwise no addition exists
+            entry = engine.apply_rules(entry, mark_note_addition_rules_2)
+          
+    # case 3: translation section + addition section
+    elif '<note type="translation">' in entry:
+        if '</note></p></note>' not in entry: # sonst keine addition
+            entry = engine.apply_rules(entry, mark_note_addition_rules_3)
+    
+    # case 4: only addition section
+    else:
+        entry = engine.apply_rules(entry, mark_note_addition_rules_4)
+  
+    return entry
+
+
+mark_note_addition_entry_rules = engine.compile_entry_rules('S_09', [mark_note_addition_in_entry])
 
 
 def mark_note_addition(tei):
@@ -53,55 +138,22 @@ def mark_note_addition(tei):
        Empty <add/> is inserted as aid to find the element's closing tag in S_12.
     '''
 
-    # search for entries
-    matches = re.finditer('<entry>.*?</entry>', tei)
-    n = 0 
-    for match in matches:
-        if 'referencingSection' in match[0]:   # a referencing section exists
-        
-            #case 1: translation section + addition section + bibliographical section
-            if '<note type="translation">' in match[0] and '<bibl type="list">' in match[0]:
-                if '</note> <bibl' in match[0]:  # dann gibt es kein addition:
-                    pass
-                else:
-                    repl = re.sub(r'(</note>(?!</entry>))', r'\1<note type="addition">', match[0])
-                    repl = re.sub(r'(<bibl type="list">)', r'<add/></note>\1', repl)
-                    tei = tei.replace(match[0], repl)
-                
-            # case 2: addition section + bibliographical section
-            if '<bibl type="list">' in match[0] and '<note type="translation">' not in match[0]:
-                if '<p><bibl type="list">' in match[0] or '<note type="referencingSection"><bibl' in match[0]: # no addition exists
-                    pass
-                else:
-                    repl = re.sub(r'(<note type="referencingSection"><p[^>]*?>)(?!<bibl)', r'\1<note type="addition">', match[0])
-                    repl = re.sub(r'(<bibl type="list">)', r'<add/></note>\1', repl)
-                    tei = tei.replace(match[0], repl)
-                  
-            # case 3: translation section + addition section
-            if '<note type="translation">' in match[0] and '<bibl type="list">' not in match[0]:
-                if '</note></p></note>' in match[0] : # dann keine addition
-                    pass
-                else:
-                    repl = re.sub(r'(</note>(?!</entry>))', r'\1<note type="addition">', match[0])
-                    repl = re.sub(r'((?<!</bibl>)(</p>)?</note></entry>)', r'<add/></note>\1', repl)
-                    tei = tei.replace(match[0], repl)
-            
-            # case 4: only addition section
-            if '<note type="translation">' not in match[0] and '<bibl type="list">' not in match[0]:
-                    repl = re.sub(r'(<note type="referencingSection"><p[^>]*?>)', r'\1<note type="addition">', match[0])
-                    repl = re.sub(r'((</p>)?</note></entry>)', r'<add/></note>\1', repl)
-                    tei = tei.replace(match[0], repl)
-          
-    return tei
+    return engine.apply_entry_rules(tei, mark_note_addition_entry_rules)
 
 
-# === Coordinating function ===
+# === Coordinating functions ===
+
+def markup(tei):
+    '''Applies all rules of this script in their order (called by main() and by S_17 for single entries).'''
+    tei = mark_note_translation(tei)
+    # note_translation_variants(), type_translationEquivalent() and mark_note_addition() in one pass over the entries
+    tei = engine.apply_entry_rules(tei, note_translation_variants_entry_rules + type_translationEquivalent_entry_rules
+                                   + mark_note_addition_entry_rules)
+    return tei
+
 
 def main(tei):
     print("--- 09_mark_translation_addition.py running")
-    tei = mark_note_translation(tei)
-    tei = note_translation_variants(tei)
-    tei = type_translationEquivalent(tei)
-    tei = mark_note_addition(tei)
+    tei = markup(tei)
     print("... done!")
     return tei
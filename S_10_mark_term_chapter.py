@@ -14,45 +14,67 @@ Used packages:
 
 # === Imports ===
 
-import re
 import S_11_mark_term as mark11
 import S_01_helpers as helpers
+import S_18_rule_engine as engine
+import S_29_artifacts as artifacts
 
 # === Functions ===
 
+mark_head_rules = engine.compile_rules('S_10', 'mark_head', [
+    (r'\n([\w\s\,]+)((?<!\.)\n\d{1,2}\.\d{0,2})', r'\n<head>\1</head>\2'),
+    (r'(.*)(\n0.0)', r'<head>\1</head>\2'),
+])
+
+
 def mark_head(txt):
     '''Marks headings.'''
     
-    txt = re.sub(r'\n([\w\s\,]+)((?<!\.)\n\d{1,2}\.\d{0,2})', r'\n<head>\1</head>\2', txt)
-    txt = re.sub(r'(.*)(\n0.0)', r'<head>\1</head>\2', txt)
+    txt = engine.apply_rules(txt, mark_head_rules)
     
     return txt
 
 
+mark_div_rules_1 = engine.compile_rules('S_10', 'mark_div', [
+    # opening <div>
+    (r'(<head>[^<]+</head>\n(?P<section>\d{1,2})\.\d{0,2})', r'<div n="\g<section>">\1'),
+    # closing </div>
+    (r'((?<=\.\n)<div)', r'</div>\1'),
+])
+
+
+mark_div_rules_2 = engine.compile_rules('S_10', 'mark_div', [
+    (r'(\n)((?P<section>\d{1,2}\.\d{0,2})(.*))\n', r'\1<div n="\g<section>"><p>\2</p></div>\n'),
+    (r'(</div>\n)((?P<section>\d{1,2}\.\d{0,2})(.*))\n', r'\1<div n="\g<section>"><p>\2</p></div>\n'),
+    # last section
+    (r'(</div>\n)((?P<section>\d{1,2}\.\d{0,2})(.*))</div>', r'\1<div n="\g<section>"><p>\2</p></div></div>'),
+])
+
+
 def mark_div(txt):
     '''Inserts <div>-tags with attribute n which contains the section number. Text within each <div> is inclosed by <p>.'''
     
     ### sections
-    # opening <div>
-    txt = re.sub(r'(<head>[^<]+</head>\n(?P<section>\d{1,2})\.\d{0,2})', r'<div n="\g<section>">\1', txt)
-    # closing </div>
-    txt = re.sub(r'((?<=\.\n)<div)', r'</div>\1', txt)
+    txt = engine.apply_rules(txt, mark_div_rules_1)
     # last closing </div>
     txt = txt + '</div>'
     
     ### subsections 
-    txt = re.sub(r'(\n)((?P<section>\d{1,2}\.\d{0,2})(.*))\n', r'\1<div n="\g<section>"><p>\2</p></div>\n', txt)
-    txt = re.sub(r'(</div>\n)((?P<section>\d{1,2}\.\d{0,2})(.*))\n', r'\1<div n="\g<section>"><p>\2</p></div>\n', txt)
-    # last section
-    txt = re.sub(r'(</div>\n)((?P<section>\d{1,2}\.\d{0,2})(.*))</div>', r'\1<div n="\g<section>"><p>\2</p></div></div>', txt)
+    txt = engine.apply_rules(txt, mark_div_rules_2)
 
     return txt
 
+
+delete_p_rules = engine.compile_rules('S_10', 'delete_p', [
+    (r'(<text><body>)<p>', r'\1'),
+    (r'</p>(</body></text>)', r'\1'),
+])
+
+
 def delete_p(xml):
     '''Deletes <p>-Element in <body>.'''
     
-    xml = re.sub(r'(<text><body>)<p>', r'\1', xml)
-    xml = re.sub(r'</p>(</body></text>)', r'\1', xml)
+    xml = engine.apply_rules(xml, delete_p_rules)
     
     return xml
 
@@ -67,6 +89,6 @@ def main(termfile, term_header, regfile):
     xml = helpers.transform2xml(txt, term_header)
     xml = delete_p(xml)
     xml = mark11.mark_term(xml, regfile)
-    helpers.save_file(xml, "terminology.xml")
+    artifacts.put("terminology.xml", xml, helpers.save_file, xml, "terminology.xml")
     print("... done!")
     
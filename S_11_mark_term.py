@@ -5,56 +5,62 @@ Script for tagging terms.
 
 Used packages:
     re (see: https://docs.python.org/3/library/re.html)
-    pandas (see: https://pandas.pydata.org/pandas-docs/stable/)
 '''
 
 # === Imports ===
 
 import re
-import pandas as pd
 import S_01_helpers as helpers
+import S_18_rule_engine as engine
+import S_19_lexicon as lexicon
+import S_27_tsv as tsv
+import S_29_artifacts as artifacts
 
 
 # === Functions ===
 
-def create_term_df(regfile):
-    '''Takes list of terms and corresponding sections (in chapter "Terminologie") as TXT file and writes information into a dataframe. Saves dataframe to CSV 'term.csv'.
-       Columns:
+digit_pattern = re.compile('\d')
+section_pattern = re.compile(r'(\d{1,2}\.\d{0,2}(\,\s)?)+')
+term_pattern = re.compile(r'[^\d^.]+')
+
+
+def parse_register(regfile):
+    '''Takes list of terms and corresponding sections (in chapter "Terminologie") as TXT file and returns the columns (dictionary of lists):
        - 'term': term as string
        - 'key': every term receives a key (number)
        - 'section': corresponding section in chapter "Terminologie".
-       - 'tagging': tagging string
+       Lines without digits (e.g. the heading) are skipped.
     '''   
     txt = helpers.read_file(regfile)
-    
-    
-    # create dataframe
-    df = pd.DataFrame(columns=['term', 'key','section', 'tagging'])
-    df.set_index(list(df)[0])  
-   
+    columns = {'term': [], 'key': [], 'section': []}
    
-    lines = txt.split("\n")
-  
-    key = 0
+    # lines without digits are deleted
+    lines = [line for line in txt.split("\n") if digit_pattern.search(line)]
         
     for line in lines:
-        # lines without digits are deleted
-        if not re.search('\d', line):
-            lines.remove(line)
-        else:
-            section = re.search(r'(\d{1,2}\.\d{0,2}(\,\s)?)+', line).group()
-            sections = section.split(',')
-            term = re.search(r'[^\d^.]+', line).group()
-            terms = term.split(',')
+        section = section_pattern.search(line).group()
+        sections = section.split(',')
+        terms = [term.strip() for term in term_pattern.search(line).group().split(',')]
             
-            for term in terms:
-                term = term.strip()  
-                key = key + 1
-                tagging = '<term key="' + str(key) + '">' + term + '</term>'
-                df = df.append({'term': term,'key': key, 'section': sections, 'tagging': tagging}, ignore_index=True)
+        columns['term'].extend(terms)
+        columns['section'].extend([sections] * len(terms))
+
+    columns['key'] = list(range(1, len(columns['term']) + 1))
+    return columns
+
+
+def create_term_df(regfile):
+    '''Writes the terms of the register ('regfile', parsed only once, see parse_register() and S_19) into a table
+       (dictionary: column -> list of values, see S_27; every column is built at once). Saves table to CSV 'term.csv'
+       (put into the store of S_29, the file is written in the background).'''
+
+    # create table
+    register = lexicon.load(regfile, parse_register)
+    df = {column: list(register[column]) for column in ['term', 'key', 'section']}
+    df['tagging'] = ['<term key="' + str(key) + '">' + term + '</term>' for term, key in zip(df['term'], df['key'])]
                 
     # save to CSV
-    df.to_csv('term.csv', sep='\t', encoding="utf-8")            
+    artifacts.put('term.csv', tsv.as_read(df), tsv.write_table, 'term.csv', df)
 
     return df
     
@@ -63,28 +69,124 @@ def mark_term(tei, regfile):
     '''Annotates terms with <term key=""> by using the function create_term_df() which uses a list of terms ('regfile').'''
     
     term_df = create_term_df(regfile)
-    term_list = term_df['term'].tolist()
-    
-    for term in term_list:
-        index = term_df.loc[term_df['term'] == term].index[0]
-       
-        tei = tei.replace(' ' + term + ' ', ' ' + term_df.loc[index, 'tagging'] + ' ')
-        tei = tei.replace(' ' + term + ',', ' ' + term_df.loc[index, 'tagging'] + ',')
-        tei = tei.replace(' ' + term + '.', ' ' + term_df.loc[index, 'tagging'] + '.')
-        tei = tei.replace('\n' + term + ' ', '\n' + term_df.loc[index, 'tagging'] + ' ')
-        tei = tei.replace('\n' + term + ',', '\n' + term_df.loc[index, 'tagging'] + ',')
-        
-    
-    # deleting <term> within <bibl>
-    tei = re.sub(r'(<bibl>[^<]*)<term key="\d+">([^<]+)</term>(([^<]|<cit[^>]+><form[^>]+><orth><hi[^<]+</hi></orth></form></cit>)+</bibl>)', r'\1\2\3', tei)
+    tei = tag_term(tei, term_df)
+    return tei
 
-    # deleting <term> within tags 
-    tei = re.sub(r'(<[^=]+="[^"^<]*)<term\skey="\d+">([^<]+)</term>([^"^<]*">)', r'\1\2\3', tei)
-    
+
+# compiled taggers per term list (built once, also reused for every entry in S_17)
+term_taggers = {}
+
+
+def create_term_tagger(term_df):
+    '''Builds the automaton for the terms of the table created by create_term_df():
+        - regex: finds the longest term behind every ' ' and '\\n' in one scan
+        - prefixes: term -> all terms (with their position in the table) it starts with
+        - opening: term -> opening tag (of the first row of the term)
+    '''
+
+    terms = list(term_df['term'])
+    opening = {}
+    for term, tagging in zip(terms, term_df['tagging']):
+        if term not in opening:
+            opening[term] = tagging[:len(tagging) - len(term) - len('</term>')]
+
+    regex = re.compile(r'(?<=[ \n])(?=(' + helpers.trie_regex(terms) + '))')
+    prefixes = helpers.word_prefixes(terms)
+
+    return regex, prefixes, opening
+
+
+def get_term_tagger(term_df):
+    '''Returns the compiled tagger for the passed table.'''
+
+    key = tuple(zip(term_df['term'], term_df['tagging']))
+    if key not in term_taggers:
+        term_taggers[key] = create_term_tagger(term_df)
+    return term_taggers[key]
+
+
+# contexts of a term in the order of the former replacements: (preceding character, following character)
+term_contexts = [(' ', ' '), (' ', ','), (' ', '.'), ('\n', ' '), ('\n', ',')]
+
+
+delete_term_rules = engine.compile_rules('S_11', 'delete_term', [
+    # deleting <term> within <bibl>
+    (r'(<bibl>[^<]*)<term key="\d+">([^<]+)</term>(([^<]|<cit[^>]+><form[^>]+><orth><hi[^<]+</hi></orth></form></cit>)+</bibl>)', r'\1\2\3'),
+    # deleting <term> within tags
+    (r'(<[^=]+="[^"^<]*)<term\skey="\d+">([^<]+)</term>([^"^<]*">)', r'\1\2\3'),
     # deleting <term> within date information
-    tei = re.sub(r'(<seg type="dateLabel">[^<]*)<term[^>]+>([^<]+)</term>(([^<]|<def>[^<]+</def>)*</seg>)', r'\1\2\3', tei)
-    tei = re.sub(r'(</date>,[^<]+)<term[^>]+>([^<]+)</term>([^<]*</usg>)', r'\1\2\3', tei)
-    
+    (r'(<seg type="dateLabel">[^<]*)<term[^>]+>([^<]+)</term>(([^<]|<def>[^<]+</def>)*</seg>)', r'\1\2\3'),
+    (r'(</date>,[^<]+)<term[^>]+>([^<]+)</term>([^<]*</usg>)', r'\1\2\3'),
+])
+
+
+def find_delete_start(rule, tei, pos, last_end):
+    '''Returns the only position at which the delete rule can match the <term> at 'pos' (or -1).
+       'last_end' is the end of the previous match of the rule, matches of a rule do not overlap.
+    '''
+
+    if rule.name == 'delete_term:2':
+        # '<' and '="' without '=' between, no '"', '^' or '<' between '="' and <term>
+        quote = max(tei.rfind('"', 0, pos), tei.rfind('^', 0, pos), tei.rfind('<', 0, pos))
+        if quote < 1 or tei[quote - 1:quote + 1] != '="':
+            return -1
+        equals = tei.rfind('=', 0, quote - 1)
+        return tei.find('<', max(equals + 1, last_end), quote - 2)
+
+    # the other rules start with the last tag in front of <term>
+    start = tei.rfind('<', 0, pos)
+    if start < last_end:
+        return -1
+    return start
+
+
+def delete_term(txt, tags):
+    '''Deletes the inserted <term> within <bibl>, within tags and within date information (see delete_term_rules).
+       Instead of searching the whole string, every rule is only tried at the position of the inserted tags.
+       'txt' is the string without the tags, 'tags' the tags selected by helpers.select_tags().
+    '''
+
+    tei, positions = helpers.insert_tags(txt, tags)
+    for rule in delete_term_rules:
+        deleted = set()
+        last_end = 0
+        for n, pos in enumerate(positions):
+            start = find_delete_start(rule, tei, pos, last_end)
+            if start == -1:
+                continue
+            match = rule.regex.match(tei, start)
+            if match and match.start(2) == pos + len(tags[n][2]):
+                deleted.add(n)
+                last_end = match.end()
+        if deleted:
+            tags = [tag for n, tag in enumerate(tags) if n not in deleted]
+            tei, positions = helpers.insert_tags(txt, tags)
+
+    return tei
+
+
+def tag_term(tei, term_df):
+    '''Annotates terms with <term key=""> using the table created by create_term_df().
+       All occurrences are found in one scan. Overlapping occurrences are decided in the order of the table
+       and the contexts (see term_contexts), so that the result equals replacing one term after the other.
+       Called by mark_term() and by S_17 for single entries.
+    '''
+
+    regex, prefixes, opening = get_term_tagger(term_df)
+
+    # collecting all occurrences: (rank, start of context, end of context, start, end, opening tag, closing tag)
+    candidates = []
+    for match in regex.finditer(tei):
+        start = match.start()
+        for i, term in prefixes[match[1]]:
+            end = start + len(term)
+            for n, (before, after) in enumerate(term_contexts):
+                if tei[start - 1] == before and tei[end:end + 1] == after:
+                    candidates.append((i * 5 + n, start - 1, end + 1, start, end, opening[term], '</term>'))
+
+    tags = helpers.select_tags(candidates)
+    tei = delete_term(tei, tags)
+
     return tei
 
 
@@ -13,31 +13,46 @@ Used package:
 
 import re
 import S_01_helpers as helpers
+import S_18_rule_engine as engine
 
 
 # === Functions ===
 
+relatedEntry_pattern = re.compile('<entry><p><form type="lemmaGroup">(<form[^>]+><orth>[^<]+(<hi[^<]+</hi>)?</orth></form>\s?<gramGrp>(<gram [^<]+</gram>)*</gramGrp>(</form>)?\,?\s?)+(<usg[^<]+</usg>)?(<sense><def[^<]+</def></sense>\s?)?<xr><lbl>↗</lbl><ref[^<]+<hi[^<]+(<hi[^<]+</hi>)?</hi></ref></xr>\.?</p></entry>')
+
+
+def type_relatedEntry_in_entry(entry):
+    '''Inserts attribute 'type="relatedEntry' into the <entry>-element if it is a referencing entry.'''
+    
+    if relatedEntry_pattern.fullmatch(entry):
+        entry = entry.replace(r'<entry>', r'<entry type="relatedEntry">')
+        # inserting <mark/> in order to mark referencing entries (necessary for finding beginning of etym section)
+        entry = entry.replace(r'</entry>', r'<mark/></entry>')
+    return entry
+
+
+type_relatedEntry_entry_rules = engine.compile_entry_rules('S_12', [type_relatedEntry_in_entry])
+
+
 def type_relatedEntry(tei):
     '''Inserts attribute 'type="relatedEntry' into <entry>-elements of referencing entries.'''
     
-    matches = re.finditer('<entry><p><form type="lemmaGroup">(<form[^>]+><orth>[^<]+(<hi[^<]+</hi>)?</orth></form>\s?<gramGrp>(<gram [^<]+</gram>)*</gramGrp>(</form>)?\,?\s?)+(<usg[^<]+</usg>)?(<sense><def[^<]+</def></sense>\s?)?<xr><lbl>↗</lbl><ref[^<]+<hi[^<]+(<hi[^<]+</hi>)?</hi></ref></xr>\.?</p></entry>', tei)
-    for match in matches:
-        repl = match[0].replace(r'<entry>', r'<entry type="relatedEntry">')
-        # inserting <mark/> in order to mark referencing entries (necessary for finding beginning of etym section)
-        repl = repl.replace(r'</entry>', r'<mark/></entry>')
-        tei = tei.replace(match[0], repl)
-    return tei
+    return engine.apply_entry_rules(tei, type_relatedEntry_entry_rules)
+
+
+delete_hi_rendition_rules = engine.compile_rules('S_12', 'delete_hi_rendition', [
+    # step 1: rename <hi rend="italics" und "superscript"> temporarily into <t>-tags
+    (r'<hi(\srend="superscript">[^<]+)</hi>', r'<t\1</t>'),
+    (r'<hi(\srend="italics">[^<]+((<t[^<]+</t>)?[^<]?)*)</hi>', r'<t\1</t>'),
+    # step 2: delete <hi rendition>-tags
+    (r'<hi rendition="font5"[^>]*>', ''),
+])
 
 
 def delete_hi_rendition(tei):
     '''Deletes remaining <hi>-tags with type="rendition".'''
     
-    # step 1: rename <hi rend="italics" und "superscript"> temporarily into <t>-tags
-    tei = re.sub(r'<hi(\srend="superscript">[^<]+)</hi>', r'<t\1</t>', tei)
-    tei = re.sub(r'<hi(\srend="italics">[^<]+((<t[^<]+</t>)?[^<]?)*)</hi>', r'<t\1</t>', tei)
-    
-    # step 2: delete <hi rendition>-tags
-    tei = re.sub(r'<hi rendition="font5"[^>]*>', '', tei)
+    tei = engine.apply_rules(tei, delete_hi_rendition_rules)
     tei = tei.replace('</hi>', '')
     
     # rename <t> into <hi>
@@ -47,40 +62,62 @@ def delete_hi_rendition(tei):
     return tei
 
 
-def mark_etym(tei):
-    '''Marks etymological section with '<etym type="undefined">'.'''
-    
+mark_etym_rules = engine.compile_rules('S_12', 'mark_etym', [
     # mark beginning:
-    tei = re.sub(r'((</date>)?</usg>\)(.|,)\s)', r'\1<etym type="undefined">', tei)
+    (r'((</date>)?</usg>\)(.|,)\s)', r'\1<etym type="undefined">'),
     # mark end
     # case 1: with following bibliographical section
-    tei = re.sub(r'(</p><note type="referencingSection">)', r'</etym>\1', tei)
+    (r'(</p><note type="referencingSection">)', r'</etym>\1'),
     # case 2: without following bibliographical section
-    tei = re.sub(r'(</p></entry>)', r'</etym>\1', tei)
+    (r'(</p></entry>)', r'</etym>\1'),
+])
+
+
+def mark_etym(tei):
+    '''Marks etymological section with '<etym type="undefined">'.'''
+    
+    tei = engine.apply_rules(tei, mark_etym_rules)
     
     # delete <mark/>
     tei = tei.replace('<mark/>', '')
     
     return tei
 
+
+rename_note_seg_rules = engine.compile_rules('S_12', 'rename_note_seg', [
+    (r'<note type="translation">', r'<seg type="translation">'),
+    (r'<trans/></note>', r'</seg>'),
+])
+
+
 def rename_note_seg(tei):
     '''Renames <note type="translation"> as <seg type="translation">'''
-    tei = re.sub(r'<note type="translation">', r'<seg type="translation">', tei)
-    tei = re.sub(r'<trans/></note>', r'</seg>', tei)
+    tei = engine.apply_rules(tei, rename_note_seg_rules)
     
     return tei
 
+
+rename_note_etym_rules = engine.compile_rules('S_12', 'rename_note_etym', [
+    (r'<note type="addition">', r'<seg type="addition"><etym type="undefined">'),
+    (r'<add/></note>', r'</etym></seg>'),
+])
+
+
 def rename_note_etym(tei):
     '''Renames <note type="addition"> as <seg type="addition"> and inserts <etym>'''
-    tei = re.sub(r'<note type="addition">', r'<seg type="addition"><etym type="undefined">', tei)
-    tei = re.sub(r'<add/></note>', r'</etym></seg>', tei)
+    tei = engine.apply_rules(tei, rename_note_etym_rules)
     
     return tei
 
 
+mark_bibl_note_rules = engine.compile_rules('S_12', 'mark_bibl_note', [
+    (r'(<bibl>[^<]+)(\([^\^\d)]+\))', r'\1<note type="bibl">\2</note>'),
+])
+
+
 def mark_bibl_note(tei):
     '''Inserts <note> around additons in <bibl>.'''
-    tei = re.sub(r'(<bibl>[^<]+)(\([^\^\d)]+\))', r'\1<note type="bibl">\2</note>', tei)
+    tei = engine.apply_rules(tei, mark_bibl_note_rules)
     
     return tei
 
@@ -94,97 +131,113 @@ def delete_p(tei):
     return tei
 
 
+mark_missing_orth_rules = engine.compile_rules('S_12', 'mark_missing_orth', [
+    (r'((?<!"entry">)(?<!<orth>)<hi rend="italics">[^<]+(<hi[^<]+</hi>)?[^<]*</hi>)', r'<cit type="etymologicalForm"><form xml:lang=""><orth>\1</orth></form></cit>'),
+])
+
+
 def mark_missing_orth(tei):
     ''' Adds missing <orth>-tags around word forms with <hi rend="superscript">.'''
     
-    tei = re.sub(r'((?<!"entry">)(?<!<orth>)<hi rend="italics">[^<]+(<hi[^<]+</hi>)?[^<]*</hi>)', r'<cit type="etymologicalForm"><form xml:lang=""><orth>\1</orth></form></cit>', tei)
+    tei = engine.apply_rules(tei, mark_missing_orth_rules)
     return tei
 
 
+correct_cit_rules = engine.compile_rules('S_12', 'correct_cit', [
+    # single character in <cit> followed by hyphen + certain strings
+    (r'<cit type="etymologicalForm"><form xml:lang="xxx"><orth><hi rend="italics">(\w)</hi></orth></form></cit>(-(Suffix|Präfix|Ableitung|Bildung|Stufe|Stamm|stämmig))', r'<mark>\1</mark>\2'),
+    (r'<cit type="etymologicalForm"><form xml:lang="xxx"><orth><hi rend="italics">(\w-)</hi></orth></form></cit>((Suffix|Präfix|Ableitung|Bildung|Stufe|Stamm|stämmig))', r'<mark>\1</mark>\2'),
+    # s mobile
+    (r'<cit type="etymologicalForm"><form xml:lang="xxx"><orth><hi rend="italics">(s mobile)</hi></orth></form></cit>', r'<mark>\1</mark>'),
+    (r'<cit type="etymologicalForm"><form xml:lang="xxx"><orth><hi rend="italics">(s)</hi></orth></form></cit>(mobile)', r'<mark>\1</mark>\2'),
+])
+
+
 def correct_cit(tei):
     ''' Deletes <cit>, <form> and <orth> in case of mistaken word forms.'''
 
-    # single character in <cit> followed by hyphen + certain strings
-    tei = re.sub(r'<cit type="etymologicalForm"><form xml:lang="xxx"><orth><hi rend="italics">(\w)</hi></orth></form></cit>(-(Suffix|Präfix|Ableitung|Bildung|Stufe|Stamm|stämmig))', r'<mark>\1</mark>\2', tei)
-    tei = re.sub(r'<cit type="etymologicalForm"><form xml:lang="xxx"><orth><hi rend="italics">(\w-)</hi></orth></form></cit>((Suffix|Präfix|Ableitung|Bildung|Stufe|Stamm|stämmig))', r'<mark>\1</mark>\2', tei)
-    
-    # s mobile
-    tei = re.sub(r'<cit type="etymologicalForm"><form xml:lang="xxx"><orth><hi rend="italics">(s mobile)</hi></orth></form></cit>', r'<mark>\1</mark>', tei)
-    tei = re.sub(r'<cit type="etymologicalForm"><form xml:lang="xxx"><orth><hi rend="italics">(s)</hi></orth></form></cit>(mobile)', r'<mark>\1</mark>\2', tei)
+    tei = engine.apply_rules(tei, correct_cit_rules)
     
     return tei
 
 
-def delete_hi_cit_ref(tei):
-    '''Deletes '<hi rend="italics">' in <cit> and <ref>.'''
-    
+delete_hi_cit_ref_rules = engine.compile_rules('S_12', 'delete_hi_cit_ref', [
     # step 1: rename <hi rend="superscript"> into <temp>:
-    tei = re.sub(r'<hi rend="superscript">([^<]+)</hi>', r'<temp>\1</temp>', tei)
-    
+    (r'<hi rend="superscript">([^<]+)</hi>', r'<temp>\1</temp>'),
     # step 2: delete remaining <hi>-tags
-    tei = re.sub(r'<hi rend="italics">', '', tei)
-    tei = re.sub(r'</hi>', r'', tei)
-    
+    (r'<hi rend="italics">', ''),
+    (r'</hi>', r''),
     # step 3: rename <temp> into <hi>
-    tei = re.sub(r'<temp>', r'<hi rend="superscript">', tei)
-    tei = re.sub(r'</temp>', r'</hi>', tei)
-    tei = re.sub(r'<mark>', r'<hi rend="italics">', tei)
-    tei = re.sub(r'</mark>', r'</hi>', tei)
+    (r'<temp>', r'<hi rend="superscript">'),
+    (r'</temp>', r'</hi>'),
+    (r'<mark>', r'<hi rend="italics">'),
+    (r'</mark>', r'</hi>'),
+])
+
+
+def delete_hi_cit_ref(tei):
+    '''Deletes '<hi rend="italics">' in <cit> and <ref>.'''
+    
+    tei = engine.apply_rules(tei, delete_hi_cit_ref_rules)
 
     return tei
 
 
+correct_dateGroup_rules = engine.compile_rules('S_12', 'correct_dateGroup', [
+    # case 1a: one date (standard)
+    (r'(?P<begin><usg type="time" ana="date">)<date>(?P<firstOcc><date type="firstOccurrence[^>]+>\d+. Jh.</date>)</date>(?P<end></usg>)', r'\g<begin>\g<firstOcc>\g<end>'),
+    # case 1b: one date +  additional text/word form/meaning
+    (r'(?P<begin><usg[^>]+>)<date>(?P<first><date[^<]+</date>)</date>(?P<end>,\s([^<]|<cit[^>]+><form[^>]+><orth[^<]+</orth></form></cit>)+)</usg>', r'\g<begin>\g<first></usg>\g<end>'),
+    # case 2a: two dates + etymological form + possibly meaning/additional text
+    (r'(?P<begin><usg[^>]+>)<date>(?P<firstOcc><date[^>]+>\d+. Jh.</date>)</date>(?P<sep>,\s)<date><seg type="dateLabel">\s*(?P<cit>[^<]*<cit[^>]+><form xml:lang[^<]+><orth>[^<]+</orth></form></cit>\.?)(?P<def><def>[^<]+</def>)*\s*</seg>(?P<second><date[^>]+>\s*\d+. Jh.</date>)</date>(?P<end></usg>)', r'\g<begin>\g<firstOcc></usg>\g<sep>\g<cit>\g<def>\g<begin>\g<second>\g<end>'),
+    # case 2b: two dates + Label "Form"/explication/meaning
+    (r'(?P<begin><usg[^>]+>)<date>(?P<firstOcc><date[^>]+>\d+. Jh.</date>)</date>(?P<sep>,\s)<date><seg type="dateLabel">(?P<form>([^<]|<term[^<]+</term>|<def[^<]+</def>)+)</seg>(?P<second>\s*<date[^>]+>\s*\d+. Jh.</date>)</date>(?P<end></usg>)', r'\g<begin>\g<firstOcc></usg>\g<sep>\g<form>\g<begin>\g<second>\g<end>'),
+    # case 2c: two dates: language as label
+    (r'(?P<begin><usg[^>]+>)<date>(?P<firstOcc><date[^>]+>\d+. Jh.</date>)</date>(?P<sep>,\s)<date><seg type="dateLabel">(?P<label>\s*<lang[^<]+</lang>)</seg>(?P<second>\s*<date[^>]+>\s*\d+. Jh.</date>)</date>(?P<end></usg>)', r'\g<begin>\g<firstOcc></usg>\g<sep>\g<label>\g<begin>\g<second>\g<end>'),
+    # case 3: missing date
+    (r'(<usg type="time" ana="date">)<date>(<date type="firstOccurrence">-</date>)</date>(</usg>)', r'\1\2\3'),
+    # moving <lang> into <usg>
+    (r'(<lang[^<]+</lang>)(<usg type="time"\sana="date">)', r'\2\1'),
+])
+
+
 def correct_dateGroup(tei):
     '''
     Modifies date annotation. <seg> ist deleted, each <date> is embedded in its own <usg>.
     Changes are necessary because during the annotation process it became clear that <def>
     isn't allowed within <seg> or <usg>.
     '''
-    # case 1a: one date (standard)
-    tei = re.sub(r'(?P<begin><usg type="time" ana="date">)<date>(?P<firstOcc><date type="firstOccurrence[^>]+>\d+. Jh.</date>)</date>(?P<end></usg>)', r'\g<begin>\g<firstOcc>\g<end>', tei)
-    
-    # case 1b: one date +  additional text/word form/meaning
-    tei = re.sub(r'(?P<begin><usg[^>]+>)<date>(?P<first><date[^<]+</date>)</date>(?P<end>,\s([^<]|<cit[^>]+><form[^>]+><orth[^<]+</orth></form></cit>)+)</usg>', r'\g<begin>\g<first></usg>\g<end>', tei)
-    
-    # case 2a: two dates + etymological form + possibly meaning/additional text 
-    tei = re.sub(r'(?P<begin><usg[^>]+>)<date>(?P<firstOcc><date[^>]+>\d+. Jh.</date>)</date>(?P<sep>,\s)<date><seg type="dateLabel">\s*(?P<cit>[^<]*<cit[^>]+><form xml:lang[^<]+><orth>[^<]+</orth></form></cit>\.?)(?P<def><def>[^<]+</def>)*\s*</seg>(?P<second><date[^>]+>\s*\d+. Jh.</date>)</date>(?P<end></usg>)', r'\g<begin>\g<firstOcc></usg>\g<sep>\g<cit>\g<def>\g<begin>\g<second>\g<end>', tei)  
-    
-    # case 2b: two dates + Label "Form"/explication/meaning 
-    tei = re.sub(r'(?P<begin><usg[^>]+>)<date>(?P<firstOcc><date[^>]+>\d+. Jh.</date>)</date>(?P<sep>,\s)<date><seg type="dateLabel">(?P<form>([^<]|<term[^<]+</term>|<def[^<]+</def>)+)</seg>(?P<second>\s*<date[^>]+>\s*\d+. Jh.</date>)</date>(?P<end></usg>)', r'\g<begin>\g<firstOcc></usg>\g<sep>\g<form>\g<begin>\g<second>\g<end>', tei)
-    
-    # case 2c: two dates: language as label
-    tei = re.sub(r'(?P<begin><usg[^>]+>)<date>(?P<firstOcc><date[^>]+>\d+. Jh.</date>)</date>(?P<sep>,\s)<date><seg type="dateLabel">(?P<label>\s*<lang[^<]+</lang>)</seg>(?P<second>\s*<date[^>]+>\s*\d+. Jh.</date>)</date>(?P<end></usg>)', r'\g<begin>\g<firstOcc></usg>\g<sep>\g<label>\g<begin>\g<second>\g<end>', tei)
-    
-    # case 3: missing date
-    tei = re.sub(r'(<usg type="time" ana="date">)<date>(<date type="firstOccurrence">-</date>)</date>(</usg>)', r'\1\2\3', tei)
-    
-    # moving <lang> into <usg>
-    tei = re.sub(r'(<lang[^<]+</lang>)(<usg type="time"\sana="date">)', r'\2\1', tei)
+    tei = engine.apply_rules(tei, correct_dateGroup_rules)
     
     return tei
 
 
+correct_lemmaGroup_rules = engine.compile_rules('S_12', 'correct_lemmaGroup', [
+    (r'(<form type="lemmaGroup"><form type="lemma"><orth>Leumund </orth></form>)(\(durch <cit type="etymologicalForm"><form[^>]+><orth>Ruf </orth></form></cit>\[<xr><lbl>↗</lbl><ref[^>]+>rufen</ref></xr>\] ersetzt\) <gramGrp><gram[^>]+>S</gram><gram[^>]+>m</gram></gramGrp>)</form>', r'\1</form>\2'),
+])
+
+
 def correct_lemmaGroup(tei):
     '''special case entry 'Leumund': lemmaGroup is interrupted by addition with reference;
        limits of lemmaGroup have to be moved because <xr> isn't permitted in <form>.
     '''
-    tei = re.sub(r'(<form type="lemmaGroup"><form type="lemma"><orth>Leumund </orth></form>)(\(durch <cit type="etymologicalForm"><form[^>]+><orth>Ruf </orth></form></cit>\[<xr><lbl>↗</lbl><ref[^>]+>rufen</ref></xr>\] ersetzt\) <gramGrp><gram[^>]+>S</gram><gram[^>]+>m</gram></gramGrp>)</form>', r'\1</form>\2', tei)
+    tei = engine.apply_rules(tei, correct_lemmaGroup_rules)
     return tei
 
 
-def mark_section(tei):
-    ''' Annotates the complete section 'L' with '<div xml:id="L" type="section">' and inserts '<head>L</head>'.'''
+def mark_section(tei, section="L"):
+    ''' Annotates the complete section (e.g. 'L') with '<div xml:id="L" type="section">' and inserts '<head>L</head>'.'''
     
-    tei = tei.replace('<body>', '<body><div xml:id="L" type="section"><head>L</head>')
+    tei = tei.replace('<body>', '<body><div xml:id="' + section + '" type="section"><head>' + section + '</head>')
     tei = tei.replace('</body>', '</div></body>')
     
     return tei
     
     
-# === Coordinating function ===    
+# === Coordinating functions ===    
     
-def main(tei):
-    print("--- 12_finish_markup.py running")
+def markup(tei, section="L"):
+    '''Applies all rules of this script in their order (called by main() and by S_17 for single entries).'''
     tei = type_relatedEntry(tei)
     tei = delete_hi_rendition(tei)
     tei = mark_etym(tei)
@@ -197,6 +250,12 @@ def main(tei):
     tei = delete_hi_cit_ref(tei)
     tei = correct_dateGroup(tei)
     tei = correct_lemmaGroup(tei)
-    tei = mark_section(tei)
+    tei = mark_section(tei, section)
+    return tei
+
+
+def main(tei, section="L"):
+    print("--- 12_finish_markup.py running")
+    tei = markup(tei, section)
     print("... done!")
     return tei
\ No newline at end of file
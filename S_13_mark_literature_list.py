@@ -4,7 +4,7 @@ SCRIPT 13:
 Script for turning the Finereader-output of chapter "Abgekürzt zitierte Literatur" (TXT file) into XML-TEI and assigning xml:ids to each bibliographical entry. 
 
 Input: chapter "Abgekürzt zitierte Literatur" as TXT file
-Output: chapter as XML-TEI file
+Output: chapter as XML-TEI file, index of the list used by script 15 (see S_25)
 
 Used package:
     re (see: https://docs.python.org/3/library/re.html)
@@ -14,6 +14,8 @@ Used package:
 
 import re
 import S_01_helpers as helpers
+import S_18_rule_engine as engine
+import S_25_bibliography as bibliography
 
 
 # === Functions ===
@@ -31,126 +33,136 @@ def mark_head_desc(txt):
     
     return txt
 
-def mark_author(txt):
-    '''Annotates author name.'''
+
+mark_author_rules = engine.compile_rules('S_13', 'mark_author', [
     # standard case
-    txt = re.sub(r'(<bibl>)(?P<author>([^,^=^\n]+,)+(\s[^\.]+\.)+)(?P<after>(\s*\(\d+(\/\d+)?(\sf{0,2}\.)?\))?:)', r'\1<author>\g<author></author>\g<after>', txt)
+    (r'(<bibl>)(?P<author>([^,^=^\n]+,)+(\s[^\.]+\.)+)(?P<after>(\s*\(\d+(\/\d+)?(\sf{0,2}\.)?\))?:)', r'\1<author>\g<author></author>\g<after>'),
     # addition in '()' behind author name
-    txt = re.sub(r'(<bibl>(?!FS))(?P<author>[^\(^\n^:^<]+)(?P<after>(\s\([^\)]+\))+:)', r'\1<author>\g<author></author>\g<after>', txt)
+    (r'(<bibl>(?!FS))(?P<author>[^\(^\n^:^<]+)(?P<after>(\s\([^\)]+\))+:)', r'\1<author>\g<author></author>\g<after>'),
     # behind short title
-    txt = re.sub(r'(<bibl>)(?P<short>[^=^\n^>]+)=(?P<author>([^,^=^\n^\.]+,)+(\s[^\.]+\.)+)\:', r'<bibl><title type="short">\g<short></title>=<author>\g<author></author>:', txt)
-    # first name with hyphen 
-    txt = re.sub(r'(<bibl>)(?P<author>([^,^=^\n]+,)+(\s([^\.]\.\-?)+))(?P<after>(\s*\(\d+(\sf{0,2}\.)?\))?:)', r'\1<author>\g<author></author>\g<after>', txt)
+    (r'(<bibl>)(?P<short>[^=^\n^>]+)=(?P<author>([^,^=^\n^\.]+,)+(\s[^\.]+\.)+)\:', r'<bibl><title type="short">\g<short></title>=<author>\g<author></author>:'),
+    # first name with hyphen
+    (r'(<bibl>)(?P<author>([^,^=^\n]+,)+(\s([^\.]\.\-?)+))(?P<after>(\s*\(\d+(\sf{0,2}\.)?\))?:)', r'\1<author>\g<author></author>\g<after>'),
     # no first name
-    txt = re.sub(r'<bibl>([^:^.^,^=^\s]+):', r'<bibl><author>\1</author>:', txt)
+    (r'<bibl>([^:^.^,^=^\s]+):', r'<bibl><author>\1</author>:'),
     # complete first name
-    txt = re.sub(r'(<bibl>(?!(FS|GS)))(?P<author>([^,^<^=^\(]+(\,\s)?){2}):', r'\1<author>\g<author></author>:', txt)
+    (r'(<bibl>(?!(FS|GS)))(?P<author>([^,^<^=^\(]+(\,\s)?){2}):', r'\1<author>\g<author></author>:'),
     # two authors
-    txt = re.sub(r'<bibl>(?P<a1><author>[^,]+,(\s\w\.)+)\,(?P<a2>[^,]+,(\s\w\.)+</author>)', r'<bibl>\g<a1></author>,<author>\g<a2>', txt)
+    (r'<bibl>(?P<a1><author>[^,]+,(\s\w\.)+)\,(?P<a2>[^,]+,(\s\w\.)+</author>)', r'<bibl>\g<a1></author>,<author>\g<a2>'),
     # three authors
-    txt = re.sub(r'(?P<a1><author>\s*[^,]+,(\s\w\.)+)\,(?P<a2>\s*[^,]+,(\s\w\.)+)\,(?P<a3>\s*[^,]+,(\s\w\.)+</author>)', r'\g<a1></author>,<author>\g<a2></author>,<author>\g<a3>', txt)
+    (r'(?P<a1><author>\s*[^,]+,(\s\w\.)+)\,(?P<a2>\s*[^,]+,(\s\w\.)+)\,(?P<a3>\s*[^,]+,(\s\w\.)+</author>)', r'\g<a1></author>,<author>\g<a2></author>,<author>\g<a3>'),
+])
+
+
+def mark_author(txt):
+    '''Annotates author name.'''
+    txt = engine.apply_rules(txt, mark_author_rules)
     
     return txt
 
-def mark_editor(txt):
-    ''' Annotates the editor name when collected works are listed individually.'''
 
-    txt = re.sub(r'(<bibl>)(?P<editor>([^,^=^\^<]+,)+(\s[^\.^<]+\.)+)(\s\(Hrsg\.\))', r'\1<editor>\g<editor></editor>\5', txt)
-    
+mark_editor_rules = engine.compile_rules('S_13', 'mark_editor', [
+    (r'(<bibl>)(?P<editor>([^,^=^\^<]+,)+(\s[^\.^<]+\.)+)(\s\(Hrsg\.\))', r'\1<editor>\g<editor></editor>\5'),
     # change <author> to <editor> when 'Hrsg.' is mentioned
     # three editors
-    txt = re.sub(r'<author>([^<]+)</author>,<author>([^<]+)</author>,<author>([^<]+)</author>(\s\(Hrsg\.\))', r'<editor>\1</editor>,<editor>\2</editor><editor>\3</editor>\4', txt)
+    (r'<author>([^<]+)</author>,<author>([^<]+)</author>,<author>([^<]+)</author>(\s\(Hrsg\.\))', r'<editor>\1</editor>,<editor>\2</editor><editor>\3</editor>\4'),
     # two editors
-    txt = re.sub(r'<author>([^<]+)</author>,<author>([^<]+)</author>(\s\(Hrsg\.\))', r'<editor>\1</editor>,<editor>\2</editor>\3', txt)
+    (r'<author>([^<]+)</author>,<author>([^<]+)</author>(\s\(Hrsg\.\))', r'<editor>\1</editor>,<editor>\2</editor>\3'),
     # one editor
-    txt = re.sub(r'<author>([^<]+)</author>(\s\(Hrsg\.\))', r'<editor>\1</editor>\2', txt)
-    
+    (r'<author>([^<]+)</author>(\s\(Hrsg\.\))', r'<editor>\1</editor>\2'),
     # split multiple editors
-    txt = re.sub(r'<bibl>(?P<e1><editor>[^,]+,(\s\w+\.)+)\,(?P<e2>[^,]+,(\s\w+\.)+</editor>)', r'<bibl>\g<e1></editor><editor>\g<e2>', txt)
-    txt = re.sub(r'<bibl>(?P<e1><editor>[^,]+,(\s\w+\.)+)\,(?P<e2>[^,]+,(\s\w+\.)+\,)(?P<e3>[^,]+,(\s\w+\.)+</editor>)', r'<bibl>\g<e1></editor><editor>\g<e2></editor><editor>\g<e3>', txt)
+    (r'<bibl>(?P<e1><editor>[^,]+,(\s\w+\.)+)\,(?P<e2>[^,]+,(\s\w+\.)+</editor>)', r'<bibl>\g<e1></editor><editor>\g<e2>'),
+    (r'<bibl>(?P<e1><editor>[^,]+,(\s\w+\.)+)\,(?P<e2>[^,]+,(\s\w+\.)+\,)(?P<e3>[^,]+,(\s\w+\.)+</editor>)', r'<bibl>\g<e1></editor><editor>\g<e2></editor><editor>\g<e3>'),
+])
+
+
+def mark_editor(txt):
+    ''' Annotates the editor name when collected works are listed individually.'''
+
+    txt = engine.apply_rules(txt, mark_editor_rules)
     
     return txt
 
 
-def mark_title(txt):
-    ''' Annotates the title.'''
-    
+mark_title_rules = engine.compile_rules('S_13', 'mark_title', [
     # title if work is part of a collection or periodical
-    txt = re.sub(r'(?P<before></author>(\s*\(\d+(\/\d+)?(\sf{0,2}\.)?\))?:)(?P<title>\s[^\.]+)(?P<after>\.\sIn:)', r'\g<before><title type="main">\g<title></title>\g<after>', txt)
-    
-    # the title is followed by a certain string 
-    txt = re.sub(r'(?P<before></author>(\s*\(\d+(\/\d+)?(\sf{0,2}\.)?\))?:)(?P<title>\s[^<]+)(?P<after>\.\s(\d+\.\s(\w+\s)?Aufl|Bd\.|\d\sBde|FS|Teil|hrsg))', r'\g<before><title type="main">\g<title></title>\g<after>', txt)
-
+    (r'(?P<before></author>(\s*\(\d+(\/\d+)?(\sf{0,2}\.)?\))?:)(?P<title>\s[^\.]+)(?P<after>\.\sIn:)', r'\g<before><title type="main">\g<title></title>\g<after>'),
+    # the title is followed by a certain string
+    (r'(?P<before></author>(\s*\(\d+(\/\d+)?(\sf{0,2}\.)?\))?:)(?P<title>\s[^<]+)(?P<after>\.\s(\d+\.\s(\w+\s)?Aufl|Bd\.|\d\sBde|FS|Teil|hrsg))', r'\g<before><title type="main">\g<title></title>\g<after>'),
     # title follows author
-    txt = re.sub(r'(?P<before></author>(\s*\(\d+(\/\d+)?(\sf{0,2}\.)?\))?:)(?P<title>[^<]+)(?P<after>\.(\s[^\d^\.]+(u\.\sa\.)?\s\d{4}(\sf{0,2}|\/\d+)?\.))', r'\g<before><title type="main">\g<title></title>\g<after>', txt)
-    
+    (r'(?P<before></author>(\s*\(\d+(\/\d+)?(\sf{0,2}\.)?\))?:)(?P<title>[^<]+)(?P<after>\.(\s[^\d^\.]+(u\.\sa\.)?\s\d{4}(\sf{0,2}|\/\d+)?\.))', r'\g<before><title type="main">\g<title></title>\g<after>'),
     # pattern short title = main title, "Hrsg." / "Bearbeitet von"
-    txt = re.sub(r'(<bibl>)(?P<short>[^=^\n^>^\(]+)=(?P<main>.*?)(?P<after>\.\s(Hrsg|Bearbeitet))', r'\1<title type="short">\g<short></title>=<title type="main">\g<main></title>\g<after>', txt)
+    (r'(<bibl>)(?P<short>[^=^\n^>^\(]+)=(?P<main>.*?)(?P<after>\.\s(Hrsg|Bearbeitet))', r'\1<title type="short">\g<short></title>=<title type="main">\g<main></title>\g<after>'),
     # pattern short title = main title, followed by indicating the volume
-    txt = re.sub(r'(<bibl>)(?P<short>[^=^\n^>^(]+)=(?P<main>[^<^>]*?)(?P<after>\.\s(Bd|I))', r'\1<title type="short">\g<short></title>=<title type="main">\g<main></title>\g<after>', txt)
+    (r'(<bibl>)(?P<short>[^=^\n^>^(]+)=(?P<main>[^<^>]*?)(?P<after>\.\s(Bd|I))', r'\1<title type="short">\g<short></title>=<title type="main">\g<main></title>\g<after>'),
     # pattern short title = main title, followed by place and year
-    txt = re.sub(r'(<bibl>)(?P<short>[^=^<^\.]+)=(?P<main>[^<]+)(?P<after>\.\s[^\d^]+\d+(\sf{1,2})?.(\s*\([^\)]+\)\.?)?</bibl>)', r'\1<title type="short">\g<short></title>=<title type="main">\g<main></title>\g<after>', txt)
-   
+    (r'(<bibl>)(?P<short>[^=^<^\.]+)=(?P<main>[^<]+)(?P<after>\.\s[^\d^]+\d+(\sf{1,2})?.(\s*\([^\)]+\)\.?)?</bibl>)', r'\1<title type="short">\g<short></title>=<title type="main">\g<main></title>\g<after>'),
     # special case 'Freiburg/Br.' + 'Halle/S.' (placename ends with point)
-    txt = re.sub(r'(?P<before></author>(\s\(\d{4}(\sf{0,2}f\.)?\))?:)(?P<title>[^<]+)(?P<after>\.\s(Freiburg/Br|Halle/S)\.\s\d{4}\.</bibl>)', r'\g<before><title type="main">\g<title></title>\g<after>', txt)
-
-    # title follows "Hrsg." and is limited by "Aufl" or "Bd." 
-    txt = re.sub(r'(\(Hrsg\.\)(\s\(\d+\))?:)(?P<title>[^<]+)(?P<after>\.\s(\d\.\sAufl|Bd\.))', r'\1<title type="main">\g<title></title>\g<after>', txt)
+    (r'(?P<before></author>(\s\(\d{4}(\sf{0,2}f\.)?\))?:)(?P<title>[^<]+)(?P<after>\.\s(Freiburg/Br|Halle/S)\.\s\d{4}\.</bibl>)', r'\g<before><title type="main">\g<title></title>\g<after>'),
+    # title follows "Hrsg." and is limited by "Aufl" or "Bd."
+    (r'(\(Hrsg\.\)(\s\(\d+\))?:)(?P<title>[^<]+)(?P<after>\.\s(\d\.\sAufl|Bd\.))', r'\1<title type="main">\g<title></title>\g<after>'),
     # title follows "Hrsg."
-    txt = re.sub(r'(\(Hrsg\.\)(\s\(\d+\))?:)([^<]+)(?P<after>\.(\s[^\d^\.]+\s\d{4}\.))', r'\1<title type="main">\3</title>\g<after>', txt)
-    
-    # behind text in '()' followed by volume 
-    txt = re.sub(r'(?P<before></author>(\s*\([^\)]+\)):)(?P<title>\s[^\.]+)(?P<after>\.\s(\d|Bd|Hrsg))', r'\g<before><title type="main">\g<title></title>\g<after>', txt)
-    # behind place + year + volume 
-    txt = re.sub(r'(</author>:)([^\.^<]+)(\.\s[^\(]+([^\(^<]+\(\d{4}\)[.,]\s?)+)', r'\1<title type="main">\2</title>\3', txt)
+    (r'(\(Hrsg\.\)(\s\(\d+\))?:)([^<]+)(?P<after>\.(\s[^\d^\.]+\s\d{4}\.))', r'\1<title type="main">\3</title>\g<after>'),
+    # behind text in '()' followed by volume
+    (r'(?P<before></author>(\s*\([^\)]+\)):)(?P<title>\s[^\.]+)(?P<after>\.\s(\d|Bd|Hrsg))', r'\g<before><title type="main">\g<title></title>\g<after>'),
+    # behind place + year + volume
+    (r'(</author>:)([^\.^<]+)(\.\s[^\(]+([^\(^<]+\(\d{4}\)[.,]\s?)+)', r'\1<title type="main">\2</title>\3'),
     # behind place + year text in '()'
-    txt = re.sub(r'(?P<before></author>(\s*\(\d+(\/\d+)?(\sf{0,2}\.)?\))?:)(?P<title>[^<]+)(?P<after>\.(\s[^\d^\.]+\s\d{4})\s\([^\)]+\)\.</bibl>)', r'\g<before><title type="main">\g<title></title>\g<after>', txt)
-    
-    # editor behind title 
-    txt = re.sub(r'(</author>(\s\([^\)]+\))*:)([^\n^<]+)((hrsg\.|Hrsg\.))', r'\1<title type="main">\3</title>\4', txt)
-    
-    # without author + followed by 'Hrsg.' 
-    txt = re.sub(r'(<bibl>)([^:^\n^<]+)(\.\sHrsg\.)', r'\1<title type="main">\2</title>\3', txt)
+    (r'(?P<before></author>(\s*\(\d+(\/\d+)?(\sf{0,2}\.)?\))?:)(?P<title>[^<]+)(?P<after>\.(\s[^\d^\.]+\s\d{4})\s\([^\)]+\)\.</bibl>)', r'\g<before><title type="main">\g<title></title>\g<after>'),
+    # editor behind title
+    (r'(</author>(\s\([^\)]+\))*:)([^\n^<]+)((hrsg\.|Hrsg\.))', r'\1<title type="main">\3</title>\4'),
+    # without author + followed by 'Hrsg.'
+    (r'(<bibl>)([^:^\n^<]+)(\.\sHrsg\.)', r'\1<title type="main">\2</title>\3'),
     # without author
-    txt = re.sub(r'(<bibl>)([^:^\n^<]+)(\.[^\d]+\d{4}\.</bibl>)', r'\1<title type="main">\2</title>\3', txt)
-    
+    (r'(<bibl>)([^:^\n^<]+)(\.[^\d]+\d{4}\.</bibl>)', r'\1<title type="main">\2</title>\3'),
     # English citation: withour author, with "ed."
-    txt = re.sub(r'(<bibl>)([^\n^<]+)(\.\sEd\.)', r'\1<title type="main">\2</title>\3', txt)
+    (r'(<bibl>)([^\n^<]+)(\.\sEd\.)', r'\1<title type="main">\2</title>\3'),
     # special cases: limits of title can't be identified automatically
-    txt = re.sub(r'(Studies in the Kinship Terminology of the Indo-European Languages. Acta Iranica. Textes et Memoires VII)', r'<title type="main">\1</title>', txt)
-    txt = re.sub(r'(Wörterbuch der deutschen Tiernamen)', r'<title type="main">\1</title>', txt)
-   
+    (r'(Studies in the Kinship Terminology of the Indo-European Languages. Acta Iranica. Textes et Memoires VII)', r'<title type="main">\1</title>'),
+    (r'(Wörterbuch der deutschen Tiernamen)', r'<title type="main">\1</title>'),
     ### Festschriften
-    # title followed by 'Hrsg.' or 'Bd.' 
-    txt = re.sub(r'(<bibl>)((FS|GS)(.*?))(\.\s(Hrsg.|Bd))', r'\1<title type="main">\2</title>\5', txt)
+    # title followed by 'Hrsg.' or 'Bd.'
+    (r'(<bibl>)((FS|GS)(.*?))(\.\s(Hrsg.|Bd))', r'\1<title type="main">\2</title>\5'),
     # standard case FS
-    txt = re.sub(r'(<bibl>)((FS|GS)(.*?))(\.\s[^\d\.]+\d{4}\.</bibl>)', r'\1<title type="main">\2</title>\5', txt)
+    (r'(<bibl>)((FS|GS)(.*?))(\.\s[^\d\.]+\d{4}\.</bibl>)', r'\1<title type="main">\2</title>\5'),
     # without place/year
-    txt = re.sub(r'(<bibl>)((FS|GS)[^<^\d]+)(</bibl>)', r'\1<title type="main">\2</title>\4', txt)
-    # behind place/year additional text 
-    txt = re.sub(r'(<bibl>)((FS|GS)(.*?))(\.\s[^\d\.]+\d{4}\.?[^<]+</bibl>)', r'\1<title type="main">\2</title>\5', txt)
+    (r'(<bibl>)((FS|GS)[^<^\d]+)(</bibl>)', r'\1<title type="main">\2</title>\4'),
+    # behind place/year additional text
+    (r'(<bibl>)((FS|GS)(.*?))(\.\s[^\d\.]+\d{4}\.?[^<]+</bibl>)', r'\1<title type="main">\2</title>\5'),
     # special cases: places "Horn/N.-Ö." and "Halle/S."
-    txt = re.sub(r'(<bibl>)(FS(.*?))(\.\s(Horn/N.-Ö.|Halle\/S\.)\s\d{4}\.</bibl>)', r'\1<title type="main">\2</title>\4', txt)
-   
+    (r'(<bibl>)(FS(.*?))(\.\s(Horn/N.-Ö.|Halle\/S\.)\s\d{4}\.</bibl>)', r'\1<title type="main">\2</title>\4'),
     # title ends with '?'
-    txt = re.sub(r'(?P<before></author>(\s\(\d{4}(\sf{0,2}f\.)?\))?:)(?P<title>.*?\?)(?P<after>(\s[^\d^\.]+\s\d{4}(\sf{0,2})?\.))', r'\g<before><title type="main">\g<title></title>\g<after>', txt)
+    (r'(?P<before></author>(\s\(\d{4}(\sf{0,2}f\.)?\))?:)(?P<title>.*?\?)(?P<after>(\s[^\d^\.]+\s\d{4}(\sf{0,2})?\.))', r'\g<before><title type="main">\g<title></title>\g<after>'),
+])
+
+
+def mark_title(txt):
+    ''' Annotates the title.'''
+    
+    txt = engine.apply_rules(txt, mark_title_rules)
     
     return txt
 
+
+add_date_rules = engine.compile_rules('S_13', 'add_date', [
+    # author
+    (r'(<bibl><author>[^<]+</author>\s)(?P<date>\(\d+\/?(\sf{1,2}\.)?\d*\))', r'\1<date>\g<date></date>'),
+    # editor
+    (r'(<bibl><editor>[^<]+</editor>\s\(Hrsg\.\)\s)(?P<date>\(\d+\/?(\sf{1,2}\.)?\d*\))', r'\1<date>\g<date></date>'),
+])
+
+
 def add_date(txt):
     ''' Annotates the publication year when the list contains more than one work of a certain author/editor.'''
     
-    # author
-    txt = re.sub(r'(<bibl><author>[^<]+</author>\s)(?P<date>\(\d+\/?(\sf{1,2}\.)?\d*\))', r'\1<date>\g<date></date>', txt)
-    # editor
-    txt = re.sub(r'(<bibl><editor>[^<]+</editor>\s\(Hrsg\.\)\s)(?P<date>\(\d+\/?(\sf{1,2}\.)?\d*\))', r'\1<date>\g<date></date>', txt)
+    txt = engine.apply_rules(txt, add_date_rules)
     
     return txt
 
 
 # === Coordinating function ===
 
-def main(literature_file, literature_header):
+def main(literature_file, literature_header, literature_xml="literature.xml"):
     print("--- 13_mark_literature_list.py running")
     txt = helpers.read_file(literature_file)
     txt = helpers.change_brackets(txt)
@@ -163,6 +175,6 @@ def main(literature_file, literature_header):
     txt = add_date(txt)
     txt = helpers.add_bibl_id(txt, 1)
     xml = helpers.transform2xml(txt, literature_header)
-    helpers.save_file(xml, "literature.xml")
+    bibliography.put_list(literature_xml, xml, bibliography.literature_index(helpers.parse_xml(xml)))
     print("... done!")
    
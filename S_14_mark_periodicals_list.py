@@ -4,7 +4,7 @@ SCRIPT 14:
 Script for turning the Finereader-output of chapter "Abkürzungen der Zeitschriften und Reihen" (TXT file) into XML-TEI and assigning xml:ids to each bibliographical entry. 
 
 Input: chapter "Abkürzungen der Zeitschriften und Reihen" as TXT file
-Output: chapter as XML-TEI file
+Output: chapter as XML-TEI file, index of the list used by script 15 (see S_25)
 
 Used package:
     re (see: https://docs.python.org/3/library/re.html)
@@ -14,6 +14,8 @@ Used package:
 
 import re
 import S_01_helpers as helpers
+import S_18_rule_engine as engine
+import S_25_bibliography as bibliography
 
 
 # === Functions ===
@@ -28,15 +30,20 @@ def mark_head(txt):
     return txt
 
 
+mark_title_rules = engine.compile_rules('S_14', 'mark_title', [
+    (r'<bibl>([^\u0009]+)\u0009([^<]+)</bibl>', r'<bibl><title type="short">\1</title><title type="main"> \2</title></bibl>'),
+])
+
+
 def mark_title(txt):
     ''' Annotates the title.'''
-    txt = re.sub(r'<bibl>([^\u0009]+)\u0009([^<]+)</bibl>', r'<bibl><title type="short">\1</title><title type="main"> \2</title></bibl>', txt)
+    txt = engine.apply_rules(txt, mark_title_rules)
     return txt
 
 
 # === Coordinating function ===
 
-def main(periodicals_file, periodicals_header):
+def main(periodicals_file, periodicals_header, periodicals_xml="periodicals.xml"):
     print("--- 14_mark_periodicals_list.py running")
     txt = helpers.read_file(periodicals_file)
     txt = helpers.change_brackets(txt)
@@ -46,7 +53,7 @@ def main(periodicals_file, periodicals_header):
     txt = mark_title(txt)
     txt = helpers.add_bibl_id(txt, 530)
     xml = helpers.transform2xml(txt, periodicals_header)
-    helpers.save_file(xml, "periodicals.xml")
+    bibliography.put_list(periodicals_xml, xml, bibliography.periodicals_index(helpers.parse_xml(xml)))
     print("... done!")
 
 #main(periodicals_file)
\ No newline at end of file
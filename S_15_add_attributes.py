@@ -3,62 +3,98 @@
 SCRIPT 15:
 Script for adding attributes using the python package ElementTree XML.
 
+The enrichments are applied in one traversal of the tree (see "Single traversal"), the functions ..._add_...(root) apply a single one.
+In the streaming mode (stream_main()) the document is read from a file and the entries are processed one at a time,
+so that only one entry is kept in memory (see "Streaming mode").
+The tree is written by script 16 (attributes in the order of the schema).
+
 Used package:
     re (see: https://docs.python.org/3/library/re.html)
-    pandas (see: https://pandas.pydata.org/pandas-docs/stable/)
     ElementTree XML (see: https://docs.python.org/2/library/xml.etree.elementtree.html)
 '''
 
 # === Imports ===
 
 import re
-import pandas as pd
+import collections
 import xml.etree.ElementTree as ET
 import S_01_helpers as helpers
+import S_18_rule_engine as engine
+import S_19_lexicon as lexicon
+import S_25_bibliography as bibliography
+import S_16_sort_attributes as serializer
 
 
 # === Parameters ===
 
 ns = '{http://www.w3.org/XML/1998/namespace}'
-xml = '<?xml version="1.0" encoding="UTF-8"?>\n<?xml-model href="./TEILex0-ODD_kluge.rng" schematypens="http://relaxng.org/ns/structure/1.0" type="application/xml"?>'
+
+# --- patterns searched in the text of entries and <bibl>-elements ---
+digit_pattern = re.compile('\d')
+century_pattern = re.compile('(\d{1,2})')
+fs_periodical_pattern = re.compile('FS\s\d')
+sprache_pattern = re.compile(r'Sprache\s\d{1,2}\s\(\d{4}\)')
+collection_pattern = re.compile(r'([^,^=^\n^\.]+,)+(\s[^\.]+\.)+\sin')
+in_pattern = re.compile(r'in\s[^\s]+')
+author_fs_pattern = re.compile(r'([^,^=^\n^\.]+,)+(\s[^\.]+\.)+\s(FS|GS)\s[^\s]+')
+fs_pattern = re.compile(r'FS\s[^\(]+')
+
+# --- streaming mode ---
+chunk_size = 2**16      # number of characters read at once
 
 
 # === Functions ===
 
+entry_add_id_rules = engine.compile_rules('S_15', 'entry_add_id', [
+    # deleting all non-alphabetical characters
+    ("[^\w]+", ""),
+])
+
+
+def entry_id(entry):
+    '''Returns the xml:id of an entry (consisting of orthographical lemma form and grammatical information).'''
+
+    lemma = ''
+    pos = ''
+    number = ''
+
+    for lemmaGroup in entry.findall('./form[@type="lemmaGroup"]'):
+        for lemmaform in lemmaGroup.findall('./form[@type="lemma"]'):
+                for orth in lemmaform.findall('orth'):
+                    lemma = orth.text
+                    lemma = lemma.strip()
+                    lemma = engine.apply_rules(lemma, entry_add_id_rules)
+                    for hi in orth.findall('hi'):
+                        # if lemma is a homograph, number is stored
+                        if hi.text:               
+                            number = hi.text
+        for gramGrp in lemmaGroup.findall('gramGrp'):
+            for gram in gramGrp.findall('gram'):
+                pos = pos + gram.text
+    return lemma + number + '.' + pos
+
+
 def entry_add_id(root):
     '''Generates xml:id (consisting of orthographical lemma form and grammatical information) and adds to entries.'''
     
     for entry in ET.ElementTree(root).findall(".//entry"):
-        lemma = ''
-        pos = ''
-        number = ''
-    
-        for lemmaGroup in entry.findall('./form[@type="lemmaGroup"]'):
-            for lemmaform in lemmaGroup.findall('./form[@type="lemma"]'):
-                    for orth in lemmaform.findall('orth'):
-                        lemma = orth.text
-                        lemma = lemma.strip()
-                        # deleting all non-alphabetical characters
-                        lemma = re.sub("[^\w]+", "", lemma)
-                        for hi in orth.findall('hi'):
-                            # if lemma is a homograph, number is stored
-                            if hi.text:               
-                                number = hi.text
-            for gramGrp in lemmaGroup.findall('gramGrp'):
-                for gram in gramGrp.findall('gram'):
-                    pos = pos + gram.text
-        id = lemma + number + '.' + pos
-        entry.set('xml:id', id)
+        entry.set('xml:id', entry_id(entry))
         
     return root
 
 
+def set_type_homonymic(entry):
+    '''Adds type="homonymicEntry" to an entry of a homograph.'''
+
+    if digit_pattern.search(entry.get('xml:id')):    
+        entry.set('type', 'homonymicEntry')
+
+
 def entry_add_type_homonymic(root):
     '''Adds type="homonymicEntry" to entries of homographs.'''
     
     for entry in ET.ElementTree(root).findall(".//entry"):
-        if re.search('\d', entry.get('xml:id')):    
-            entry.set('type', 'homonymicEntry')
+        set_type_homonymic(entry)
     
     return root
 
@@ -71,30 +107,42 @@ def entry_add_xml_lang(root):
     return root
 
 
+def set_sense_id(entry):
+    '''Adds xml:id to the <sense>-elements of an entry.'''
+
+    for sense in entry.findall('sense'):
+        sense.set('xml:id', entry.get('xml:id') + '.sense')
+
+
 def sense_add_id(root):
     '''Adds xml:id to <sense>-elements.'''
     
     for entry in ET.ElementTree(root).findall(".//entry"):
-        for sense in entry.findall('sense'):
-            sense.set('xml:id', entry.get('xml:id') + '.sense')
+        set_sense_id(entry)
     return root
 
 
+def set_date_from_to(date):
+    '''Adds attributes "from" and "to" to a <date>-element.'''
+
+    if date.text:
+       if date.text != '-':
+            century = century_pattern.search(date.text).group()
+            if int(century) < 11:
+                begin = '0' + str(int(century)-1) + '00'
+                end = '0' + str(int(century)-1) + '99'
+            else:
+                begin = str(int(century)-1) + '00'
+                end = str(int(century)-1) + '99'
+            date.set('from', begin)
+            date.set('to', end)
+
+
 def date_add_from_to(root):
     '''Adds attributes "from" and "to" to <date>-elements.'''
     
     for date in ET.ElementTree(root).findall(".//usg/date/date"):  
-        if date.text:
-           if date.text != '-':
-                century = re.search('(\d{1,2})', date.text).group()
-                if int(century) < 11:
-                    begin = '0' + str(int(century)-1) + '00'
-                    end = '0' + str(int(century)-1) + '99'
-                else:
-                    begin = str(int(century)-1) + '00'
-                    end = str(int(century)-1) + '99'
-                date.set('from', begin)
-                date.set('to', end)
+        set_date_from_to(date)
     
     return root
 
@@ -105,281 +153,478 @@ def ref_add_target(root):
     '''
     
     ### step 1: create dictionary with lemmas and xml:ids from section L
-    id_dict = {}
+    id_dict = get_id_dict(root)
+
+    ### step 2: searching for <ref>s and inserting target
+    root = ref_set_target(root, id_dict)
+                
+    return root
+
+
+def add_to_id_dict(entry, id_dict):
+    '''Adds lemma (with homograph number) -> xml:id of the entry to the dictionary.'''
+
+    # 'xml:id' as set by entry_add_id(), in a parsed output file (see S_24) with namespace
+    id = entry.get('xml:id') or entry.get(ns + 'id')
+    lemma = id.split('.')[0]
+    id_dict[lemma] = id
+
+
+def get_id_dict(root, id_dict=None):
+    '''Returns dictionary: lemma (with homograph number) -> xml:id of the entry. Entries are added to 'id_dict' if passed (see stream_main()).'''
+
+    if id_dict is None:
+        id_dict = {}
     
     for entry in ET.ElementTree(root).findall(".//entry"):
-        id = entry.get('xml:id')
-        lemma = id.split('.')[0]
-        id_dict[lemma] = id
+        add_to_id_dict(entry, id_dict)
+
+    return id_dict
+
+
+def set_ref_target(ref, id_dict):
+    '''Adds attribute "target" to a <ref>-element using the dictionary of get_id_dict().'''
+
+    number = ''
+    reflemma = ref.text
+    reflemma = reflemma.strip()
+    for hi in ref.findall('hi'):
+        # lemma is homograph
+        if hi.text:               
+             number = hi.text
+    reflemma = reflemma + number
+    if reflemma in id_dict:
+        target = '#' + id_dict[reflemma]
+        ref.set('target', target)
+    # referenced entries that aren't part of section L    
+    else:
+        ref.set('target', '#')   
+
+
+def ref_set_target(root, id_dict):
+    '''Adds attribute "target" to <ref>-elements using the dictionary of get_id_dict().'''
 
-    ### step 2: searching for <ref>s and inserting target
     for ref in ET.ElementTree(root).findall(".//ref"):
-        number = ''
-        reflemma = ref.text
-        reflemma = reflemma.strip()
-        for hi in ref.findall('hi'):
-            # lemma is homograph
-            if hi.text:               
-                 number = hi.text
-        reflemma = reflemma + number
-        if reflemma in id_dict:
-            target = '#' + id_dict[reflemma]
-            ref.set('target', target)
-        # referenced entries that aren't part of section L    
-        else:
-            ref.set('target', '#')   
+        set_ref_target(ref, id_dict)
                 
     return root
 
 
+def get_norm_dicts(lang_csv, lang_cap_csv):
+    '''Returns dictionaries: abbreviation -> norm (see S_19); the norm of a capitalized abbreviation is taken from the same row in 'lang_csv'.'''
+
+    norm = lexicon.get_map(lang_csv, 'abbr', 'norm')
+    norm_list = lexicon.get_table(lang_csv)['norm']
+    norm_cap = {}
+    for i, abbr in enumerate(lexicon.get_table(lang_cap_csv)['abbr']):
+        norm_cap.setdefault(abbr, norm_list[i])
+    return norm, norm_cap
+
+
+def set_form_xml_lang(cit, norm, norm_cap, state):
+    '''Adds attribute xml:lang to the <form>-elements of a <cit type="etymologicalForm"/"translationEquivalent">.
+       state['xml_lang'] holds the last found norm: it is used if a language is unknown (passed on from <cit> to <cit> as in the former version).
+    '''
+
+    for form in cit.findall('form'):
+        form.attrib.pop(ns+'lang') 
+        # empty string if no language mentioned
+        if cit.get('type') == 'etymologicalForm' and not cit.find('lang'):
+            form.set('xml:lang', '')   
+        for lang in cit.findall('lang'):
+            language = (lang.text).strip()
+            if language in norm:
+                state['xml_lang'] = norm[language]
+            if language in norm_cap:
+                state['xml_lang'] = norm_cap[language]
+            form.set('xml:lang', state['xml_lang'])
+
+
 def form_add_xml_lang(root, lang_csv, lang_cap_csv):
     '''Adds attribute xml:lang to <form>-elements in <cit type="etymologicalForm"/"translationEquivalent"> according to values in passed CSV ('lang_csv' and 'lang_cap.csv').'''
     
-    lang_df = pd.read_csv(lang_csv, delimiter="\t")
-    lang_cap_df = pd.read_csv(lang_cap_csv, delimiter="\t")
-    
-    abbr_list = lang_df['abbr'].tolist()
-    abbr_list_cap = lang_cap_df['abbr'].tolist()
+    norm, norm_cap = get_norm_dicts(lang_csv, lang_cap_csv)
+    state = {}
 
     # in cit[@type="etymologicalForm"]
     for cit in ET.ElementTree(root).findall('.//cit[@type="etymologicalForm"]'):
-        for form in cit.findall('form'):
-            form.attrib.pop(ns+'lang') 
-            # empty string if no language mentioned
-            if not cit.find('lang'):
-                form.set('xml:lang', '')   
-            for lang in cit.findall('lang'):
-                language = (lang.text).strip()
-                if language in abbr_list:
-                    index = lang_df.loc[lang_df['abbr'] == language].index[0]   
-                    xml_lang = lang_df.loc[index, 'norm']
-                if language in abbr_list_cap:
-                    index = lang_df.loc[lang_cap_df['abbr'] == language].index[0]   
-                    xml_lang = lang_df.loc[index, 'norm']
-                form.set('xml:lang', xml_lang)
+        set_form_xml_lang(cit, norm, norm_cap, state)
                 
     # in cit[@type="translationEquivalent"]
     for cit in ET.ElementTree(root).findall('.//cit[@type="translationEquivalent"]'):
-        for form in cit.findall('form'):
-            form.attrib.pop(ns+'lang')
-            for lang in cit.findall('lang'):
-                language = (lang.text).strip()
-                if language in abbr_list:
-                    index = lang_df.loc[lang_df['abbr'] == language].index[0]   
-                    xml_lang = lang_df.loc[index, 'norm']
-                if language in abbr_list_cap:
-                    index = lang_df.loc[lang_cap_df['abbr'] == language].index[0]   
-                    xml_lang = lang_df.loc[index, 'norm']
-                form.set('xml:lang', xml_lang)
+        set_form_xml_lang(cit, norm, norm_cap, state)
                     
     return root
 
 
-def get_p_dict(periodicals_xml):
-    '''Takes list of periodicals (as XML file) and creates dictionary with short titles and corresponding ids.'''
-    
-    p_root = helpers.get_root(periodicals_xml)
-    p_dict = {}
-    
-    for bibl in ET.ElementTree(p_root).findall('.//listBibl/bibl'):
-        id = bibl.get(ns + 'id')
-        for title in bibl.findall('./title[@type="short"]'):
-            title = title.text
-        p_dict[title] = id
-    
-    return p_dict
+def create_bibl_matcher(p_dict, l_short_dict, fs_dict, author_dict, editor_dict):
+    '''Builds the lookup structures for the dictionaries of the bibliography index (see S_25.get_bibl_dicts()) (built once per run, see bibl_add_corresp()):
+        - periodicals: automaton over the short titles, finds all titles contained in a <bibl> in one scan
+        - short titles and Festschriften: the dictionaries (looked up by the first word or the "FS ..." title)
+        - editors: surname -> list of (year or None, id) in the order of the dictionary
+        - authors: trie over the surnames; the end of a surname holds list of (position in the dictionary, year or None, id)
+        - results: text of <bibl> -> result of resolve_bibl() (citations like "EWNl" or "Kluge" are repeated often)
+    '''
 
-def get_l_short_dict(literature_xml):
-    '''Takes list of bibliographical entries (as XML file) and creates dictionary with short titles and corresponding ids.'''
-    
-    l_root = helpers.get_root(literature_xml)
-    l_short_dict = {}
-    
-    for bibl in ET.ElementTree(l_root).findall('.//listBibl/bibl'):
-        for short in bibl.findall('./title[@type="short"]'):
-            short = short.text.strip()
-            id = bibl.get(ns + 'id')
-            l_short_dict[short] = id
-    
-    return l_short_dict
+    periodicals = list(p_dict.items())
+
+    editors = {}
+    for e, id in editor_dict.items():
+        e_list = e.split(',')
+        # if there exists a year (means editor has published multiple works)
+        year = e_list[2] if len(e_list) > 2 else None
+        editors.setdefault(e_list[0], []).append((year, id))
+
+    authors = {}
+    for i, (author, id) in enumerate(author_dict.items()):
+        author_str = author.split('_')
+        # if there exists a year (means author has published multiple works)
+        year = author_str[1] if len(author_str) > 1 else None
+        node = authors
+        for char in author.split(',')[0]:
+            node = node.setdefault(char, {})
+        node.setdefault('', []).append((i, year, id))
+
+    return {'periodicals': periodicals, 'automaton': helpers.create_automaton([p for p, id in periodicals]),
+            'short': l_short_dict, 'fs': fs_dict, 'editors': editors, 'authors': authors, 'results': {}}
+
+
+def match_periodical(matcher, text):
+    '''Returns the corresp value of the periodical mentioned in the text (the last one in the order of the list), None if there is none.'''
+
+    corresp = None
+    found = helpers.find_words(matcher['automaton'], text)
+    # in case of "FS" exclude that cited work is not a "Festschrift": "FS" has to be followed by whitespace + a digit
+    found = [i for i in found if matcher['periodicals'][i][0] != "FS" or fs_periodical_pattern.search(text)]
+    if found:
+        corresp = '#' + matcher['periodicals'][max(found)][1]
+    # special case: "Sprache" is abbreviation for "Zeitschrift für Sprachwissenschaft"
+    if sprache_pattern.search(text):
+        corresp = '#B804'
+    return corresp
+
+
+def match_literature(matcher, text):
+    '''Returns the corresp value of the work of the literature list mentioned in the text, None if there is none.
+       The steps are tried in order (short titles, parts of collected editions, Festschriften, authors), in a step the last matching work wins.
+    '''
 
+    ### short titles: compare short title to first word in <bibl>
+    short = text.split()[0]
+    if short in matcher['short']:
+        return '#' + matcher['short'][short]
 
-def get_FS_dict(literature_xml):
-    '''Takes list of bibliographical entries (as XML file) and creates dictionary with short titles of Festschriften and Gedenkschriften and corresponding ids.'''
-    
-    l_root = helpers.get_root(literature_xml)
-    fs_dict = {}
-    
-    for bibl in ET.ElementTree(l_root).findall('.//listBibl/bibl'):
-        for title in bibl.findall('./title'):
-            str_title = title.text.split(':')[0]
-            if 'FS' in str_title or 'GS' in str_title:
-                fs_dict[str_title] = bibl.get(ns + 'id')
-            
-    return fs_dict
-
-def get_author_dict(literature_xml):
-    '''Takes list of bibliographical entries (as XML file) and creates dictionary with author names (and possibly publication year) and corresponding ids.'''
-
-    l_root = helpers.get_root(literature_xml)
-    author_dict = {}
-    
-    for bibl in ET.ElementTree(l_root).findall('.//listBibl/bibl'):
-        for author in bibl.findall('./author'):
-            auth = author.text.strip()
-            id = bibl.get(ns + 'id')
-            
-            year = bibl.find('date')
-            # if there is a date mentioned behind author
-            if year != None:              
-                year = year.text
-                auth = auth + '_' + year
-                author_dict[auth] = id
-            else:
-                author_dict[auth] = id
-
-    return author_dict
-
-
-def get_editor_dict(literature_xml):
-    '''Takes list of bibliographical entries (as XML file) and creates dictionary with editor names (and possibly publication year) and corresponding ids.'''
-    l_root = helpers.get_root(literature_xml)
-    editor_dict = {}
-
-    for bibl in ET.ElementTree(l_root).findall('.//listBibl/bibl'):
-        for editor in bibl.findall('./editor'):
-            ed = editor.text.strip()
-            id = bibl.get(ns + 'id')
-            
-            year = bibl.find('date')
-            # if there is a date mentioned behind editor
-            if year != None:               
-                year = year.text
-                ed = ed + ',' + year
-                editor_dict[ed] = id
-            else:
-                editor_dict[ed] = id
-    
-    return editor_dict
+    ### parts of collected editions
+    corresp = None
+    # searching for pattern containg "in"
+    if collection_pattern.search(text):
+        # searching for "in" + following word (which is probably the title or editor)
+        editor = in_pattern.search(text).group().split()[1]
+        for year, id in matcher['editors'].get(editor, []):
+            # if text in <bibl> contains publication date (or no publication year)
+            if year is None or year in text:
+                corresp = '#' + id
+    if corresp:
+        return corresp
+
+    ### Festschriften and Gedenkschriften: author name follwed by "FS" or "GS"
+    if author_fs_pattern.search(text):
+        fs = fs_pattern.search(text).group().strip()
+        if fs in matcher['fs']:
+            return '#' + matcher['fs'][fs]
+
+    ### authors: all surnames the text starts with
+    node = matcher['authors']
+    candidates = list(node.get('', []))
+    for char in text.strip():
+        node = node.get(char)
+        if node is None:
+            break
+        candidates.extend(node.get('', []))
+    for i, year, id in sorted(candidates):
+        # if text in <bibl> contains publication date (or no publication year)
+        if year is None or year in text:
+            corresp = '#' + id
+    return corresp
+
+
+def resolve_bibl(matcher, text):
+    '''Returns (corresp of a periodical, corresp of a work of the literature list) for the text of a <bibl>, memoized per text.
+       The literature list is only searched if no periodical is mentioned.
+    '''
+
+    if text not in matcher['results']:
+        periodical = match_periodical(matcher, text)
+        literature = None if periodical else match_literature(matcher, text)
+        matcher['results'][text] = (periodical, literature)
+    return matcher['results'][text]
 
 
-def bibl_add_corresp(root, periodicals_xml, literature_xml):
+def bibl_add_corresp(root, periodicals_xml, literature_xml, matcher=None):
     '''Adds attribute corresp to <bibl>-elements if the mentioned work is abbreviated and can be linked to an entry in chapter "Abgekürzt zitierte Literatur".
        Takes XML-files of tagged periodical list and literature list containing xml:ids for each mentioned work.
        Values for corresp are '#' + xml:id of the corresponding <bibl>.
+       Each <bibl> is resolved in one step by the matcher (see create_bibl_matcher()), which can be passed to be used for several calls.
+       A periodical is preferred to the works of the literature list.
     '''
     
-    ### get different dictionaries 
-    p_dict = get_p_dict(periodicals_xml)
-    l_short_dict = get_l_short_dict(literature_xml)
-    fs_dict = get_FS_dict(literature_xml)
-    author_dict = get_author_dict(literature_xml)
-    editor_dict = get_editor_dict(literature_xml)
-    
-    ### periodicals
-    for bibl in ET.ElementTree(root).findall('.//bibl[@type="list"]/bibl'):
-        for p in p_dict:
-            # in case of "FS" exclude that cited work is not a "Festschrift"
-            if p == "FS":  
-                if p in bibl.text:
-                    # if "FS" is followed by whitespace + a digit, it's a periodical
-                    if re.search('FS\s\d', bibl.text):  
-                        bibl.set('corresp', '#' + p_dict[p])
-            else:
-                if p in bibl.text:
-                    bibl.set('corresp', '#' + p_dict[p])
-                    
-        # special case: "Sprache" is abbreviation for "Zeitschrift für Sprachwissenschaft" 
-        if re.search(r'Sprache\s\d{1,2}\s\(\d{4}\)', bibl.text):
-            bibl.set('corresp', '#B804')
-    
-    
-    ### short titles
-    for bibl in ET.ElementTree(root).findall('.//bibl[@type="list"]/bibl'):
-        # <bibl>-elements without attribute 'corresp':
-        if not bibl.get('corresp'):
-            strlist = bibl.text.split()
-            for short in l_short_dict:
-                # compare short title to first word in <bibl>
-                if short == strlist[0]:   
-                    bibl.set('corresp', '#' + l_short_dict[short])
+    if matcher is None:
+        matcher = create_bibl_matcher(*bibliography.get_bibl_dicts(periodicals_xml, literature_xml))
 
-
-    ### parts of collected editions
     for bibl in ET.ElementTree(root).findall('.//bibl[@type="list"]/bibl'):
-        # <bibl>-elements without attribute 'corresp':
-        if not bibl.get('corresp'):
-            bibl_text = bibl.text
-            # searching for pattern containg "in"
-            if re.search(r'([^,^=^\n^\.]+,)+(\s[^\.]+\.)+\sin', bibl.text):
-                # searching for "in" + following word (which is probably the title or editor)
-                bibl_text = re.search(r'in\s[^\s]+', bibl.text).group()  
-                strlist = bibl_text.split()
-                editor = strlist[1]  # possible editor
-                
-                for e in editor_dict:
-                    e_list = e.split(',')
-                    # getting surname
-                    name = e_list[0]
-                    if name == editor:
-                        try:
-                            # if there exists a year (means editor has published multiple works)
-                            year = e_list[2]
-                            # if text in <bibl> contains publication date
-                            if year in bibl.text:   
-                                id = editor_dict[e]
-                                bibl.set('corresp', '#' + editor_dict[e])
-                        # no publication year:         
-                        except:
-                            bibl.set('corresp', '#' + editor_dict[e])    
-                         
-    
-    ### Festschriften and Gedenkschriften
-    for bibl in ET.ElementTree(root).findall('.//bibl[@type="list"]/bibl'):
-        # <bibl>-elements without attribute 'corresp':
-        if not bibl.get('corresp'):
-            # searching for pattern author name follwed by "FS" or "GS"
-            if re.search(r'([^,^=^\n^\.]+,)+(\s[^\.]+\.)+\s(FS|GS)\s[^\s]+', bibl.text):
-                # getting "FS" + following word  
-                fs = re.search(r'FS\s[^\(]+', bibl.text).group()  
-                fs = fs.strip()
-
-                for f in fs_dict:
-                    if f == fs:
-                        bibl.set('corresp', '#' + fs_dict[f])
-    
-    ### authors
-    for bibl in ET.ElementTree(root).findall('.//bibl[@type="list"]/bibl'):
-        # <bibl>-elements without attribute 'corresp':
-        if not bibl.get('corresp'):
-            for author in author_dict:
-                author_str = author.split(',')
-                surname = author_str[0]
-                bibl_text = bibl.text.strip()
-            
-                if bibl_text.startswith(surname):
-                    
-                    try:
-                        # if there exists a year (means author has published multiple works)
-                        year = author.split('_')[1]   
-                        # if text in <bibl> contains publication date    
-                        if year in bibl.text:   
-                            bibl.set('corresp', '#' + author_dict[author])
-                    # no publication year:        
-                    except:
-                        bibl.set('corresp', '#' + author_dict[author])    
+        set_bibl_corresp(bibl, matcher)
                        
     return root
 
 
-def ET2string(root):
-    '''takes root and returns text as string object'''
-    # changing ElementTree object into string
-    tei= ET.tostring(root, encoding='utf-8').decode('utf-8')
-    # add namespace declaration to root element
-    tei = tei.replace('<TEI>', '<TEI xmlns="http://www.tei-c.org/ns/1.0">') 
-    tei = xml + tei
-    return tei
+def set_bibl_corresp(bibl, matcher):
+    '''Adds attribute corresp to a <bibl>-element of a <bibl type="list"> (see bibl_add_corresp()).'''
+
+    periodical, literature = resolve_bibl(matcher, bibl.text)
+    if periodical:
+        bibl.set('corresp', periodical)
+    elif literature and not bibl.get('corresp'):
+        bibl.set('corresp', literature)
+
+
+# --- Single traversal ---
+
+# an enrichment is called for the elements with one of its 'tags' during the traversal ('visit': element, context);
+# 'finish' (context) is called after the traversal for the work that needs the whole document (e.g. the xml:ids of all entries);
+# 'after': names of the enrichments that have to be applied before (on the same element and for 'finish')
+Enrichment = collections.namedtuple('Enrichment', ['name', 'tags', 'visit', 'finish', 'after'])
+
+
+def visit_entry_id(entry, context):
+    entry.set('xml:id', entry_id(entry))
+    # a passed dictionary already holds the xml:ids of all entries (the last entry of a lemma counts)
+    if context['collect_ids']:
+        add_to_id_dict(entry, context['id_dict'])
+
+
+def visit_type_homonymic(entry, context):
+    set_type_homonymic(entry)
+
+
+def visit_entry_xml_lang(entry, context):
+    entry.set('xml:lang', 'de')
+
+
+def visit_sense_id(entry, context):
+    set_sense_id(entry)
+
+
+def visit_date(usg, context):
+    # .//usg/date/date
+    for date in usg.findall('date/date'):
+        set_date_from_to(date)
+
+
+def visit_ref(ref, context):
+    # the target is added when the xml:ids of all entries are known (references to later entries)
+    context['refs'].append(ref)
+
+
+def finish_ref(context):
+    for ref in context['refs']:
+        set_ref_target(ref, context['id_dict'])
+    context['refs'] = []
+
+
+def visit_cit(cit, context):
+    # the <cit type="translationEquivalent"> follow all <cit type="etymologicalForm"> (the last language found is passed on, see set_form_xml_lang())
+    if cit.get('type') == 'etymologicalForm':
+        set_form_xml_lang(cit, context['norm'], context['norm_cap'], context['state'])
+    elif cit.get('type') == 'translationEquivalent':
+        context['translations'].append(cit)
+
+
+def finish_cit(context):
+    for cit in context['translations']:
+        set_form_xml_lang(cit, context['norm'], context['norm_cap'], context['state'])
+    context['translations'] = []
+
+
+def visit_bibl(bibl, context):
+    # .//bibl[@type="list"]/bibl
+    if bibl.get('type') == 'list':
+        for item in bibl.findall('bibl'):
+            set_bibl_corresp(item, context['matcher'])
+
+
+enrichments = [
+    Enrichment('entry_add_id', ['entry'], visit_entry_id, None, []),
+    Enrichment('entry_add_type_homonymic', ['entry'], visit_type_homonymic, None, ['entry_add_id']),
+    # the attributes are serialized in the order they are set: xml:id, type, xml:lang
+    Enrichment('entry_add_xml_lang', ['entry'], visit_entry_xml_lang, None, ['entry_add_type_homonymic']),
+    Enrichment('sense_add_id', ['entry'], visit_sense_id, None, ['entry_add_id']),
+    Enrichment('date_add_from_to', ['usg'], visit_date, None, []),
+    Enrichment('ref_add_target', ['ref'], visit_ref, finish_ref, ['entry_add_id']),
+    Enrichment('form_add_xml_lang', ['cit'], visit_cit, finish_cit, []),
+    Enrichment('bibl_add_corresp', ['bibl'], visit_bibl, None, []),
+]
+
+
+def order_enrichments(enrichments):
+    '''Returns the enrichments sorted by their dependencies ('after'), otherwise in the order of the list.'''
+
+    ordered = []
+    done = set()
+    pending = list(enrichments)
+    while pending:
+        for enrichment in pending:
+            if all(name in done for name in enrichment.after):
+                break
+        else:
+            raise ValueError('Unresolvable dependencies of enrichments: ' + ', '.join(e.name for e in pending))
+        pending.remove(enrichment)
+        ordered.append(enrichment)
+        done.add(enrichment.name)
+    return ordered
+
+
+def create_context(periodicals_xml, literature_xml, lang_csv, lang_cap_csv, id_dict=None):
+    '''Returns the data used by the enrichments. 'id_dict' can be passed if the xml:ids of all entries are known beforehand (see stream_main()).'''
+
+    norm, norm_cap = get_norm_dicts(lang_csv, lang_cap_csv)
+    return {'id_dict': {} if id_dict is None else id_dict, 'collect_ids': id_dict is None,
+            'matcher': create_bibl_matcher(*bibliography.get_bibl_dicts(periodicals_xml, literature_xml)),
+            'norm': norm, 'norm_cap': norm_cap, 'state': {}, 'refs': [], 'translations': []}
+
+
+def enrich(root, context, enrichments=enrichments):
+    '''Applies the enrichments in one depth-first traversal of the tree (in document order, an element before its children).
+       Conditions on the path (e.g. <sense> in <entry>) are checked from the outer element, which looks at its children only.
+    '''
+
+    ordered = order_enrichments(enrichments)
+    dispatch = {}
+    for enrichment in ordered:
+        for tag in enrichment.tags:
+            dispatch.setdefault(tag, []).append(enrichment.visit)
+
+    for element in root.iter():
+        for visit in dispatch.get(element.tag, ()):
+            visit(element, context)
+
+    for enrichment in ordered:
+        if enrichment.finish:
+            enrichment.finish(context)
+    return root
+
+
+# --- Streaming mode ---
+
+def read_events(parser):
+    '''Yields the events of the parser, the TEI namespace is removed from the tags (like in helpers.parse_xml()).'''
+
+    for event, element in parser.read_events():
+        if event == 'start':
+            helpers.strip_namespace(element)
+        yield event, element
+
+
+def iter_events(file):
+    '''Parses the file incrementally (in chunks of 'chunk_size' characters) and yields the events ('start'/'end', element).
+       Note: the parser is ahead of the events, elements behind the current one may already be parsed.
+    '''
+
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    with open(file, "r", encoding="utf8") as infile:
+        for chunk in iter(lambda: infile.read(chunk_size), ''):
+            parser.feed(chunk)
+            yield from read_events(parser)
+    parser.close()
+    yield from read_events(parser)
+
+
+def process_entry(entry, process):
+    '''Passes the entry inside a container element to 'process' (the functions above search for './/entry').'''
+
+    container = ET.Element('container')
+    container.append(entry)
+    process(container)
+
+
+def stream(infile, outfile, process):
+    '''
+    Reads 'infile' incrementally and writes it into 'outfile' with every <entry> changed by 'process' (taking a container with the entry).
+    The elements outside of entries are written as they are (by script 16). Each written entry (and start/end tag) is removed from memory.
+    '''
+
+    # open elements outside of entries: element, start tag written, last finished child (its tail is written when the next child starts)
+    stack = []
+    depth = 0
+
+    with open(outfile, "w", encoding="utf8") as output:
+
+        write = output.write
+
+        def close_child(frame):
+            '''Writes start tag and text of the open element or the tail of its last child, before the next child starts.'''
+            element = frame['element']
+            if not frame['written']:
+                write(serializer.start_tag(element) + serializer.escape_text(element.text or ''))
+                frame['written'] = True
+            if frame['last'] is not None:
+                write(serializer.escape_text(frame['last'].tail or ''))
+                element.remove(frame['last'])
+                frame['last'] = None
+
+        write(serializer.prolog)
+        for event, element in iter_events(infile):
+            if event == 'start':
+                if depth:
+                    depth += 1
+                    continue
+                if stack:
+                    close_child(stack[-1])
+                if element.tag == 'entry':
+                    depth = 1
+                else:
+                    stack.append({'element': element, 'written': False, 'last': None})
+            elif depth:
+                depth -= 1
+                if not depth:
+                    process_entry(element, process)
+                    write(serializer.to_string(element))
+                    stack[-1]['last'] = element
+            else:
+                frame = stack.pop()
+                if frame['written']:
+                    close_child(frame)
+                    write('</' + element.tag + '>')
+                else:
+                    # element without children
+                    write(serializer.to_string(element))
+                if stack:
+                    stack[-1]['last'] = element
+
+
+def collect_ids(infile):
+    '''Reads 'infile' incrementally and returns the dictionary of get_id_dict() for all entries (xml:ids created by entry_add_id() if missing).'''
+
+    id_dict = {}
+    parents = []
+    depth = 0
+    for event, element in iter_events(infile):
+        if event == 'start':
+            if depth or element.tag == 'entry':
+                depth += 1
+            else:
+                parents.append(element)
+        elif depth:
+            depth -= 1
+            if not depth:
+                container = ET.Element('container')
+                container.append(element)
+                if not (element.get('xml:id') or element.get(ns + 'id')):
+                    entry_add_id(container)
+                get_id_dict(container, id_dict)
+                parents[-1].remove(element)
+        else:
+            parents.pop()
+    return id_dict
     
 
 
@@ -387,16 +632,23 @@ def ET2string(root):
 # === Coordinating function ===
  
 def main(tei, periodicals_xml, literature_xml, lang_csv, lang_cap_csv):
+    '''Returns the root of the enriched tree (written by script 16).'''
     print("--- 15_add_attributes.py running")
-    tei_parsed = helpers.parse_xml(tei)
-    tei_parsed = entry_add_id(tei_parsed)
-    tei_parsed = entry_add_type_homonymic(tei_parsed)
-    tei_parsed = entry_add_xml_lang(tei_parsed)
-    tei_parsed = sense_add_id(tei_parsed)
-    tei_parsed = date_add_from_to(tei_parsed)
-    tei_parsed = ref_add_target(tei_parsed)
-    tei_parsed = form_add_xml_lang(tei_parsed, lang_csv, lang_cap_csv)
-    tei_parsed = bibl_add_corresp(tei_parsed, periodicals_xml, literature_xml)
-    tei = ET2string(tei_parsed)
+    root = helpers.parse_xml(tei)
+    context = create_context(periodicals_xml, literature_xml, lang_csv, lang_cap_csv)
+    root = enrich(root, context)
+    print("... done!")
+    return root
+
+
+def stream_main(infile, outfile, periodicals_xml, literature_xml, lang_csv, lang_cap_csv):
+    '''
+    Streaming mode of main(): reads the TEI from 'infile' and writes the result into 'outfile' entry by entry.
+    The xml:ids of all entries are collected in a first pass, so that references to later entries are resolved as well.
+    The rules are only applied inside of <entry>-elements.
+    '''
+    print("--- 15_add_attributes.py running (streaming)")
+    id_dict = collect_ids(infile)
+    context = create_context(periodicals_xml, literature_xml, lang_csv, lang_cap_csv, id_dict)
+    stream(infile, outfile, lambda container: enrich(container, context))
     print("... done!")
-    return tei
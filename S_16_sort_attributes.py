@@ -1,45 +1,153 @@
 #!/usr/bin/env python3
 '''
 SCRIPT 16:
-Script for correcting the order of attributes which are orderd alphabetically by ElementTree.
+Serializer of the TEI tree of script 15: writes the attributes in the order of the TEI Lex-0 schema.
+ElementTree keeps the attributes in the order they were set, so the order is defined here for each element ('attribute_order')
+instead of being corrected in the serialized string. The prolog and the namespace declaration of <TEI> are written directly,
+the document is written into the output file piece by piece (no intermediate string).
+to_string() and start_tag() are used by the streaming mode of script 15.
 
 Used package:
-    re (see: https://docs.python.org/3/library/re.html)
+    ElementTree XML (see: https://docs.python.org/2/library/xml.etree.elementtree.html)
 '''
 
 # === Imports ===
 
-import re
-import S_01_helpers as helpers
+import xml.etree.ElementTree as ET
 
 
+# === Parameters ===
+
+prolog = '<?xml version="1.0" encoding="UTF-8"?>\n<?xml-model href="./TEILex0-ODD_kluge.rng" schematypens="http://relaxng.org/ns/structure/1.0" type="application/xml"?>'
+
+tei_namespace = 'http://www.tei-c.org/ns/1.0'
+xml_namespace = 'http://www.w3.org/XML/1998/namespace'
+
+# order of the attributes per element; attributes not listed follow in the order they were set
+attribute_order = {
+    'entry': ['xml:id', 'type', 'xml:lang'],
+    'div': ['xml:id', 'type'],
+    'gram': ['type', 'expand'],
+    'date': ['type', 'from', 'to'],
+    'usg': ['type', 'expand', 'ana'],
+    'ref': ['type', 'target'],
+}
+
+# qualified names of the attribute keys and tags already seen
+names = {}
+
 
 # === Functions ===
-    
-def sort_attributes(tei):
-    ''' Corrects the order of attributes which are orderd alphabetically by ElementTree.'''
-    
-    # entry
-    tei = re.sub(r'(<entry)(\stype="[^"]+")(\sxml:id="[^"]+")(\sxml:lang="de">)', r'\1\3\2\4', tei)
-    # div 
-    tei = re.sub(r'(<div)(\stype="section")(\sxml:id="\w")', r'\1\3\2', tei)
-    # gram
-    tei = re.sub(r'(<gram)(\sexpand="[^"]+")(\stype="[^"]+")', r'\1\3\2', tei)
-    # date 
-    tei = re.sub(r'(<date)(\sfrom="\d+")(\sto="\d+")(\stype="[^"]+")', r'\1\4\2\3', tei)
-    # usg
-    tei = re.sub(r'(<usg)(\sexpand="[^"]+")(\stype="[^"]+")', r'\1\3\2', tei)
-    tei = re.sub(r'(<usg)(\sana="[^"]+")(\stype="time")', r'\1\3\2', tei)
-    # ref
-    tei = re.sub(r'(<ref)(\starget="[^"]+")(\stype="entry")', r'\1\3\2', tei)
-    
-    return tei
-           
+
+def qualified_name(name):
+    '''Returns the name as written in the document: '{http://www.w3.org/XML/1998/namespace}id' -> 'xml:id', TEI namespace removed.'''
+
+    if name in names:
+        return names[name]
+    qualified = name
+    if name[:1] == '{':
+        uri, local = name[1:].split('}', 1)
+        if uri == xml_namespace:
+            qualified = 'xml:' + local
+        elif uri == tei_namespace:
+            qualified = local
+        else:
+            raise ValueError('namespace not declared in the output: ' + uri)
+    names[name] = qualified
+    return qualified
+
+
+def escape_text(text):
+    '''Escapes text and tails (as ElementTree).'''
+
+    if '&' in text:
+        text = text.replace('&', '&amp;')
+    if '<' in text:
+        text = text.replace('<', '&lt;')
+    if '>' in text:
+        text = text.replace('>', '&gt;')
+    return text
+
+
+def escape_attribute(value):
+    '''Escapes attribute values (as ElementTree).'''
+
+    value = escape_text(value)
+    if '"' in value:
+        value = value.replace('"', '&quot;')
+    if '\r' in value:
+        value = value.replace('\r', '&#13;')
+    if '\n' in value:
+        value = value.replace('\n', '&#10;')
+    if '\t' in value:
+        value = value.replace('\t', '&#09;')
+    return value
+
+
+def ordered_attributes(element, tag):
+    '''Returns list of (qualified name, value) of the element in the order of 'attribute_order'.'''
+
+    items = [(qualified_name(key), value) for key, value in element.attrib.items()]
+    order = attribute_order.get(tag)
+    if order and len(items) > 1:
+        # stable: attributes not listed keep their order
+        items.sort(key=lambda item: order.index(item[0]) if item[0] in order else len(order))
+    return items
+
+
+def start_tag(element):
+    '''Returns the start tag of the element (<TEI> with the namespace declaration).'''
+
+    tag = qualified_name(element.tag)
+    string = '<' + tag
+    if tag == 'TEI':
+        string += ' xmlns="' + tei_namespace + '"'
+    for name, value in ordered_attributes(element, tag):
+        string += ' ' + name + '="' + escape_attribute(value) + '"'
+    return string + '>'
+
+
+def write_element(element, write, tail=True):
+    '''Passes the serialized element piece by piece to 'write' (empty elements as '<tag />', like ElementTree).'''
+
+    if element.tag is ET.Comment:
+        write('<!--' + element.text + '-->')
+    elif element.tag is ET.ProcessingInstruction:
+        write('<?' + element.text + '?>')
+    else:
+        string = start_tag(element)
+        if element.text or len(element):
+            write(string)
+            if element.text:
+                write(escape_text(element.text))
+            for child in element:
+                write_element(child, write)
+            write('</' + qualified_name(element.tag) + '>')
+        else:
+            write(string[:-1] + ' />')
+    if tail and element.tail:
+        write(escape_text(element.tail))
+
+
+def to_string(element):
+    '''Returns the serialized element without its tail.'''
+
+    parts = []
+    write_element(element, parts.append, tail=False)
+    return ''.join(parts)
+
+
+def write_tree(root, file):
+    '''Writes prolog and tree into the file.'''
+
+    with open(file, "w", encoding="utf8") as outfile:
+        outfile.write(prolog)
+        write_element(root, outfile.write)
+
 
 # === Coordinating function ===
 
-def main(tei):
+def main(root, file):
     print("--- 16_sort_attributes.py running")
-    tei = sort_attributes(tei)
+    write_tree(root, file)
     print("... done!")
-    return tei
\ No newline at end of file
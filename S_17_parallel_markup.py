@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+'''
+SCRIPT 17:
+Script for running the markup of scripts 05 to 12 entry by entry in a pool of processes.
+After mark_entry() (script 05) has inserted the <entry>-tags, the document is cut into shards:
+every <entry>-element is one shard, the text in front of, between and behind the entries as well.
+Each shard passes through the rules of scripts 05-12 in the same order as in the serial run,
+afterwards the shards are joined in their original order.
+The result is identical to the serial run because no rule matches across the limits of an entry:
+the lazy wildcards of the rules of scripts 05-12 are bounded by '</entry>' ((?:(?!</entry>).)*? instead of .*?).
+
+Input: XML-TEI (output of script 03)
+Output: XML-TEI (like output of script 12)
+
+Used packages:
+    re (see: https://docs.python.org/3/library/re.html)
+    multiprocessing (see: https://docs.python.org/3/library/multiprocessing.html)
+'''
+
+# === Imports ===
+
+import os
+import re
+import multiprocessing
+import S_05_mark_entry_head
+import S_06_mark_bibl
+import S_07_mark_lang
+import S_08_mark_etym
+import S_09_mark_translation_addition
+import S_11_mark_term
+import S_12_finish_markup
+import S_18_rule_engine as engine
+
+
+# === Parameters ===
+
+# resources of the current process (set by init_worker())
+resources = {}
+
+
+# === Functions ===
+
+def split_entries(tei):
+    '''Cuts the document into shards. Returns a list in which the text outside of entries and the <entry>-elements alternate.'''
+
+    shards = re.split(r'(<entry>.*?</entry>)', tei, flags=re.DOTALL)
+    return shards
+
+
+def init_worker(lexis_csv, pos_csv, langfile, term_df, section="L"):
+    '''Stores the resources needed by mark_shard() in the worker process.'''
+
+    resources['lexis_csv'] = lexis_csv
+    resources['pos_csv'] = pos_csv
+    resources['langfile'] = langfile
+    resources['term_df'] = term_df
+    resources['section'] = section
+
+
+def mark_shard(txt):
+    '''Applies the rules of scripts 05-12 to one shard.'''
+
+    txt = S_05_mark_entry_head.markup(txt, resources['lexis_csv'], resources['pos_csv'])
+    txt = S_06_mark_bibl.markup(txt)
+    txt = S_07_mark_lang.markup(txt, resources['langfile'])
+    txt = S_08_mark_etym.markup(txt, resources['pos_csv'])
+    txt = S_09_mark_translation_addition.markup(txt)
+    txt = S_11_mark_term.tag_term(txt, resources['term_df'])
+    txt = S_12_finish_markup.markup(txt, resources['section'])
+    return txt
+
+
+def mark_indexed_shard(item):
+    '''Wrapper for the pool: takes (position, shard), returns (position, marked shard, rule statistics of the shard).'''
+
+    index, txt = item
+    engine.reset_stats()
+    txt = mark_shard(txt)
+    return index, txt, dict(engine.stats), dict(engine.iterations)
+
+
+def mark_shards(shards, workers, chunksize):
+    '''
+    Marks all non-empty shards. The biggest shards are sent out first so that one long entry doesn't hold up the end of the run.
+    With workers = 1 the shards are marked in the current process.
+    Returns the marked shards in their original order.
+    '''
+
+    order = [i for i in sorted(range(len(shards)), key=lambda i: len(shards[i]), reverse=True) if shards[i]]
+    marked = list(shards)
+
+    if workers == 1:
+        for i in order:
+            marked[i] = mark_shard(shards[i])
+        return marked
+
+    items = [(i, shards[i]) for i in order]
+    initargs = (resources['lexis_csv'], resources['pos_csv'], resources['langfile'], resources['term_df'], resources['section'])
+    with multiprocessing.Pool(workers, initializer=init_worker, initargs=initargs) as pool:
+        for index, txt, stats, iterations in pool.imap_unordered(mark_indexed_shard, items, chunksize):
+            marked[index] = txt
+            engine.merge_stats(stats, iterations)
+
+    return marked
+
+
+# === Coordinating function ===
+
+def main(tei, lexis_csv, pos_csv, langfile, regfile, workers=None, chunksize=4, section="L"):
+    '''
+    Runs scripts 05-12 in parallel mode ('section' is the name of the section, see S_12.mark_section()).
+    'workers' is the number of processes (default: number of CPUs), 'chunksize' the number of shards handed to a process at once.
+    '''
+    print("--- 17_parallel_markup.py running")
+    if not workers:
+        workers = os.cpu_count() or 1
+
+    # side products of scripts 07 and 11 are written once
+    S_07_mark_lang.save_lang_dict(langfile)
+    term_df = S_11_mark_term.create_term_df(regfile)
+    init_worker(lexis_csv, pos_csv, langfile, term_df, section)
+
+    tei = S_05_mark_entry_head.mark_entry(tei)
+    shards = split_entries(tei)
+    shards = mark_shards(shards, workers, chunksize)
+    tei = ''.join(shards)
+    print("... done!")
+    return tei
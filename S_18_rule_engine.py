@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+'''
+SCRIPT 18:
+This script contains the engine for the replacement rules of scripts 05-16.
+The rules of a function are written as a declarative table of (pattern, replacement) or (pattern, replacement, flags).
+compile_rules() compiles every pattern once when the script is imported,
+apply_rules() applies the rules in their order and records the number of matches and the elapsed time per rule.
+Rules that only look inside one entry can be written as functions over the text of one <entry>-element (entry rules):
+apply_entry_rules() applies them to every entry and joins the document once, so every search is bounded by the length of an entry.
+Rules that have to be repeated until nothing changes (e.g. splitting an element at every comma) are applied by apply_fixpoint().
+compile_rule_set() prepares a table for apply_rule_set(): rules without regular expression syntax (literal rules) are applied by str.replace(),
+consecutive literal rules are merged into one scan if this gives the same result as applying them one after the other.
+
+Used packages:
+    re (see: https://docs.python.org/3/library/re.html)
+    time (see: https://docs.python.org/3/library/time.html)
+'''
+
+# === Imports ===
+
+import re
+import time
+from collections import namedtuple
+
+
+# === Parameters ===
+
+Rule = namedtuple('Rule', ['stage', 'name', 'pattern', 'repl', 'flags', 'regex'])
+EntryRule = namedtuple('EntryRule', ['stage', 'name', 'function'])
+LiteralGroup = namedtuple('LiteralGroup', ['rules', 'replacements', 'regex'])
+
+# characters with a special meaning in patterns
+special_characters = set('.^$*+?{}[]\\|()')
+
+# <entry>-elements (not nested) in the document
+entry_pattern = re.compile(r'(<entry[\s>].*?</entry>)', re.DOTALL)
+
+# apply_fixpoint() gives up after this number of rounds
+max_rounds = 1000
+
+# number of rules compiled per stage and function (used for naming the rules)
+rule_count = {}
+
+# statistics per rule: (stage, name) -> [calls, matches, seconds]
+stats = {}
+
+# rounds with changes per call of apply_fixpoint(): (stage, name) -> list of numbers
+iterations = {}
+
+
+# === Functions ===
+
+def compile_rules(stage, function, table):
+    '''
+    Compiles a table of rules. 'stage' is the name of the script (e.g. 'S_05'), 'function' the name of the function using the rules.
+    The rules are named '<function>:<n>' with n counting the rules of the function in their order.
+    Returns a list of Rule objects.
+    '''
+
+    rules = []
+    for row in table:
+        pattern, repl = row[0], row[1]
+        flags = row[2] if len(row) > 2 else 0
+        n = rule_count.get((stage, function), 0) + 1
+        rule_count[(stage, function)] = n
+        name = function + ':' + str(n)
+        rules.append(Rule(stage, name, pattern, repl, flags, re.compile(pattern, flags)))
+    return rules
+
+
+def apply_rule(txt, rule):
+    '''Applies one rule to the passed string and records matches and elapsed time.'''
+
+    start = time.perf_counter()
+    txt, n = rule.regex.subn(rule.repl, txt)
+    seconds = time.perf_counter() - start
+
+    key = (rule.stage, rule.name)
+    if key not in stats:
+        stats[key] = [0, 0, 0.0]
+    stats[key][0] += 1
+    stats[key][1] += n
+    stats[key][2] += seconds
+    return txt
+
+
+def apply_rules(txt, rules):
+    '''Applies the rules of a table in their order.'''
+
+    for rule in rules:
+        txt = apply_rule(txt, rule)
+    return txt
+
+
+def is_literal(rule):
+    '''True if pattern and replacement of the rule contain no regular expression syntax.'''
+
+    return rule.flags == 0 and rule.pattern != '' and not special_characters & set(rule.pattern) and '\\' not in rule.repl
+
+
+def overlap(a, b):
+    '''True if an occurrence of string b can overlap an occurrence of string a (one inside the other or end of one = beginning of the other).'''
+
+    if a in b or b in a:
+        return True
+    return any(a.endswith(b[:k]) or b.endswith(a[:k]) for k in range(1, min(len(a), len(b))))
+
+
+def literal_group(rules):
+    '''Returns the LiteralGroup of literal rules (with a combined pattern if there are several rules).'''
+
+    regex = None
+    if len(rules) > 1:
+        regex = re.compile('|'.join(re.escape(rule.pattern) for rule in rules))
+    return LiteralGroup(rules, {rule.pattern: rule.repl for rule in rules}, regex)
+
+
+def compile_rule_set(rules):
+    '''
+    Returns the steps applying the rules in their order: Rule objects and LiteralGroups of consecutive literal rules.
+    A literal rule joins the group before if its pattern can't overlap the patterns or replacements of the group
+    (the rules of the group can't change each other's matches, so one scan gives the same result).
+    '''
+
+    steps = []
+    group = []
+    for rule in rules:
+        if not is_literal(rule):
+            if group:
+                steps.append(literal_group(group))
+                group = []
+            steps.append(rule)
+            continue
+        if any(overlap(other.pattern, rule.pattern) or overlap(other.repl, rule.pattern) for other in group):
+            steps.append(literal_group(group))
+            group = []
+        group.append(rule)
+    if group:
+        steps.append(literal_group(group))
+    return steps
+
+
+def apply_literal_group(txt, group):
+    '''Applies a LiteralGroup (str.replace() for a single rule, one scan of the combined pattern for several) and records the matches per rule.'''
+
+    start = time.perf_counter()
+    if group.regex is None:
+        rule = group.rules[0]
+        counts = {rule.pattern: txt.count(rule.pattern)}
+        if counts[rule.pattern]:
+            txt = txt.replace(rule.pattern, rule.repl)
+    else:
+        counts = dict.fromkeys(group.replacements, 0)
+
+        def replace(match):
+            counts[match[0]] += 1
+            return group.replacements[match[0]]
+
+        txt = group.regex.sub(replace, txt)
+    seconds = (time.perf_counter() - start) / len(group.rules)
+
+    for rule in group.rules:
+        key = (rule.stage, rule.name)
+        if key not in stats:
+            stats[key] = [0, 0, 0.0]
+        stats[key][0] += 1
+        stats[key][1] += counts[rule.pattern]
+        stats[key][2] += seconds
+    return txt
+
+
+def apply_rule_set(txt, steps):
+    '''Applies the steps of compile_rule_set() in their order.'''
+
+    for step in steps:
+        if isinstance(step, LiteralGroup):
+            txt = apply_literal_group(txt, step)
+        else:
+            txt = apply_rule(txt, step)
+    return txt
+
+
+def compile_entry_rules(stage, functions):
+    '''Returns a list of EntryRule objects for functions taking and returning the text of one entry (named by the function).'''
+
+    return [EntryRule(stage, function.__name__, function) for function in functions]
+
+
+def apply_entry_rules(txt, entry_rules):
+    '''
+    Applies the entry rules in their order to every <entry>-element of the passed string, the text outside of entries is kept.
+    The string is joined once at the end. Recorded per rule: calls, number of entries changed, elapsed time.
+    '''
+
+    counts = [[0, 0.0] for _ in entry_rules]
+    parts = []
+    end = 0
+    for match in entry_pattern.finditer(txt):
+        parts.append(txt[end:match.start()])
+        entry = match[0]
+        for rule, count in zip(entry_rules, counts):
+            start = time.perf_counter()
+            changed = rule.function(entry)
+            count[1] += time.perf_counter() - start
+            if changed != entry:
+                count[0] += 1
+                entry = changed
+        parts.append(entry)
+        end = match.end()
+    parts.append(txt[end:])
+
+    for rule, (n, seconds) in zip(entry_rules, counts):
+        key = (rule.stage, rule.name)
+        if key not in stats:
+            stats[key] = [0, 0, 0.0]
+        stats[key][0] += 1
+        stats[key][1] += n
+        stats[key][2] += seconds
+    return ''.join(parts)
+
+
+def apply_fixpoint(txt, rules):
+    '''
+    Applies the rules in their order repeatedly until a round changes nothing (counted by re.subn()).
+    The string is cut into regions (the <entry>-elements and the text between them); after the first round
+    only the regions changed in the round before are searched again.
+    The number of rounds with changes is recorded per rule in 'iterations'. Raises RuntimeError after 'max_rounds' rounds.
+    '''
+
+    regions = entry_pattern.split(txt)
+    active = [i for i, region in enumerate(regions) if region]
+    counts = [[0, 0.0] for _ in rules]
+    calls = 0
+    rounds = 0
+    while active:
+        if rounds == max_rounds:
+            raise RuntimeError('no fixed point after ' + str(max_rounds) + ' rounds: ' + rules[0].stage + ' ' + rules[0].name)
+        calls += 1
+        changed = []
+        for i in active:
+            region = regions[i]
+            for rule, count in zip(rules, counts):
+                start = time.perf_counter()
+                region, n = rule.regex.subn(rule.repl, region)
+                count[0] += n
+                count[1] += time.perf_counter() - start
+            if region != regions[i]:
+                regions[i] = region
+                changed.append(i)
+        if changed:
+            rounds += 1
+        active = changed
+
+    for rule, (n, seconds) in zip(rules, counts):
+        key = (rule.stage, rule.name)
+        if key not in stats:
+            stats[key] = [0, 0, 0.0]
+        stats[key][0] += calls
+        stats[key][1] += n
+        stats[key][2] += seconds
+        iterations.setdefault(key, []).append(rounds)
+    return ''.join(regions)
+
+
+def reset_stats():
+    '''Deletes the recorded statistics.'''
+
+    stats.clear()
+    iterations.clear()
+
+
+def merge_stats(other, other_iterations=None):
+    '''Adds statistics recorded in another process (e.g. a worker of S_17).'''
+
+    for key, (calls, matches, seconds) in other.items():
+        if key not in stats:
+            stats[key] = [0, 0, 0.0]
+        stats[key][0] += calls
+        stats[key][1] += matches
+        stats[key][2] += seconds
+    for key, rounds in (other_iterations or {}).items():
+        iterations.setdefault(key, []).extend(rounds)
+
+
+def print_stats(limit=None, stage=None):
+    '''Prints the recorded statistics sorted by elapsed time (optionally only the first 'limit' rules, only the rules of 'stage').'''
+
+    rows = sorted(((key, value) for key, value in stats.items() if stage is None or key[0] == stage), key=lambda item: item[1][2], reverse=True)
+    print('{:<6} {:<28} {:>7} {:>9} {:>10}'.format('stage', 'rule', 'calls', 'matches', 'seconds'))
+    for (stage, name), (calls, matches, seconds) in rows[:limit]:
+        print('{:<6} {:<28} {:>7} {:>9} {:>10.4f}'.format(stage, name, calls, matches, seconds))
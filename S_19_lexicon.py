@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+'''
+SCRIPT 19:
+This script contains the lexicon store for the lists of abbreviations, languages and terms
+('lexis.csv', 'pos.csv', 'languages_norm.csv', 'languages_cap_norm.csv', 'languages.txt', 'register.txt').
+Every source is parsed only once: the result is kept in memory and saved as binary file (pickle) in the directory 'cache_dir'.
+The cache file is used as long as the SHA-1 hash of the source file and of the source code of the parsing function is unchanged
+(the module of the function and all scripts it imports, e.g. S_01; see S_20.module_files()), so later runs skip the parsing.
+Lookups (e.g. abbreviation -> tagging, expansion or norm) are done with dictionaries.
+
+Used packages:
+    hashlib (see: https://docs.python.org/3/library/hashlib.html)
+    pickle (see: https://docs.python.org/3/library/pickle.html)
+'''
+
+# === Imports ===
+
+import os
+import sys
+import hashlib
+import pickle
+import S_20_stage_cache as stage_cache
+import S_27_tsv as tsv
+import S_29_artifacts as artifacts
+
+
+# === Parameters ===
+
+# directory of the cache files
+cache_dir = "lexicon_cache"
+
+# parsed sources: (file, parsing function) -> (modification time, hash, data)
+store = {}
+
+# hashes of the source code of the parsing functions: module -> hash
+parser_hashes = {}
+
+# dictionaries created from the tables: (file, key column, value column) -> (table, dictionary)
+maps = {}
+
+
+# === Functions ===
+
+def file_hash(file):
+    '''Returns the SHA-1 hash of the file content.'''
+
+    with open(file, "rb") as infile:
+        return hashlib.sha1(infile.read()).hexdigest()
+
+
+def parser_hash(parser):
+    '''
+    Returns a hash of the source code of the module of the parsing function and of all scripts it imports (as the stage keys of S_20),
+    so a changed function, pattern (e.g. S_11.section_pattern) or helper (e.g. S_01.split_list()) invalidates the cache files.
+    '''
+
+    module = parser.__module__
+    if module not in parser_hashes:
+        hash = hashlib.sha1()
+        for file in sorted(stage_cache.module_files(sys.modules[module])):
+            hash.update(os.path.basename(file).encode("utf8"))
+            with open(file, "rb") as infile:
+                hash.update(infile.read())
+        parser_hashes[module] = hash.hexdigest()
+    return parser_hashes[module]
+
+
+def cache_file(file, parser):
+    '''Returns the path of the cache file of a source file and parsing function.'''
+
+    name = os.path.basename(file) + '.' + parser.__module__ + '.' + parser.__name__ + '.pickle'
+    return os.path.join(cache_dir, name)
+
+
+def read_cache(file, parser, hash):
+    '''Returns the cached data if the cache file belongs to the passed hash, otherwise None.'''
+
+    try:
+        with open(cache_file(file, parser), "rb") as infile:
+            cache = pickle.load(infile)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    if cache['hash'] == hash and cache['parser'] == parser_hash(parser):
+        return cache['data']
+    return None
+
+
+def write_cache(file, parser, hash, data):
+    '''Saves the parsed data as cache file (written to a temporary file first, as several processes may write at once).'''
+
+    os.makedirs(cache_dir, exist_ok=True)
+    path = cache_file(file, parser)
+    tmp = path + '.' + str(os.getpid()) + '.tmp'
+    with open(tmp, "wb") as outfile:
+        pickle.dump({'hash': hash, 'parser': parser_hash(parser), 'data': data}, outfile)
+    os.replace(tmp, path)
+
+
+def load(file, parser):
+    '''
+    Returns the data of 'file' as parsed by the function 'parser' (taking the file name).
+    Order of lookup: memory (unchanged modification time or hash), cache file (unchanged hash), parsing.
+    The returned data is shared and must not be changed.
+    '''
+
+    key = (file, parser)
+    mtime = os.path.getmtime(file)
+    if key in store and store[key][0] == mtime:
+        return store[key][2]
+
+    hash = file_hash(file)
+    if key in store and store[key][1] == hash:
+        data = store[key][2]
+    else:
+        data = read_cache(file, parser, hash)
+        if data is None:
+            data = parser(file)
+            write_cache(file, parser, hash, data)
+    store[key] = (mtime, hash, data)
+    return data
+
+
+def read_table(file):
+    '''Parses CSV file (\\t as delimiter, see S_27) and returns dictionary: column -> list of values.'''
+
+    return tsv.read_table(file)
+
+
+def get_table(file):
+    '''Returns the table of a CSV file (see read_table()); a table put into the store by a stage is taken from there (see S_29).'''
+
+    if file in artifacts.store:
+        return artifacts.store[file]
+    return load(file, read_table)
+
+
+def get_map(file, key, value):
+    '''Returns dictionary of a CSV file: value of column 'key' -> value of column 'value' (first row of each key).'''
+
+    table = get_table(file)
+    if (file, key, value) not in maps or maps[(file, key, value)][0] is not table:
+        dictionary = {}
+        for k, v in zip(table[key], table[value]):
+            dictionary.setdefault(k, v)
+        maps[(file, key, value)] = (table, dictionary)
+    return maps[(file, key, value)][1]
+
+
+def get_positions(file, key):
+    '''Returns dictionary of a CSV file: value of column 'key' -> position of the first row (the order of the list).'''
+
+    table = get_table(file)
+    if (file, key, None) not in maps or maps[(file, key, None)][0] is not table:
+        dictionary = {}
+        for i, k in enumerate(table[key]):
+            dictionary.setdefault(k, i)
+        maps[(file, key, None)] = (table, dictionary)
+    return maps[(file, key, None)][1]
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+'''
+SCRIPT 20:
+This script contains the checkpoint cache for the stages called by script 00.
+The key of a stage is a hash of
+    - the arguments of the stage (e.g. the incoming TEI string),
+    - the content of the files the stage reads,
+    - the source code of the stage module and of all scripts it imports (S_01, S_18, ...).
+The result of the stage and the files it writes (e.g. 'term.csv', 'literature.xml', 'languages.csv') are saved in 'cache_dir/<stage>/<key>/'
+(<stage>: module and name of the stage function, e.g. 'S_13_mark_literature_list.main').
+If the key of a stage is unchanged in a later run, the result is loaded and the files are copied back instead of running the stage.
+Only the 'keep' checkpoints of a stage used last are kept, older ones are deleted when a new checkpoint is saved,
+so the directory doesn't grow with every changed input or code (keep = None: all checkpoints are kept).
+The checkpoint is saved on the background thread of S_29, after the files the stage has put into the store.
+
+Used packages:
+    hashlib (see: https://docs.python.org/3/library/hashlib.html)
+    pickle (see: https://docs.python.org/3/library/pickle.html)
+    shutil (see: https://docs.python.org/3/library/shutil.html)
+'''
+
+# === Imports ===
+
+import os
+import sys
+import types
+import shutil
+import hashlib
+import pickle
+import xml.etree.ElementTree as ET
+import S_29_artifacts as artifacts
+
+
+# === Parameters ===
+
+# directory of the checkpoints
+cache_dir = "stage_cache"
+
+# number of checkpoints kept per stage (the ones used last; None: all)
+keep = 1
+
+
+# === Functions ===
+
+def module_files(module, files=None):
+    '''Returns the source files of the module and of all scripts (S_...) imported by it.'''
+
+    if files is None:
+        files = []
+    if module.__file__ in files:
+        return files
+    files.append(module.__file__)
+    for value in vars(module).values():
+        if isinstance(value, types.ModuleType) and value.__name__.startswith('S_'):
+            module_files(value, files)
+    return files
+
+
+def add_file(hash, file):
+    '''Adds the name and content of a file to the hash (missing files are hashed as such).'''
+
+    hash.update(file.encode("utf8"))
+    if os.path.exists(file):
+        with open(file, "rb") as infile:
+            hash.update(infile.read())
+    else:
+        hash.update(b'\0missing')
+
+
+def stage_key(function, args, reads):
+    '''Returns the hash of the stage function, its arguments, the files it reads and the source code it depends on.'''
+
+    hash = hashlib.sha1()
+    hash.update((function.__module__ + '.' + function.__name__).encode("utf8"))
+    for arg in args:
+        hash.update(b'\0')
+        if isinstance(arg, str):
+            hash.update(arg.encode("utf8"))
+        elif isinstance(arg, ET.Element):
+            # parsed tree (result of script 15)
+            hash.update(ET.tostring(arg))
+        else:
+            hash.update(repr(arg).encode("utf8"))
+    for file in reads:
+        add_file(hash, file)
+    for file in sorted(module_files(sys.modules[function.__module__])):
+        # the name without directory, so that the key doesn't depend on where the scripts are
+        hash.update(os.path.basename(file).encode("utf8"))
+        with open(file, "rb") as infile:
+            hash.update(infile.read())
+    return hash.hexdigest()
+
+
+def prune(stage_dir):
+    '''Deletes the checkpoints of a stage except the 'keep' ones used last (time of the last change of the directory, see run()).'''
+
+    if keep is None:
+        return
+    keys = sorted(os.listdir(stage_dir), key=lambda key: os.path.getmtime(os.path.join(stage_dir, key)), reverse=True)
+    for key in keys[keep:]:
+        shutil.rmtree(os.path.join(stage_dir, key), ignore_errors=True)
+
+
+def save_checkpoint(directory, result_file, writes, data):
+    '''Saves the files written by the stage and the pickled result into the directory of the checkpoint, then prunes the checkpoints of the stage.'''
+
+    # the result is written last (and renamed), so that an interrupted run leaves no incomplete checkpoint
+    os.makedirs(directory, exist_ok=True)
+    for file in writes:
+        shutil.copyfile(file, os.path.join(directory, os.path.basename(file)))
+    tmp = result_file + '.' + str(os.getpid()) + '.tmp'
+    with open(tmp, "wb") as outfile:
+        outfile.write(data)
+    os.replace(tmp, result_file)
+    prune(os.path.dirname(directory))
+
+
+def run(function, args, reads=(), writes=(), key_args=None):
+    '''
+    Runs the stage function with the passed arguments or loads its result from the cache.
+        - reads: files read by the stage
+        - writes: files written by the stage (saved with the result and restored from the cache)
+        - key_args: arguments used for the key if not all arguments change the result (default: args)
+    '''
+
+    # the files read (and restored) must be written completely (see S_29)
+    artifacts.wait(list(reads) + list(writes))
+    key = stage_key(function, args if key_args is None else key_args, reads)
+    directory = os.path.join(cache_dir, function.__module__ + '.' + function.__name__, key)
+    result_file = os.path.join(directory, 'result.pickle')
+
+    if os.path.exists(result_file):
+        print("--- " + function.__module__ + " loaded from cache")
+        # marks the checkpoint as used (see prune())
+        os.utime(directory)
+        artifacts.discard(writes)
+        for file in writes:
+            shutil.copyfile(os.path.join(directory, os.path.basename(file)), file)
+        with open(result_file, "rb") as infile:
+            return pickle.load(infile)
+
+    result = function(*args)
+
+    # the result is pickled now (the stages after it may change it), the files are copied once they are written
+    artifacts.submit(list(writes), save_checkpoint, directory, result_file, list(writes), pickle.dumps(result))
+    return result
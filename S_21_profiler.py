@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+'''
+SCRIPT 21:
+This script contains the profiling mode of script 00 ('python S_00_run_kluge2lex0.py --profile').
+Every function of the passed scripts (main() as well as the functions it calls, e.g. S_05_mark_entry_head.mark_dateGroup) is wrapped
+and the following values are recorded per function:
+    - number of calls
+    - wall time and CPU time (in seconds, including the functions called by the function)
+    - peak memory (tracemalloc; maximum of all calls, relative to the memory in use at the start of the call)
+    - size of the input and output strings (sum of all calls; only string arguments and results are counted)
+The result is printed as table sorted by wall time and saved as JSON file.
+Note: in the parallel mode (S_17) the work of the worker processes is only recorded as a whole.
+
+Used packages:
+    time (see: https://docs.python.org/3/library/time.html)
+    tracemalloc (see: https://docs.python.org/3/library/tracemalloc.html)
+    json (see: https://docs.python.org/3/library/json.html)
+'''
+
+# === Imports ===
+
+import time
+import json
+import inspect
+import functools
+import tracemalloc
+
+
+# === Parameters ===
+
+# file the result is saved to
+json_file = "profile.json"
+
+# number of rows of the printed table (None: all functions)
+table_rows = 40
+
+# recorded values: 'module.function' -> dictionary
+stats = {}
+
+# peak memory of the running (nested) calls
+stack = []
+
+# wrapped functions: (module, name, original function)
+wrapped = []
+
+
+# === Functions ===
+
+def string_size(value):
+    '''Returns the length of a string (0 for other objects).'''
+
+    return len(value) if isinstance(value, str) else 0
+
+
+def enter():
+    '''Starts the memory measurement of a call.'''
+
+    current, peak = tracemalloc.get_traced_memory()
+    if stack:
+        stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+    tracemalloc.reset_peak()
+    stack.append({'start': current, 'peak': current})
+
+
+def leave():
+    '''Ends the memory measurement of a call and returns its peak (passed on to the calling function).'''
+
+    current, peak = tracemalloc.get_traced_memory()
+    frame = stack.pop()
+    peak = max(frame['peak'], peak)
+    if stack:
+        stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+    tracemalloc.reset_peak()
+    return peak - frame['start']
+
+
+def wrap(module, name, function):
+    '''Returns the function wrapped by the measurement.'''
+
+    key = module.__name__ + '.' + name
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        enter()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            peak = leave()
+            if key not in stats:
+                stats[key] = {'calls': 0, 'wall': 0.0, 'cpu': 0.0, 'peak': 0, 'input': 0, 'output': 0}
+            record = stats[key]
+            record['calls'] += 1
+            record['wall'] += wall
+            record['cpu'] += cpu
+            record['peak'] = max(record['peak'], peak)
+            record['input'] += sum(string_size(arg) for arg in args) + sum(string_size(arg) for arg in kwargs.values())
+        record['output'] += string_size(result)
+        return result
+
+    return wrapper
+
+
+def wrap_modules(modules):
+    '''Wraps all functions defined in the passed modules (generator functions are left out).'''
+
+    for module in modules:
+        for name, value in list(vars(module).items()):
+            if inspect.isfunction(value) and value.__module__ == module.__name__ and not inspect.isgeneratorfunction(value):
+                wrapped.append((module, name, value))
+                setattr(module, name, wrap(module, name, value))
+
+
+def unwrap_modules():
+    '''Restores the original functions.'''
+
+    for module, name, function in wrapped:
+        setattr(module, name, function)
+    wrapped.clear()
+
+
+def print_table(rows=None):
+    '''Prints the recorded values sorted by wall time (optionally only the first 'rows' functions).'''
+
+    items = sorted(stats.items(), key=lambda item: item[1]['wall'], reverse=True)
+    print('{:<55} {:>7} {:>9} {:>9} {:>10} {:>10} {:>10}'.format('function', 'calls', 'wall [s]', 'cpu [s]', 'peak [MB]', 'in [KB]', 'out [KB]'))
+    for key, record in items[:rows]:
+        print('{:<55} {:>7} {:>9.3f} {:>9.3f} {:>10.2f} {:>10.1f} {:>10.1f}'.format(
+            key, record['calls'], record['wall'], record['cpu'], record['peak'] / 2**20, record['input'] / 2**10, record['output'] / 2**10))
+
+
+def save_json(file):
+    '''Saves the recorded values sorted by wall time as JSON file.'''
+
+    items = sorted(stats.items(), key=lambda item: item[1]['wall'], reverse=True)
+    with open(file, "w", encoding="utf8") as outfile:
+        json.dump([dict(function=key, **record) for key, record in items], outfile, indent=2)
+
+
+def profile(function, modules):
+    '''Runs the function (e.g. main() of script 00) with all functions of the passed modules measured, prints the table and saves the JSON file.'''
+
+    stats.clear()
+    wrap_modules(modules)
+    tracemalloc.start()
+    try:
+        result = function()
+    finally:
+        tracemalloc.stop()
+        unwrap_modules()
+    print_table(table_rows)
+    save_json(json_file)
+    print("Profile saved to " + json_file)
+    return result
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+'''
+SCRIPT 22:
+Generator of a synthetic corpus in the shape of the (copyrighted) input data, used to test and benchmark the scripts without the real data.
+Writes into the passed directory:
+    - kluge_L.html: Finereader-style entries (font1 bold lemmas, font5 italic POS/usg, dates like "(9. Jh.)",
+      word forms with languages, ↗ references, "Ebenso"/"Dazu" sections and referencing sections in font4)
+    - header files, lexis.txt, pos.txt, languages.txt, register.txt, terminology.txt, literature.txt, periodicals.txt
+    - lexis.csv, pos.csv, languages_norm.csv, languages_cap_norm.csv (already completed)
+The number of entries can be passed, the same seed gives the same corpus.
+
+Usage: python S_22_synthetic_corpus.py <directory> <number of entries> [--seed n] [--section L]
+(with another section, e.g. 'K', the files 'kluge_K.html' and 'header_K.txt' are written, see S_24)
+
+Used packages:
+    random (see: https://docs.python.org/3/library/random.html)
+'''
+
+# === Imports ===
+
+import os
+import random
+import argparse
+
+
+# === Parameters ===
+
+syllables = ["la", "le", "li", "lo", "lu", "ber", "chen", "ke", "tor", "ma", "sen", "ding", "rin", "te", "kel"]
+
+# abbreviation, expansion, norm
+languages = [("ahd.", "althochdeutsch", "goh"), ("mhd.", "mittelhochdeutsch", "gmh"), ("as.", "altsächsisch", "osx"),
+             ("ae.", "altenglisch", "ang"), ("gr.", "griechisch", "grc"), ("l.", "lateinisch", "la"),
+             ("anord.", "altnordisch", "non"), ("got.", "gotisch", "got")]
+
+# abbreviation, expansion, tagging
+pos = [("Sf.", "Substantiv feminin", '<gramGrp><gram type="pos" expand="Substantiv">S</gram><gram type="gen" expand="feminin">f.</gram></gramGrp>'),
+       ("Sm.", "Substantiv maskulin", '<gramGrp><gram type="pos" expand="Substantiv">S</gram><gram type="gen" expand="maskulin">m.</gram></gramGrp>'),
+       ("Sn.", "Substantiv neutrum", '<gramGrp><gram type="pos" expand="Substantiv">S</gram><gram type="gen" expand="neutrum">n.</gram></gramGrp>'),
+       ("Adj.", "Adjektiv", '<gramGrp><gram type="pos" expand="Adjektiv">Adj.</gram></gramGrp>'),
+       ("Vsw.", "schwaches Verb", '<gramGrp><gram type="pos" expand="schwaches Verb">Vsw.</gram></gramGrp>')]
+
+# abbreviation, expansion, usg type
+lexis = [("std.", "standardsprachlich", "register"), ("reg.", "regional", "geo"), ("obs.", "obsolet", "time")]
+
+terms = ["Ablaut", "Umlaut", "Lautverschiebung", "Dissimilation", "Assimilation", "Kürzung"]
+
+header = '<TEI xmlns="http://www.tei-c.org/ns/1.0"><teiHeader><fileDesc><titleStmt><title>{}</title></titleStmt></fileDesc></teiHeader>'
+
+terminology = ("Einführung in die Terminologie\n0.0 Vorbemerkung zum Ablaut.\nLaute\n1.\n1.1 Der Umlaut ist eine Assimilation.\n"
+               "1.2 Die Kürzung, eine Form.\nWandel\n2.\n2.1 Die Lautverschiebung und Dissimilation.")
+
+literature = ("Abgekürzt zitierte Literatur\n(Liste der Werke)\n"
+              "EWNl=Philippa, M.: Etymologisch woordenboek van het Nederlands. Amsterdam 2003.\n"
+              "Kluge, F. (1926): Stammbildungslehre. Halle 1926.\n"
+              "Meier, H. (2001): Wortkunde. Berlin 2001.\n"
+              "Müller, A.: Wortkunde. Bonn 1999.\n")
+
+periodicals = "Abkürzungen der Zeitschriften\nZDW\tZeitschrift für deutsche Wortforschung\nFS\tFestschrift Reihe\n"
+
+
+# === Functions ===
+
+def word(r, n=None):
+    '''Returns an artificial word of 'n' (default: 2-3) syllables.'''
+
+    return "".join(r.choice(syllables) for _ in range(n or r.randint(2, 3)))
+
+
+def extra(r):
+    '''Returns the optional "Ebenso" (translation) and "Dazu" (related entry) parts of an entry.'''
+
+    txt = ''
+    if r.random() < 0.3:
+        l1, l2 = r.sample(languages, 2)
+        txt += ('Ebenso %s </span><span class="font5" style="font-style:italic;">%s</span><span class="font5">, %s </span>'
+                '<span class="font5" style="font-style:italic;">%s</span><span class="font5">. '
+                % (l1[0], word(r).lower(), l2[0], word(r).lower()))
+    if r.random() < 0.2:
+        txt += 'Dazu </span><span class="font1" style="font-weight:bold;">%s</span><span class="font5"> ‘%s’. ' % (word(r).lower(), word(r))
+    return txt
+
+
+def entry(r, lemmas):
+    '''Returns one entry as HTML (a reference entry in 10 % of the cases). 'lemmas' collects the lemmas for the ↗ references.'''
+
+    lemma = word(r).capitalize()
+    if r.random() < 0.1:
+        return ('<p><span class="font1" style="font-weight:bold;">%s</span>'
+                '<span class="font5" style="font-style:italic;"> %s ↗%s.</span></p>' % (lemma, r.choice(pos)[0], r.choice(lemmas)))
+    lemmas.append(lemma)
+    if r.random() < 0.1:
+        lemma += '<sup>%d</sup>' % r.randint(1, 2)
+    entry_pos = r.choice(pos)[0]
+    usg = r.choice(lexis)[0]
+    century = r.randint(8, 19)
+    l1, l2 = r.sample(languages, 2)
+    ref = r.choice(lemmas)
+    term = r.choice(terms)
+    html = ('<p><span class="font1" style="font-weight:bold;">%s</span>'
+            '<span class="font5" style="font-style:italic;"> %s %s </span>'
+            '<span class="font5">(%d. Jh.). ‘%s’ mit %s aus %s </span>'
+            '<span class="font5" style="font-style:italic;">%s</span>'
+            '<span class="font5"> ‘%s’, %s </span>'
+            '<span class="font5" style="font-style:italic;">%s</span>'
+            '<span class="font5"> zu ↗%s. %s</span></p>'
+            % (lemma, entry_pos, usg, century, word(r), term, l1[0], word(r).lower(), word(r), l2[0], word(r).lower(), ref, extra(r)))
+
+    # referencing section: addition + bibliography or bibliography only
+    if r.random() < 0.2:
+        html += ('<p><span class="font4">Weitere Angaben zu %s. - </span>'
+                 '<span class="font4" style="font-variant:small-caps;">Kluge (1926), %d.</span></p>' % (word(r), r.randint(1, 9)))
+    elif r.random() < 0.7:
+        bibl = r.choice(["EWNl 3 (2007), %d" % r.randint(1, 400), "Kluge (1926), %d" % r.randint(1, 99),
+                         "Müller, A.: Wortkunde (1999), %d" % r.randint(1, 99), "ZDW 12 (1910), %d" % r.randint(1, 99)])
+        html += ('<p><span class="font4" style="font-variant:small-caps;">%s; Meier (2001), %d.</span></p>'
+                 % (bibl, r.randint(1, 200)))
+    return html
+
+
+def write(directory, name, txt):
+    '''Saves string into the directory.'''
+
+    with open(os.path.join(directory, name), "w", encoding="utf8") as outfile:
+        outfile.write(txt)
+
+
+# === Coordinating function ===
+
+def main(directory, entries, seed=1, section="L"):
+    r = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    lemmas = ["Laus"]
+    html = "".join(entry(r, lemmas) for _ in range(entries))
+    write(directory, "kluge_%s.html" % section, '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n<title>%s</title>\n</head>\n<body>\n' % section
+          + html + '\n</body>\n</html>\n')
+    for name in (section, "literature", "periodicals", "terminology"):
+        write(directory, "header_%s.txt" % name, header.format(name))
+
+    write(directory, "lexis.txt", "\n".join("%s = %s" % (abbr, expand) for abbr, expand, usg in lexis))
+    write(directory, "pos.txt", "\n".join("%s = %s" % (abbr, expand) for abbr, expand, tagging in pos))
+    write(directory, "languages.txt", "\n".join("%s = %s" % (abbr, expand) for abbr, expand, norm in languages))
+    write(directory, "lexis.csv", "\tabbr\texpand\tusg\ttagging\n" + "\n".join(
+        '%d\t%s\t%s\t%s\t<usg type="%s" expand="%s">%s</usg>' % (i, abbr, expand, usg, usg, expand, abbr) for i, (abbr, expand, usg) in enumerate(lexis)) + "\n")
+    write(directory, "pos.csv", "\tabbr\texpand\ttagging\n" + "\n".join(
+        '%d\t%s\t%s\t%s' % (i, abbr, expand, tagging) for i, (abbr, expand, tagging) in enumerate(pos)) + "\n")
+    write(directory, "languages_norm.csv", "abbr\texpand\tnorm\n" + "\n".join("%s\t%s\t%s" % language for language in languages) + "\n")
+    write(directory, "languages_cap_norm.csv", "abbr\texpand\tnorm\n" + "\n".join(
+        "%s\t%s\t%s" % (abbr.capitalize(), expand, norm) for abbr, expand, norm in languages) + "\n")
+    write(directory, "register.txt", "Register\n" + "\n".join("%s %d.%d" % (term, i % 3 + 1, i) for i, term in enumerate(terms)))
+    write(directory, "terminology.txt", terminology)
+    write(directory, "literature.txt", literature)
+    write(directory, "periodicals.txt", periodicals)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Writes a synthetic Kluge-style corpus.")
+    parser.add_argument("directory")
+    parser.add_argument("entries", type=int)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--section", default="L")
+    arguments = parser.parse_args()
+    main(arguments.directory, arguments.entries, arguments.seed, arguments.section)
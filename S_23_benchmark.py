@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+'''
+SCRIPT 23:
+Scaling benchmark of the stages called by script 00.
+For every scale factor (default: 1, 4, 16, 64 times the size of section "L") a synthetic corpus is written by script 22
+into 'bench_dir/<entries>/' and the pipeline of script 00 is run there (without the checkpoint cache).
+The wall time of every stage (main() of the scripts 03-17) is recorded and printed as table.
+For every stage the growth exponent is estimated (slope of log(time) over log(size), 1.0 = linear);
+stages growing faster than 'superlinear' are flagged.
+The result is saved as JSON file.
+
+Usage: python S_23_benchmark.py [--entries n] [--factors 1 4 16 64] [--limit seconds] [--parallel]
+
+Used packages:
+    time (see: https://docs.python.org/3/library/time.html)
+    math (see: https://docs.python.org/3/library/math.html)
+    json (see: https://docs.python.org/3/library/json.html)
+'''
+
+# === Imports ===
+
+import os
+import time
+import math
+import json
+import argparse
+import importlib
+import functools
+import S_00_run_kluge2lex0
+import S_22_synthetic_corpus
+
+
+# === Parameters ===
+
+# number of entries of the synthetic section "L" (scale factor 1)
+entries = 500
+factors = [1, 4, 16, 64]
+seed = 1
+
+# directory of the synthetic corpora
+bench_dir = "benchmark"
+
+# file the result is saved to
+json_file = "benchmark.json"
+
+# growth exponent above which a stage is flagged as superlinear
+superlinear = 1.2
+
+# stages with less time at the largest size are not flagged (measuring noise)
+min_time = 0.05
+
+# larger factors are skipped once a run took longer (in seconds; None: no limit)
+limit = 600
+
+# stage modules: main() is timed
+stages = ["S_03_kluge2validtei", "S_04_create_csv_pos_lexis", "S_05_mark_entry_head", "S_06_mark_bibl", "S_07_mark_lang",
+          "S_08_mark_etym", "S_09_mark_translation_addition", "S_10_mark_term_chapter", "S_11_mark_term", "S_12_finish_markup",
+          "S_13_mark_literature_list", "S_14_mark_periodicals_list", "S_15_add_attributes", "S_16_sort_attributes",
+          "S_17_parallel_markup"]
+
+
+# === Functions ===
+
+def timed(function, times):
+    '''Returns the function wrapped by a measurement of the wall time (added to 'times').'''
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            times[function.__module__] = times.get(function.__module__, 0.0) + time.perf_counter() - start
+
+    return wrapper
+
+
+def run_pipeline(directory):
+    '''Runs the pipeline of script 00 in the directory and returns dictionary: stage -> wall time.'''
+
+    times = {}
+    modules = [importlib.import_module(stage) for stage in stages]
+    originals = [module.main for module in modules]
+    cwd = os.getcwd()
+    cache = S_00_run_kluge2lex0.cache
+    try:
+        for module in modules:
+            module.main = timed(module.main, times)
+        S_00_run_kluge2lex0.cache = False
+        os.chdir(directory)
+        start = time.perf_counter()
+        S_00_run_kluge2lex0.main()
+        times['total'] = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+        S_00_run_kluge2lex0.cache = cache
+        for module, main in zip(modules, originals):
+            module.main = main
+    return times
+
+
+def growth(sizes, times):
+    '''Returns the growth exponent: slope of the least squares line through (log(size), log(time)).'''
+
+    points = [(math.log(size), math.log(t)) for size, t in zip(sizes, times) if t > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, y in points) / len(points)
+    mean_y = sum(y for x, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, y in points)
+    if variance == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+
+def evaluate(results):
+    '''Returns list of dictionaries (one per stage): times per size, growth exponent and flag.'''
+
+    sizes = [result['entries'] for result in results]
+    rows = []
+    for stage in stages + ['total']:
+        times = [result['times'].get(stage) for result in results]
+        if any(t is None for t in times):
+            continue
+        exponent = growth(sizes, times)
+        flagged = stage != 'total' and exponent is not None and exponent > superlinear and times[-1] >= min_time
+        rows.append({'stage': stage, 'times': times, 'exponent': exponent, 'superlinear': flagged})
+    return rows
+
+
+def print_table(results, rows):
+    '''Prints the times per stage and size, the growth exponent and the flag.'''
+
+    print('{:<32}'.format('stage') + ''.join('{:>11}'.format(str(result['entries'])) for result in results) + '{:>10}'.format('exponent'))
+    for row in rows:
+        exponent = '-' if row['exponent'] is None else '{:.2f}'.format(row['exponent'])
+        print('{:<32}'.format(row['stage']) + ''.join('{:>11.3f}'.format(t) for t in row['times']) + '{:>10}'.format(exponent)
+              + ('  superlinear' if row['superlinear'] else ''))
+
+
+def save_json(file, results, rows):
+    '''Saves sizes, stages and growth exponents as JSON file.'''
+
+    with open(file, "w", encoding="utf8") as outfile:
+        json.dump({'entries': [result['entries'] for result in results], 'stages': rows}, outfile, indent=2)
+
+
+# === Coordinating function ===
+
+def main():
+    results = []
+    for factor in factors:
+        n = entries * factor
+        directory = os.path.join(bench_dir, str(n))
+        print("--- benchmark: %d entries (%dx)" % (n, factor))
+        S_22_synthetic_corpus.main(directory, n, seed)
+        results.append({'entries': n, 'times': run_pipeline(directory)})
+        if limit is not None and results[-1]['times']['total'] > limit:
+            print("... time limit reached, larger sizes are skipped")
+            break
+
+    rows = evaluate(results)
+    print_table(results, rows)
+    save_json(json_file, results, rows)
+    print("Benchmark saved to " + json_file)
+    return rows
+
+
+# the guard is required by the process pool of S_17
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Times the stages of script 00 on synthetic corpora of growing size.")
+    parser.add_argument("--entries", type=int, default=entries, help="number of entries at scale factor 1")
+    parser.add_argument("--factors", type=int, nargs="+", default=factors, help="scale factors")
+    parser.add_argument("--limit", type=float, default=limit, help="skip larger sizes once a run took longer (seconds)")
+    parser.add_argument("--parallel", action="store_true", help="run scripts 05-12 in parallel (see S_17)")
+    arguments = parser.parse_args()
+    entries, factors, limit = arguments.entries, arguments.factors, arguments.limit
+    S_00_run_kluge2lex0.parallel = arguments.parallel
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+'''
+SCRIPT 24:
+Batch mode of script 00 for several sections of the dictionary (e.g. 'python S_24_batch.py K L M').
+The resources shared by all sections are built only once:
+    - "lexis_tofill.csv", "pos_tofill.csv" (script 04), "languages.csv", "languages_cap.csv" (script 07)
+    - "terminology.xml", "term.csv" (scripts 10 and 11), "literature.xml" (script 13), "periodicals.xml" (script 14) and their indexes (see S_25)
+    - the lists of abbreviations, languages and terms (loaded by S_19 before the worker processes are started, so they inherit them)
+Afterwards the sections are converted in a pool of 'workers' processes (scripts 03, 05-12, 15, 16; one section per task).
+
+Input: "kluge_<section>.html" and "header_<section>.txt" per section, the other files listed under "Parameters" of script 00
+Output:
+    - "kluge_lex0_<section>.xml" per section
+    - "kluge_lex0.xml": all sections in one dictionary, the references (<ref target="">) are resolved across the sections
+Scripts 15 and 16 run in the streaming mode (see S_15.stream_main()), the combined dictionary is written entry by entry as well,
+so the memory needed doesn't grow with the number of sections.
+
+Used packages:
+    multiprocessing (see: https://docs.python.org/3/library/multiprocessing.html)
+    xml.etree.ElementTree (see: https://docs.python.org/3/library/xml.etree.elementtree.html)
+'''
+
+# === Imports ===
+
+import os
+import argparse
+import multiprocessing
+import S_01_helpers as helpers
+import S_00_run_kluge2lex0 as run
+import S_03_kluge2validtei
+import S_04_create_csv_pos_lexis
+import S_05_mark_entry_head
+import S_07_mark_lang
+import S_10_mark_term_chapter
+import S_11_mark_term
+import S_13_mark_literature_list
+import S_14_mark_periodicals_list
+import S_15_add_attributes
+import S_17_parallel_markup
+import S_19_lexicon as lexicon
+
+
+# === Parameters ===
+
+html_pattern = "kluge_{}.html"
+header_pattern = "header_{}.txt"
+markup_pattern = "kluge_markup_{}.xml"
+output_pattern = "kluge_lex0_{}.xml"
+joined_file = "kluge_markup_all.xml"
+combined_file = "kluge_lex0.xml"
+
+# number of processes; None: number of CPUs (at most one per section)
+workers = None
+
+# resources of the current process (set by init_worker())
+resources = {}
+
+
+# === Functions ===
+
+def build_shared():
+    '''Builds the resources shared by all sections (with the checkpoint cache of script 00) and returns the table of terms.'''
+
+    run.stage(S_04_create_csv_pos_lexis.main, [run.lexis_file, run.pos_file], reads=[run.lexis_file, run.pos_file],
+              writes=["lexis_tofill.csv", "pos_tofill.csv"])
+    run.stage(S_10_mark_term_chapter.main, [run.term_file, run.term_header, run.reg_file], reads=[run.term_file, run.term_header, run.reg_file],
+              writes=["terminology.xml", "term.csv"])
+    run.stage(S_13_mark_literature_list.main, [run.literature_file, run.literature_header, run.literature_xml], reads=[run.literature_file, run.literature_header],
+              writes=[run.literature_xml, run.literature_index])
+    run.stage(S_14_mark_periodicals_list.main, [run.periodicals_file, run.periodicals_header, run.periodicals_xml], reads=[run.periodicals_file, run.periodicals_header],
+              writes=[run.periodicals_xml, run.periodicals_index])
+    S_07_mark_lang.save_lang_dict(run.lang_file)
+    term_df = S_11_mark_term.create_term_df(run.reg_file)
+
+    # parsed once here, inherited by the worker processes
+    for csv in (run.lexis_csv, run.pos_csv, run.lang_csv, run.lang_cap_csv):
+        lexicon.get_table(csv)
+    for lang_dict in S_07_mark_lang.create_lang_dict(run.lang_file):
+        S_07_mark_lang.get_lang_tagger(lang_dict)
+    S_11_mark_term.get_term_tagger(term_df)
+    return term_df
+
+
+def init_worker(term_df):
+    '''Stores the resources needed by convert_section() in the worker process.'''
+
+    resources['term_df'] = term_df
+
+
+def convert_section(section):
+    '''Converts one section (scripts 03, 05-12, 15, 16) and saves it. Returns (section, output file).'''
+
+    tei = S_03_kluge2validtei.main(html_pattern.format(section), header_pattern.format(section))
+    tei = S_05_mark_entry_head.mark_entry(tei)
+    S_17_parallel_markup.init_worker(run.lexis_csv, run.pos_csv, run.lang_file, resources['term_df'], section)
+    tei = S_17_parallel_markup.mark_shard(tei)
+    helpers.save_file(tei, markup_pattern.format(section))
+    del tei
+    output = output_pattern.format(section)
+    S_15_add_attributes.stream_main(markup_pattern.format(section), output, run.periodicals_xml, run.literature_xml, run.lang_csv,
+                                    run.lang_cap_csv)
+    return section, output
+
+
+def convert_sections(sections, term_df, workers):
+    '''Converts the sections in a pool of processes (in the current process with workers = 1). Returns dictionary: section -> output file.'''
+
+    outputs = {}
+    if workers == 1:
+        init_worker(term_df)
+        for section in sections:
+            section, output = convert_section(section)
+            print("... section " + section + " saved to " + output)
+            outputs[section] = output
+        return outputs
+
+    with multiprocessing.Pool(workers, initializer=init_worker, initargs=(term_df,)) as pool:
+        for section, output in pool.imap_unordered(convert_section, sections):
+            print("... section " + section + " saved to " + output)
+            outputs[section] = output
+    return outputs
+
+
+def join(sections, outputs, file):
+    '''Joins the <div type="section"> of all sections in one document (header of the first section). Only one section is read at a time.'''
+
+    with open(file, "w", encoding="utf8") as outfile:
+        for i, section in enumerate(sections):
+            tei = helpers.read_file(outputs[section])
+            start = tei.index('<body>') + len('<body>')
+            end = tei.index('</body>')
+            if i == 0:
+                outfile.write(tei[:start])
+            outfile.write(tei[start:end])
+            if i == len(sections) - 1:
+                outfile.write(tei[end:])
+
+
+def combine(sections, outputs):
+    '''Writes the combined dictionary: joins the sections and resolves the references across the sections (in the streaming mode of script 15).'''
+
+    join(sections, outputs, joined_file)
+    id_dict = S_15_add_attributes.collect_ids(joined_file)
+    S_15_add_attributes.stream(joined_file, combined_file, lambda container: S_15_add_attributes.ref_set_target(container, id_dict))
+
+
+# === Coordinating function ===
+
+def main(sections, workers=None):
+    print("--- 24_batch.py running: sections " + ' '.join(sections))
+    if not workers:
+        workers = min(os.cpu_count() or 1, len(sections))
+
+    term_df = build_shared()
+    outputs = convert_sections(sections, term_df, workers)
+    combine(sections, outputs)
+    print("... done!")
+    return outputs
+
+
+# the guard is required by the process pool
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Converts several sections of Kluge into TEI Lex-0.")
+    parser.add_argument("sections", nargs="+", help="names of the sections, e.g. K L M")
+    parser.add_argument("--workers", type=int, default=workers, help="number of processes (default: number of CPUs)")
+    arguments = parser.parse_args()
+    main(arguments.sections, arguments.workers)
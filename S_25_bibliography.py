@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+'''
+SCRIPT 25:
+This script contains the index of the lists of literature and periodicals (script 13: "literature.xml", script 14: "periodicals.xml")
+used by script 15 to link the <bibl>-elements of the entries (attribute "corresp").
+The index is built from the tagged list in a single traversal and contains dictionaries with the xml:ids:
+    - literature: short titles, Festschriften/Gedenkschriften, authors (and year), editors (and year)
+    - periodicals: short titles
+Scripts 13 and 14 save the index next to the XML file (e.g. "literature_index.pickle"), together with the SHA-1 hash of the XML file.
+Script 15 loads the index without parsing the XML file; the XML file is only parsed if the index is missing or doesn't belong to it.
+In the same run the index is taken from the store of S_29 (see put_list()), the files are written in the background.
+
+Used packages:
+    hashlib (see: https://docs.python.org/3/library/hashlib.html)
+    pickle (see: https://docs.python.org/3/library/pickle.html)
+    ElementTree XML (see: https://docs.python.org/2/library/xml.etree.elementtree.html)
+'''
+
+# === Imports ===
+
+import os
+import hashlib
+import pickle
+import xml.etree.ElementTree as ET
+import S_01_helpers as helpers
+import S_29_artifacts as artifacts
+
+
+# === Parameters ===
+
+ns = '{http://www.w3.org/XML/1998/namespace}'
+
+# loaded indexes: XML file -> (modification time, hash, index)
+store = {}
+
+
+# === Functions ===
+
+def bibl_id(bibl):
+    '''Returns the xml:id of a <bibl> (with namespace if parsed from a file, without if set by helpers.add_bibl_id()).'''
+
+    return bibl.get(ns + 'id') or bibl.get('xml:id')
+
+
+def literature_index(root):
+    '''Returns the dictionaries of the literature list in one traversal:
+        - 'short': short title -> id
+        - 'fs': title of Festschrift/Gedenkschrift (before ':') -> id
+        - 'author': author (+ '_' + year if a date is tagged) -> id
+        - 'editor': editor (+ ',' + year if a date is tagged) -> id
+    '''
+
+    index = {'short': {}, 'fs': {}, 'author': {}, 'editor': {}}
+
+    for bibl in ET.ElementTree(root).findall('.//listBibl/bibl'):
+        id = bibl_id(bibl)
+        year = bibl.find('date')
+
+        for short in bibl.findall('./title[@type="short"]'):
+            index['short'][short.text.strip()] = id
+
+        for title in bibl.findall('./title'):
+            str_title = title.text.split(':')[0]
+            if 'FS' in str_title or 'GS' in str_title:
+                index['fs'][str_title] = id
+
+        for author in bibl.findall('./author'):
+            auth = author.text.strip()
+            # if there is a date mentioned behind author
+            if year != None:
+                auth = auth + '_' + year.text
+            index['author'][auth] = id
+
+        for editor in bibl.findall('./editor'):
+            ed = editor.text.strip()
+            # if there is a date mentioned behind editor
+            if year != None:
+                ed = ed + ',' + year.text
+            index['editor'][ed] = id
+
+    return index
+
+
+def periodicals_index(root):
+    '''Returns the dictionary of the periodicals list: 'short': short title -> id.'''
+
+    index = {'short': {}}
+
+    for bibl in ET.ElementTree(root).findall('.//listBibl/bibl'):
+        id = bibl_id(bibl)
+        # a <bibl> without short title is stored under the title of the <bibl> before (as in the former version)
+        for title in bibl.findall('./title[@type="short"]'):
+            title = title.text
+        index['short'][title] = id
+
+    return index
+
+
+def file_hash(file):
+    '''Returns the SHA-1 hash of the file content.'''
+
+    with open(file, "rb") as infile:
+        return hashlib.sha1(infile.read()).hexdigest()
+
+
+def index_file(xml_file):
+    '''Returns the name of the index file of a list (e.g. "literature.xml" -> "literature_index.pickle").'''
+
+    return os.path.splitext(xml_file)[0] + '_index.pickle'
+
+
+def save_index(xml_file, index):
+    '''Saves the index of the XML file with its hash (written to a temporary file first).'''
+
+    path = index_file(xml_file)
+    hash = file_hash(xml_file)
+    tmp = path + '.' + str(os.getpid()) + '.tmp'
+    with open(tmp, "wb") as outfile:
+        pickle.dump({'hash': hash, 'index': index}, outfile)
+    os.replace(tmp, path)
+    store[xml_file] = (os.path.getmtime(xml_file), hash, index)
+
+
+def put_list(xml_file, xml, index):
+    '''Puts the XML string and the index of a list into the store of S_29; the XML file and then the index file (containing its hash) are written in the background.'''
+
+    artifacts.put(xml_file, xml, helpers.save_file, xml, xml_file)
+    artifacts.put(index_file(xml_file), index, save_index, xml_file, index)
+
+
+def load_index(xml_file, create_index):
+    '''
+    Returns the index of the XML file. Order of lookup: store of S_29 (put by script 13 or 14 in this run), memory (unchanged modification time),
+    index file (unchanged hash), parsing of the XML file by 'create_index' (literature_index() or periodicals_index(); the index file is written afterwards).
+    '''
+
+    if index_file(xml_file) in artifacts.store:
+        return artifacts.store[index_file(xml_file)]
+    mtime = os.path.getmtime(xml_file)
+    if xml_file in store and store[xml_file][0] == mtime:
+        return store[xml_file][2]
+
+    hash = file_hash(xml_file)
+    try:
+        with open(index_file(xml_file), "rb") as infile:
+            cache = pickle.load(infile)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        cache = None
+    if cache is not None and cache['hash'] == hash:
+        index = cache['index']
+        store[xml_file] = (mtime, hash, index)
+        return index
+
+    index = create_index(helpers.get_root(xml_file))
+    save_index(xml_file, index)
+    return index
+
+
+def get_bibl_dicts(periodicals_xml, literature_xml):
+    '''Returns the dictionaries used by S_15.bibl_add_corresp(): periodicals, short titles, Festschriften, authors, editors.'''
+
+    literature = load_index(literature_xml, literature_index)
+    periodicals = load_index(periodicals_xml, periodicals_index)
+    return periodicals['short'], literature['short'], literature['fs'], literature['author'], literature['editor']
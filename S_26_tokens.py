@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+'''
+SCRIPT 26:
+Token representation of the TEI string for the markup stages (scripts 03-12 work on one flat string).
+The document is stored in parallel arrays, one item per token:
+    - kinds: TEXT, START ('<hi rend="italics">'), END ('</hi>'), EMPTY ('<mark/>'), OTHER (comment, processing instruction, declaration)
+    - refs: text: number of the segment the text is stored in; tag: number of the interned tag
+    - starts, ends: text: offsets of the text in its segment; tag: 0
+The text is not copied: text tokens point into the string the document was read from (segment 0);
+text added by an edit is stored as a further segment. Every distinct tag (e.g. '<hi rend="italics">') is stored once
+with its name and attributes (interned), so comparing tags means comparing numbers.
+to_string() joins the document again (to_string(tokenize(txt)) == txt).
+
+The edits (remove_tags(), insert(), wrap(), sub_text()) return a new document built in one pass over the tokens.
+Regular expressions are applied to single text tokens (find_text(), sub_text()), so they never run across a tag:
+both match the text of the token on its own (a copy of it), so '^' and '$' match at the ends of the token
+and lookbehinds/lookaheads don't see the neighbouring tags (e.g. '(?<=>)a' never matches).
+Stages can be migrated one function at a time: tokenize() the string, apply the edits, to_string() at the end.
+
+Used packages:
+    re (see: https://docs.python.org/3/library/re.html)
+    array (see: https://docs.python.org/3/library/array.html)
+'''
+
+# === Imports ===
+
+import re
+from array import array
+
+
+# === Parameters ===
+
+TEXT, START, END, EMPTY, OTHER = 0, 1, 2, 3, 4
+
+tag_pattern = re.compile(r'<[^>]*>')
+
+
+# === Functions ===
+
+# --- Reading and writing ---
+
+def new_document(segments, tags):
+    '''Returns an empty document sharing the text segments and the interned tags.'''
+
+    return {'kinds': array('b'), 'refs': array('i'), 'starts': array('i'), 'ends': array('i'), 'segments': segments, 'tags': tags}
+
+
+def parse_tag(tag):
+    '''Returns (kind, name, attributes) of a tag string, e.g. '<ref type="entry">' -> (START, 'ref', ' type="entry"').'''
+
+    if tag[1:2] in ('!', '?'):
+        return OTHER, '', tag
+    if tag[1:2] == '/':
+        return END, tag[2:-1].strip(), ''
+    if tag.endswith('/>'):
+        kind, body = EMPTY, tag[1:-2]
+    else:
+        kind, body = START, tag[1:-1]
+    name = body.split(None, 1)[0] if body.strip() else ''
+    return kind, name, body[len(name):]
+
+
+def tag_id(doc, tag):
+    '''Returns the number of the interned tag (the tag is added if it is new).'''
+
+    ids = doc['tags']['ids']
+    if tag not in ids:
+        ids[tag] = len(doc['tags']['list'])
+        doc['tags']['list'].append((tag,) + parse_tag(tag))
+    return ids[tag]
+
+
+def add_tokens(doc, txt):
+    '''Appends the tokens of the string to the document (the string is stored as new segment).'''
+
+    segment = len(doc['segments'])
+    doc['segments'].append(txt)
+    kinds, refs, starts, ends = doc['kinds'], doc['refs'], doc['starts'], doc['ends']
+    tags = doc['tags']['list']
+    end = 0
+    for match in tag_pattern.finditer(txt):
+        start = match.start()
+        if start > end:
+            kinds.append(TEXT)
+            refs.append(segment)
+            starts.append(end)
+            ends.append(start)
+        id = tag_id(doc, match[0])
+        kinds.append(tags[id][1])
+        refs.append(id)
+        starts.append(0)
+        ends.append(0)
+        end = match.end()
+    if len(txt) > end:
+        kinds.append(TEXT)
+        refs.append(segment)
+        starts.append(end)
+        ends.append(len(txt))
+
+
+def tokenize(txt):
+    '''Returns the document of the string.'''
+
+    doc = new_document([], {'list': [], 'ids': {}})
+    add_tokens(doc, txt)
+    return doc
+
+
+def to_string(doc):
+    '''Returns the document as string.'''
+
+    segments, tags = doc['segments'], doc['tags']['list']
+    parts = []
+    for kind, ref, start, end in zip(doc['kinds'], doc['refs'], doc['starts'], doc['ends']):
+        if kind == TEXT:
+            parts.append(segments[ref][start:end])
+        else:
+            parts.append(tags[ref][0])
+    return ''.join(parts)
+
+
+# --- Access ---
+
+def size(doc):
+    '''Returns the number of tokens.'''
+
+    return len(doc['kinds'])
+
+
+def text(doc, i):
+    '''Returns the text of the token i ('' for tags).'''
+
+    if doc['kinds'][i] != TEXT:
+        return ''
+    return doc['segments'][doc['refs'][i]][doc['starts'][i]:doc['ends'][i]]
+
+
+def tag(doc, i):
+    '''Returns the tag string of the token i (None for text).'''
+
+    if doc['kinds'][i] == TEXT:
+        return None
+    return doc['tags']['list'][doc['refs'][i]][0]
+
+
+def name(doc, i):
+    '''Returns the element name of the tag i (None for text).'''
+
+    if doc['kinds'][i] == TEXT:
+        return None
+    return doc['tags']['list'][doc['refs'][i]][2]
+
+
+def attributes(doc, i):
+    '''Returns the attributes of the tag i as written (e.g. ' type="entry"'; None for text).'''
+
+    if doc['kinds'][i] == TEXT:
+        return None
+    return doc['tags']['list'][doc['refs'][i]][3]
+
+
+def find_tags(doc, tags):
+    '''Returns the positions of the tokens equal to one of the tag strings (e.g. ['<p>', '</p>']).'''
+
+    ids = {doc['tags']['ids'][tag] for tag in tags if tag in doc['tags']['ids']}
+    return [i for i, (kind, ref) in enumerate(zip(doc['kinds'], doc['refs'])) if kind != TEXT and ref in ids]
+
+
+def find_text(doc, pattern):
+    '''Yields (position, match) for every match of the compiled pattern in the text tokens (matched as in sub_text(): the offsets of the match are
+       relative to the text of the token).'''
+
+    segments = doc['segments']
+    for i, (kind, ref, start, end) in enumerate(zip(doc['kinds'], doc['refs'], doc['starts'], doc['ends'])):
+        if kind == TEXT:
+            for match in pattern.finditer(segments[ref][start:end]):
+                yield i, match
+
+
+# --- Edits ---
+
+def copy_tokens(new, doc, first, last):
+    '''Appends the tokens first to last - 1 of 'doc' to 'new' (array slices, no loop over the tokens).'''
+
+    for key in ('kinds', 'refs', 'starts', 'ends'):
+        new[key].extend(doc[key][first:last])
+
+
+def replace_tokens(doc, replacements):
+    '''
+    Returns the document with the replacements: list of (position, string, replace) in ascending order of the positions.
+    The tokens of the string (may contain markup) replace the token at the position (replace = True) or are inserted in front of it.
+    '''
+
+    new = new_document(doc['segments'], doc['tags'])
+    first = 0
+    for position, string, replace in replacements:
+        copy_tokens(new, doc, first, position)
+        if string:
+            add_tokens(new, string)
+        first = position + 1 if replace else position
+    copy_tokens(new, doc, first, size(doc))
+    return new
+
+
+def remove_tags(doc, tags):
+    '''Returns the document without the tokens equal to one of the tag strings (the content of the elements is kept).'''
+
+    return replace_tokens(doc, [(i, '', True) for i in find_tags(doc, tags)])
+
+
+def insert(doc, insertions):
+    '''Returns the document with the strings inserted. 'insertions': dictionary position -> string inserted in front of the token
+       (position size(doc): at the end). The strings may contain markup.
+    '''
+
+    return replace_tokens(doc, [(i, insertions[i], False) for i in sorted(insertions)])
+
+
+def wrap(doc, spans, start_tag):
+    '''Returns the document with the tokens of every span (first, last) enclosed in the element of 'start_tag' (e.g. '<cit type="translationEquivalent">').'''
+
+    end_tag = '</' + parse_tag(start_tag)[1] + '>'
+    insertions = {}
+    for first, last in spans:
+        insertions[first] = insertions.get(first, '') + start_tag
+        insertions[last + 1] = end_tag + insertions.get(last + 1, '')
+    return insert(doc, insertions)
+
+
+def sub_text(doc, pattern, repl):
+    '''Returns the document with re.sub(pattern, repl) applied to the text of every text token (matched as in find_text()). The replacement may contain markup.'''
+
+    replacements = []
+    segments = doc['segments']
+    for i, (kind, ref, start, end) in enumerate(zip(doc['kinds'], doc['refs'], doc['starts'], doc['ends'])):
+        if kind == TEXT:
+            txt = segments[ref][start:end]
+            changed, n = pattern.subn(repl, txt)
+            if n and changed != txt:
+                replacements.append((i, changed, True))
+    return replace_tokens(doc, replacements)
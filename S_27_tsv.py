@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+'''
+SCRIPT 27:
+This script contains the reading and writing of the tab-separated files ('lexis.csv', 'pos.csv', 'languages_norm.csv',
+'languages_cap_norm.csv', 'lexis_tofill.csv', 'pos_tofill.csv', 'languages.csv', 'languages_cap.csv', 'term.csv').
+A table is a dictionary: column -> list of values, the columns in the order of the file.
+The files are read and written with the csv module of the standard library, the format is the one of pandas (read_csv(), to_csv()):
+    - reading: empty cells are None, blank lines are skipped, a column without name is called 'Unnamed: <position>'
+    - writing: the first column is the index (without name), None is written as empty cell
+pandas is an optional backend for reading (backend = "pandas"); it is only imported if it is used,
+so that the scripts start without loading pandas.
+
+Used packages:
+    csv (see: https://docs.python.org/3/library/csv.html)
+    pandas, optional (see: https://pandas.pydata.org/pandas-docs/stable/)
+'''
+
+# === Imports ===
+
+import csv
+
+
+# === Parameters ===
+
+# "csv": standard library, "pandas": pandas.read_csv()
+backend = "csv"
+
+delimiter = '\t'
+
+
+# === Functions ===
+
+def read_table_pandas(file):
+    '''Reads the file with pandas and returns the table as read_table() (all values as strings, None for empty cells).'''
+
+    import pandas as pd
+    data = pd.read_csv(file, delimiter=delimiter, dtype=str, keep_default_na=False)
+    return {column: [None if value == '' else value for value in data[column]] for column in data.columns}
+
+
+def read_table(file):
+    '''Reads the file and returns the table: column -> list of values (strings, None for empty cells).'''
+
+    if backend == "pandas":
+        return read_table_pandas(file)
+
+    with open(file, "r", encoding="utf8", newline='') as infile:
+        rows = [row for row in csv.reader(infile, delimiter=delimiter) if row]
+    if not rows:
+        return {}
+
+    header = [name or 'Unnamed: ' + str(i) for i, name in enumerate(rows[0])]
+    table = {}
+    for i, column in enumerate(header):
+        table[column] = [row[i] if i < len(row) and row[i] != '' else None for row in rows[1:]]
+    return table
+
+
+def read_rows(file, index):
+    '''Returns dictionary: value of column 'index' -> row (dictionary: column -> value) of the first row with that value.'''
+
+    table = read_table(file)
+    columns = list(table)
+    rows = {}
+    for values in zip(*table.values()):
+        row = dict(zip(columns, values))
+        rows.setdefault(row[index], row)
+    return rows
+
+
+def as_read(table, index=None):
+    '''Returns the table as read_table() returns it from the file written by write_table() (for the store of S_29):
+       the index as column 'Unnamed: 0', the values as strings, None for empty cells.'''
+
+    columns = list(table)
+    length = len(table[columns[0]]) if columns else 0
+    if index is None:
+        index = range(length)
+
+    read = {}
+    for name, values in [('Unnamed: 0', index)] + list(table.items()):
+        read[name] = [None if value is None or str(value) == '' else str(value) for value in values]
+    return read
+
+
+def write_table(file, table, index=None):
+    '''Writes the table into the file, the first column is the index: list of row names (default: 0, 1, 2, ...).'''
+
+    columns = list(table)
+    length = len(table[columns[0]]) if columns else 0
+    if index is None:
+        index = range(length)
+
+    with open(file, "w", encoding="utf-8", newline='') as outfile:
+        writer = csv.writer(outfile, delimiter=delimiter, lineterminator='\n')
+        writer.writerow([''] + columns)
+        writer.writerows(zip(index, *table.values()))
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+'''
+SCRIPT 28:
+This script contains the registry of the stages (scripts 02-16) run by script 00.
+Every stage is listed with its declared inputs and outputs:
+    - args: arguments of the stage function, in their order: names of parameters of script 00 (e.g. 'lexis_csv')
+      or of results of earlier stages ('tei': the TEI string of scripts 03-12, 'root': the tree of script 15)
+    - result: name under which the returned value is passed to the later stages (None: nothing returned)
+    - reads, writes: files read and written by the stage (names of parameters of script 00 or file names; used by the checkpoint cache of S_20)
+The modules are imported when their stage is run, so a partial run (e.g. scripts 08-12) only loads the scripts it needs.
+If a range starts behind the stage producing 'tei' or 'root', it is read from 'markup_file'.
+A result is released as soon as no later stage of the range uses it. The TEI string is saved to 'markup_file' at that point
+only if no stage of the range has taken it after it was produced: the range stops before script 15
+(read by the next range, e.g. run scripts 03-07, then 08-16) or the streaming mode of script 15 reads the file.
+A full run doesn't write it; resuming a run is left to the checkpoints of S_20.
+select() returns the stages of a range (with the variants of the parallel mode and the streaming mode), run() runs them in their order.
+run_concurrent() runs them as a graph of dependencies built from the declared inputs and outputs (see dependencies()):
+the stages only working on files (scripts 04, 10, 13, 14) run in a pool of processes while the current process runs
+scripts 03-12 on the TEI string, and script 15 starts as soon as its inputs exist.
+
+Used packages:
+    importlib (see: https://docs.python.org/3/library/importlib.html)
+    json (see: https://docs.python.org/3/library/json.html)
+    multiprocessing (see: https://docs.python.org/3/library/multiprocessing.html)
+'''
+
+# === Imports ===
+
+import json
+import queue
+import importlib
+import multiprocessing
+from collections import namedtuple
+import S_01_helpers as helpers
+import S_25_bibliography as bibliography
+import S_29_artifacts as artifacts
+
+
+# === Parameters ===
+
+Stage = namedtuple('Stage', ['name', 'module', 'args', 'result', 'reads', 'writes', 'function', 'key_args', 'cached'],
+                   defaults=('main', None, True))
+
+registry = [
+    Stage('S_02', 'S_02_correct_html', ['fr_html_file', 'fr_corrected_file'], None,
+          ['fr_html_file'], ['fr_corrected_file'], cached=False),
+    Stage('S_03', 'S_03_kluge2validtei', ['htmlfile', 'headerfile'], 'tei',
+          ['htmlfile', 'headerfile'], []),
+    Stage('S_04', 'S_04_create_csv_pos_lexis', ['lexis_file', 'pos_file'], None,
+          ['lexis_file', 'pos_file'], ['lexis_tofill.csv', 'pos_tofill.csv']),
+    Stage('S_05', 'S_05_mark_entry_head', ['tei', 'lexis_csv', 'pos_csv'], 'tei',
+          ['lexis_csv', 'pos_csv'], []),
+    Stage('S_06', 'S_06_mark_bibl', ['tei'], 'tei',
+          [], []),
+    Stage('S_07', 'S_07_mark_lang', ['tei', 'lang_file'], 'tei',
+          ['lang_file'], ['languages.csv', 'languages_cap.csv']),
+    Stage('S_08', 'S_08_mark_etym', ['tei', 'pos_csv'], 'tei',
+          ['pos_csv'], []),
+    Stage('S_09', 'S_09_mark_translation_addition', ['tei'], 'tei',
+          [], []),
+    Stage('S_10', 'S_10_mark_term_chapter', ['term_file', 'term_header', 'reg_file'], None,
+          ['term_file', 'term_header', 'reg_file'], ['terminology.xml', 'term.csv']),
+    Stage('S_11', 'S_11_mark_term', ['tei', 'reg_file'], 'tei',
+          ['reg_file'], ['term.csv']),
+    Stage('S_12', 'S_12_finish_markup', ['tei', 'section'], 'tei',
+          [], []),
+    Stage('S_13', 'S_13_mark_literature_list', ['literature_file', 'literature_header', 'literature_xml'], None,
+          ['literature_file', 'literature_header'], ['literature_xml', 'literature_index']),
+    Stage('S_14', 'S_14_mark_periodicals_list', ['periodicals_file', 'periodicals_header', 'periodicals_xml'], None,
+          ['periodicals_file', 'periodicals_header'], ['periodicals_xml', 'periodicals_index']),
+    Stage('S_15', 'S_15_add_attributes', ['tei', 'periodicals_xml', 'literature_xml', 'lang_csv', 'lang_cap_csv'], 'root',
+          ['periodicals_xml', 'literature_xml', 'lang_csv', 'lang_cap_csv'], []),
+    Stage('S_16', 'S_16_sort_attributes', ['root', 'output_file'], None,
+          [], ['output_file']),
+]
+
+# parallel mode: scripts 05-09, 11 and 12 are replaced by script 17 (run behind script 10)
+parallel_stage = Stage('S_17', 'S_17_parallel_markup',
+                       ['tei', 'lexis_csv', 'pos_csv', 'lang_file', 'reg_file', 'workers', 'chunksize', 'section'], 'tei',
+                       ['lexis_csv', 'pos_csv', 'lang_file', 'reg_file'], ['languages.csv', 'languages_cap.csv', 'term.csv'],
+                       key_args=['tei', 'lexis_csv', 'pos_csv', 'lang_file', 'reg_file', 'section'])
+parallel_replaced = ['S_05', 'S_06', 'S_07', 'S_08', 'S_09', 'S_11', 'S_12']
+
+# streaming mode: scripts 15 and 16 are replaced by S_15.stream_main() (reads the TEI string saved to 'markup_file', see run())
+stream_stage = Stage('S_15-16', 'S_15_add_attributes',
+                     ['markup_file', 'output_file', 'periodicals_xml', 'literature_xml', 'lang_csv', 'lang_cap_csv'], None,
+                     ['markup_file', 'periodicals_xml', 'literature_xml', 'lang_csv', 'lang_cap_csv'], ['output_file'],
+                     function='stream_main', cached=False)
+stream_replaced = ['S_15', 'S_16']
+
+# options of script 00 that can be set in a configuration file as well
+options = ['cache', 'parallel', 'stream', 'concurrent', 'stage_workers', 'persist']
+
+# default range (script 02 is run seperately)
+first_stage = 'S_03'
+last_stage = 'S_16'
+
+# results read from 'markup_file' if they are not produced in the range: name -> function reading the file
+loaders = {'tei': helpers.read_file, 'root': helpers.get_root}
+
+# results saved to 'markup_file' when they are released: name -> function saving the result
+savers = {'tei': helpers.save_file}
+
+# parameters following another one, not set in a configuration file: name -> parameter (the index file is named after the list, see S_25.index_file())
+derived = {'literature_index': 'literature_xml', 'periodicals_index': 'periodicals_xml'}
+
+# names of the parameters of script 00 used by the stages
+parameters = sorted({name for stage in registry + [parallel_stage, stream_stage]
+                     for name in stage.args + stage.reads + stage.writes
+                     if name not in loaders and '.' not in name})
+
+
+# === Functions ===
+
+def select(first=None, last=None, parallel=False, stream=False):
+    '''
+    Returns the stages from 'first' to 'last' (names, e.g. 'S_08'; default: 'first_stage' to 'last_stage').
+    parallel: scripts 05-12 are replaced by script 17 if all of them are in the range,
+    stream: scripts 15 and 16 are replaced by the streaming mode if both are in the range.
+    '''
+
+    names = [stage.name for stage in registry]
+    for name in (first, last):
+        if name is not None and name not in names:
+            raise ValueError('unknown stage: ' + name + ' (stages: ' + ', '.join(names) + ')')
+    start = names.index(first or first_stage)
+    end = names.index(last or last_stage)
+    if start > end:
+        raise ValueError('stage ' + names[start] + ' comes after stage ' + names[end])
+    stages = registry[start:end + 1]
+    selected = [stage.name for stage in stages]
+
+    if parallel and all(name in selected for name in parallel_replaced):
+        stages = [stage for stage in stages if stage.name not in parallel_replaced]
+        position = [stage.name for stage in stages].index('S_10') + 1
+        stages.insert(position, parallel_stage)
+    if stream and all(name in selected for name in stream_replaced):
+        position = [stage.name for stage in stages].index(stream_replaced[0])
+        stages = [stage for stage in stages if stage.name not in stream_replaced]
+        stages.insert(position, stream_stage)
+    return stages
+
+
+def read_config(file):
+    '''
+    Reads a configuration file (JSON object: name of a parameter of script 00 -> value) and returns it as dictionary.
+    The parameters of 'derived' are added if the parameter they follow is set (e.g. 'literature_index' for 'literature_xml').
+    '''
+
+    with open(file, "r", encoding="utf8") as infile:
+        config = json.load(infile)
+    unknown = sorted(set(config) - (set(parameters) - set(derived)) - set(options))
+    if unknown:
+        raise ValueError('unknown parameters in ' + file + ': ' + ', '.join(unknown))
+    for name, source in derived.items():
+        if source in config:
+            config[name] = bibliography.index_file(config[source])
+    return config
+
+
+def value(state, name):
+    '''Returns the value of a parameter or result; results not produced in the range are read from 'markup_file'.'''
+
+    if name in state:
+        return state[name]
+    if name in loaders:
+        print("--- " + name + " read from " + state['markup_file'])
+        state[name] = loaders[name](state['markup_file'])
+        return state[name]
+    raise KeyError('no value for ' + name)
+
+
+def files(state, names):
+    '''Returns the file names of the parameters (names that aren't parameters are file names).'''
+
+    return [state.get(name, name) for name in names]
+
+
+def run_stage(stage, args, state, call=None):
+    '''Runs one stage with the resolved arguments (the module is imported here, in a worker process of run_concurrent() as well).'''
+
+    function = getattr(importlib.import_module(stage.module), stage.function)
+    if call is None or not stage.cached:
+        return function(*args)
+    key_args = None if stage.key_args is None else [args[stage.args.index(name)] for name in stage.key_args]
+    return call(function, args, files(state, stage.reads), files(state, stage.writes), key_args)
+
+
+def run_pool_stage(stage, args, state, call=None):
+    '''Runs one stage in a worker process of run_concurrent(); the files put into the store of S_29 are written before the stage is done.'''
+
+    result = run_stage(stage, args, state, call)
+    artifacts.flush()
+    return result
+
+
+def release(state, produced, remaining):
+    '''Releases the results no stage of 'remaining' uses. 'produced': results produced in the range and not taken by a later stage yet,
+       these are saved to 'markup_file' first (see 'savers').'''
+
+    used = {name for stage in remaining for name in stage.args}
+    for name in loaders:
+        if name in state and name not in used:
+            if name in produced and name in savers:
+                savers[name](state[name], state['markup_file'])
+                print("--- " + name + " saved to " + state['markup_file'])
+            del state[name]
+
+
+def run(stages, config, call=None):
+    '''
+    Runs the stages in their order with the parameters of 'config' (dictionary) and returns the state (parameters and results).
+    'call' runs a stage function (arguments: function, args, reads, writes, key_args; e.g. the checkpoint cache of script 00),
+    the stages with cached = False and all stages without 'call' are run directly.
+    '''
+
+    state = dict(config)
+    produced = set()
+    for position, stage in enumerate(stages):
+        args = [value(state, name) for name in stage.args]
+        result = run_stage(stage, args, state, call)
+        produced.difference_update(stage.args)
+        if stage.result is not None:
+            state[stage.result] = result
+            produced.add(stage.result)
+        del args, result
+        release(state, produced, stages[position + 1:])
+    artifacts.flush()
+    return state
+
+
+def dependencies(stages, config):
+    '''
+    Returns dictionary: name of a stage -> set of the names of the earlier stages it has to wait for:
+    the stages producing its arguments or writing the files it reads, and the stages reading or writing the files it writes.
+    A stage producing a result of 'savers' also writes 'markup_file' (see release()).
+    Stages already waited for by another stage of the set are left out (e.g. S_06 waits for S_05, not for S_03).
+    '''
+
+    outputs, inputs = {}, {}
+    for stage in stages:
+        writes = set(files(config, stage.writes))
+        if stage.result in savers:
+            writes.add(config['markup_file'])
+        outputs[stage.name] = writes
+        inputs[stage.name] = set(files(config, stage.reads))
+
+    graph, before = {}, {}
+    for position, stage in enumerate(stages):
+        direct = set()
+        for earlier in stages[:position]:
+            if (earlier.result is not None and earlier.result in stage.args
+                    or outputs[earlier.name] & (inputs[stage.name] | outputs[stage.name])
+                    or inputs[earlier.name] & outputs[stage.name]):
+                direct.add(earlier.name)
+        # before: all stages run before the stage (transitive)
+        before[stage.name] = direct.union(*[before[name] for name in direct])
+        graph[stage.name] = direct - set().union(*[before[name] for name in direct])
+    return graph
+
+
+def in_pool(stage):
+    '''True if the stage can run in a worker process: it neither takes nor returns a result (only files).'''
+
+    return stage.result is None and not any(name in loaders for name in stage.args)
+
+
+def finish_pool_stage(running, name, state, done):
+    '''Marks a stage of the pool as done (its error is raised by get()); the files it has written replace the store of the current process (see S_29).'''
+
+    stage, result = running.pop(name)
+    result.get()
+    artifacts.discard(files(state, stage.writes))
+    done.add(name)
+
+
+def run_concurrent(stages, config, call=None, workers=None):
+    '''
+    Runs the stages in the order of their dependencies (see dependencies()) and returns the state as run().
+    The stages only working on files (e.g. scripts 04, 10, 13, 14) run in a pool of 'workers' processes,
+    the stages passing on the TEI string run in the current process; every stage starts as soon as the stages it waits for are done.
+    'call' has to be a function of a module (it is passed to the worker processes).
+    '''
+
+    graph = dependencies(stages, config)
+    state = dict(config)
+    produced = set()
+    remaining = list(stages)
+    done = set()
+    running = {}
+    finished = queue.Queue()
+
+    with multiprocessing.Pool(workers) as pool:
+        while remaining or running:
+            ready = [stage for stage in remaining if graph[stage.name] <= done]
+            for stage in ready:
+                if in_pool(stage):
+                    args = [value(state, name) for name in stage.args]
+                    # files of the current process the stage reads or writes are written first (see S_29)
+                    artifacts.wait(files(state, stage.reads + stage.writes))
+                    running[stage.name] = (stage, pool.apply_async(run_pool_stage, (stage, args, state, call),
+                                                                   callback=lambda result, name=stage.name: finished.put(name),
+                                                                   error_callback=lambda error, name=stage.name: finished.put(name)))
+                    remaining.remove(stage)
+
+            local = [stage for stage in ready if not in_pool(stage)]
+            if local:
+                stage = local[0]
+                remaining.remove(stage)
+                args = [value(state, name) for name in stage.args]
+                result = run_stage(stage, args, state, call)
+                produced.difference_update(stage.args)
+                if stage.result is not None:
+                    state[stage.result] = result
+                    produced.add(stage.result)
+                del args, result
+                release(state, produced, remaining)
+                done.add(stage.name)
+            elif running:
+                # waiting for a stage of the pool
+                finish_pool_stage(running, finished.get(), state, done)
+            elif remaining:
+                raise RuntimeError('stages waiting for each other: ' + ', '.join(stage.name for stage in remaining))
+
+            while not finished.empty():
+                finish_pool_stage(running, finished.get(), state, done)
+    artifacts.flush()
+    return state
+
+
+def describe(stages, graph=None):
+    '''Returns the stages as text: name, module, arguments -> result, files written (and the stages waited for, 'graph': see dependencies()).'''
+
+    lines = []
+    for stage in stages:
+        line = '{:<8} {:<34} ({})'.format(stage.name, stage.module + '.' + stage.function, ', '.join(stage.args))
+        if stage.result is not None:
+            line += ' -> ' + stage.result
+        if stage.writes:
+            line += ', writes: ' + ', '.join(stage.writes)
+        if graph is not None and graph[stage.name]:
+            line += ', after: ' + ', '.join(name for name in [earlier.name for earlier in stages] if name in graph[stage.name])
+        lines.append(line)
+    return '\n'.join(lines)
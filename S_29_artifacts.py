@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+'''
+SCRIPT 29:
+This script contains the store of the artifacts passed between the stages: the files written by one stage for a later one
+('languages.csv', 'languages_cap.csv' (script 07), 'terminology.xml', 'term.csv' (scripts 10 and 11),
+'literature.xml', 'periodicals.xml' and their indexes (scripts 13 and 14, read by script 15, see S_25)).
+A stage puts the content of a file into the store as it would be read from the file (string, table of S_27 or index of S_25),
+the readers (helpers.read_file(), S_19.get_table(), S_25.load_index()) take it from the store instead of reading and parsing the file.
+The file is written on a background thread if 'persist' is set, so the stage doesn't wait for the writing.
+wait() waits for the files a stage reads from disk (e.g. hashed by the checkpoint cache of S_20), flush() for all files.
+The files are needed by the checkpoint cache, by stages run in other processes (see S_28.run_concurrent()) and by later runs.
+
+Used packages:
+    threading (see: https://docs.python.org/3/library/threading.html)
+    queue (see: https://docs.python.org/3/library/queue.html)
+'''
+
+# === Imports ===
+
+import os
+import queue
+import atexit
+import threading
+import collections
+
+
+# === Parameters ===
+
+# write the artifacts into files (False: kept in memory only; the checkpoint cache and concurrent stages need the files)
+persist = True
+
+# artifacts of the current process: file -> content
+store = {}
+
+# background writer: queue of (files, function, arguments), thread, number of pending writes per file, first error of a write
+writer = {'queue': None, 'thread': None, 'pending': collections.Counter(), 'condition': threading.Condition(), 'error': None}
+
+
+# === Functions ===
+
+def write_files(jobs):
+    '''Runs the writing functions of the queue one after the other (in the order they were put, see put()).'''
+
+    while True:
+        files, save, args = jobs.get()
+        try:
+            if writer['error'] is None:
+                save(*args)
+        except Exception as error:
+            writer['error'] = error
+        finally:
+            with writer['condition']:
+                writer['pending'].subtract(files)
+                writer['condition'].notify_all()
+            jobs.task_done()
+
+
+def reset_writer():
+    '''Forgets the writer of the parent process (called in a forked process: the thread of the parent doesn't exist in the child).'''
+
+    writer.update({'queue': None, 'thread': None, 'pending': collections.Counter(), 'condition': threading.Condition(), 'error': None})
+
+
+def submit(files, save, *args):
+    '''Runs save(*args) on the background thread; 'files': the files written by it (see wait()).'''
+
+    if writer['thread'] is None:
+        writer['queue'] = queue.Queue()
+        writer['thread'] = threading.Thread(target=write_files, args=(writer['queue'],), daemon=True)
+        writer['thread'].start()
+    with writer['condition']:
+        writer['pending'].update(files)
+    writer['queue'].put((files, save, args))
+
+
+def put(file, content, save, *args):
+    '''
+    Puts the content of 'file' into the store; save(*args) writes the file on the background thread if 'persist' is set
+    (e.g. put("terminology.xml", xml, helpers.save_file, xml, "terminology.xml")).
+    The files are written in the order of the calls, so a file can be written after a file it depends on (e.g. an index after its list).
+    '''
+
+    store[file] = content
+    if persist:
+        submit([file], save, *args)
+
+
+def discard(files):
+    '''Removes the files from the store (e.g. restored from the checkpoint cache or written by another process).'''
+
+    for file in files:
+        store.pop(file, None)
+
+
+def raise_error():
+    '''Raises the error of a write on the background thread (once).'''
+
+    if writer['error'] is not None:
+        error, writer['error'] = writer['error'], None
+        raise error
+
+
+def wait(files):
+    '''Waits until the files are written (only the pending writes of these files, e.g. the files a stage reads).'''
+
+    with writer['condition']:
+        writer['condition'].wait_for(lambda: not any(writer['pending'][file] > 0 for file in files))
+    raise_error()
+
+
+def flush():
+    '''Waits until all writes of the background thread are done.'''
+
+    if writer['queue'] is not None:
+        writer['queue'].join()
+    raise_error()
+
+
+# processes are forked on Unix only (Windows starts them as new interpreters, with a new writer)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reset_writer)
+atexit.register(flush)
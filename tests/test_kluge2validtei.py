@@ -0,0 +1,40 @@
+'''Tests of the chunked conversion of script 03 against the conversion of the whole file.'''
+
+import os
+import re
+import sys
+import random
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import S_03_kluge2validtei as s03
+
+header = '<TEI>\n  <teiHeader/>\n'
+pieces = ['<p class="p1">', '</p>', 'Laden', ' ', '\n', '  ', '<span class="font1">', '</span>', '<sup>', '</sup>',
+          '<br/>', '</body>', '﻿', 'a>b']
+
+
+def convert_whole(html):
+    '''The conversion of the whole file (before the chunks): <head> and </html> removed, <text> added, tags renamed, whitespace deleted.'''
+
+    body = re.sub(r'<!DOCTYPE(.*?)</head>', r'', html, 0, re.DOTALL).replace('</html>', '')
+    xmltei = header + s03.rename_elements('<text>' + body + '</text>\n</TEI>')
+    return re.sub(r'(?<=>)\s+(?=<)', r'', xmltei.replace('﻿', ''))
+
+
+def random_html(r):
+    body = ''.join(r.choice(pieces) for i in range(r.randint(0, 30)))
+    return '<!DOCTYPE html>\n<html>\n<head><title>L</title></head>\n<body>' + body + r.choice(['', '\n', '</html>', '</html>\n'])
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_chunks_as_whole_file(tmp_path, monkeypatch, seed):
+    r = random.Random(seed)
+    htmlfile, headerfile = tmp_path / "kluge.html", tmp_path / "header.txt"
+    headerfile.write_text(header, encoding="utf8")
+    for i in range(100):
+        html = random_html(r)
+        htmlfile.write_text(html, encoding="utf8")
+        monkeypatch.setattr(s03, "chunk_size", r.randint(1, 20))
+        assert ''.join(s03.iter_tei(str(htmlfile), str(headerfile))) == convert_whole(html), repr(html)
@@ -0,0 +1,31 @@
+'''Tests of the markup of script 17: the shards of split_entries() give the same result as the serial run.'''
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import S_06_mark_bibl
+import S_09_mark_translation_addition
+import S_17_parallel_markup
+
+# the bibliography list of the first entry would be closed in the second entry by an unbounded rule (S_06, case 3b)
+two_entries = '<entry><p>Foo. - bar</p></entry><entry><p><hi rendition="font5">Baz</hi></p></entry>'
+
+
+def shards(markup, tei):
+    return ''.join(markup(shard) for shard in S_17_parallel_markup.split_entries(tei))
+
+
+def test_bibl_list_within_entry():
+    assert S_06_mark_bibl.markup(two_entries) == shards(S_06_mark_bibl.markup, two_entries)
+    assert S_06_mark_bibl.markup(two_entries) == two_entries
+
+
+def test_serial_as_shards():
+    texts = [two_entries,
+             '<entry><p>Laden. - <hi rendition="font4">Kluge</hi></p></entry><entry><p>x</p></entry>',
+             '<entry><note type="referencingSection"><p>a</entry><entry><p>b</p></entry>']
+    for tei in texts:
+        for markup in (S_06_mark_bibl.markup, S_09_mark_translation_addition.markup):
+            assert markup(tei) == shards(markup, tei), tei
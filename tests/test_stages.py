@@ -0,0 +1,66 @@
+'''Tests of the stage registry (S_28) run by script 00 on a synthetic corpus (S_22).'''
+
+import os
+import sys
+import json
+import subprocess
+import pytest
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+
+import S_22_synthetic_corpus
+import S_28_stages
+
+
+def run_pipeline(directory, config=None, options=()):
+    '''Runs script 00 in the directory (with a configuration file and command line options if passed).'''
+
+    arguments = [sys.executable, os.path.join(root, "S_00_run_kluge2lex0.py")] + list(options)
+    if config is not None:
+        with open(os.path.join(directory, "config.json"), "w", encoding="utf8") as outfile:
+            json.dump(config, outfile)
+        arguments += ["--config", "config.json"]
+    subprocess.run(arguments, cwd=directory, check=True, stdout=subprocess.DEVNULL)
+
+
+def read(directory, file):
+    with open(os.path.join(directory, file), "r", encoding="utf8") as infile:
+        return infile.read()
+
+
+@pytest.mark.parametrize("cache", [True, False])
+def test_renamed_outputs(tmp_path, cache):
+    default, renamed = tmp_path / "default", tmp_path / "renamed"
+    for directory in (default, renamed):
+        S_22_synthetic_corpus.main(str(directory), 20)
+    run_pipeline(default, {"cache": cache})
+    run_pipeline(renamed, {"cache": cache, "literature_xml": "lit.xml", "periodicals_xml": "per.xml", "output_file": "out.xml"})
+
+    assert read(renamed, "out.xml") == read(default, "kluge_lex0.xml")
+    assert read(renamed, "lit.xml") == read(default, "literature.xml")
+    assert read(renamed, "per.xml") == read(default, "periodicals.xml")
+    assert os.path.exists(renamed / "lit_index.pickle") and os.path.exists(renamed / "per_index.pickle")
+    assert not os.path.exists(renamed / "literature.xml")
+
+
+def test_index_not_configurable(tmp_path):
+    file = tmp_path / "config.json"
+    file.write_text(json.dumps({"literature_index": "index.pickle"}), encoding="utf8")
+    with pytest.raises(ValueError):
+        S_28_stages.read_config(str(file))
+    file.write_text(json.dumps({"literature_xml": "lit.xml"}), encoding="utf8")
+    assert S_28_stages.read_config(str(file))["literature_index"] == "lit_index.pickle"
+
+
+def test_markup_file_only_between_ranges(tmp_path):
+    S_22_synthetic_corpus.main(str(tmp_path), 20)
+    run_pipeline(tmp_path, {"cache": False})
+    assert not os.path.exists(tmp_path / "kluge_markup.xml")
+    full = read(tmp_path, "kluge_lex0.xml")
+
+    os.remove(tmp_path / "kluge_lex0.xml")
+    run_pipeline(tmp_path, {"cache": False}, ["--to", "S_09"])
+    assert os.path.exists(tmp_path / "kluge_markup.xml")
+    run_pipeline(tmp_path, {"cache": False}, ["--from", "S_10"])
+    assert read(tmp_path, "kluge_lex0.xml") == full
@@ -0,0 +1,66 @@
+'''Tests of the token representation of the TEI string (S_26).'''
+
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import S_26_tokens as tokens
+
+txt = '<entry><form>Laden</form> <hi rend="italics">Sm.</hi>ab<mark/></entry>'
+
+
+def found(doc, pattern):
+    return [(i, match.group(), match.start()) for i, match in tokens.find_text(doc, re.compile(pattern))]
+
+
+def test_round_trip():
+    assert tokens.to_string(tokens.tokenize(txt)) == txt
+    assert tokens.to_string(tokens.tokenize('text <a>only')) == 'text <a>only'
+
+
+def test_find_text_on_token_text():
+    doc = tokens.tokenize(txt)
+    assert found(doc, 'a') == [(2, 'a', 1), (8, 'a', 0)]
+    assert found(doc, '^a') == [(8, 'a', 0)]
+    assert found(doc, 'b$') == [(8, 'b', 1)]
+    assert found(doc, '(?<=>)a') == []
+    assert found(doc, 'n </') == []
+
+
+def test_find_text_as_sub_text():
+    doc = tokens.tokenize(txt)
+    for pattern in ['a', '^a', 'b$', '(?<=>)a', r'^\s+$', 'Sm\\.', 'n(?=<)']:
+        changed = tokens.to_string(tokens.sub_text(doc, re.compile(pattern), 'X'))
+        texts = [tokens.text(doc, i) for i in range(tokens.size(doc))]
+        expected = list(texts)
+        for i, match in tokens.find_text(doc, re.compile(pattern)):
+            expected[i] = re.sub(pattern, 'X', texts[i])
+        for i in range(tokens.size(doc)):
+            if not texts[i]:
+                expected[i] = tokens.tag(doc, i)
+        assert changed == ''.join(expected), pattern
+
+
+def test_sub_text_with_markup():
+    doc = tokens.sub_text(tokens.tokenize(txt), re.compile('Laden'), r'<orth>\g<0></orth>')
+    assert tokens.to_string(doc) == txt.replace('Laden', '<orth>Laden</orth>')
+    assert tokens.name(doc, 2) == 'orth'
+
+
+def test_wrap():
+    doc = tokens.tokenize(txt)
+    wrapped = tokens.wrap(doc, [(1, 3), (5, 8)], '<cit type="translationEquivalent">')
+    assert tokens.to_string(wrapped) == ('<entry><cit type="translationEquivalent"><form>Laden</form></cit> '
+                                         '<cit type="translationEquivalent"><hi rend="italics">Sm.</hi>ab</cit><mark/></entry>')
+    # adjacent and nested spans
+    wrapped = tokens.wrap(doc, [(1, 3), (4, 4), (1, 4)], '<seg>')
+    assert tokens.to_string(wrapped) == '<entry><seg><seg><form>Laden</form></seg><seg> </seg></seg><hi rend="italics">Sm.</hi>ab<mark/></entry>'
+
+
+def test_edits_keep_document():
+    doc = tokens.tokenize(txt)
+    assert tokens.to_string(tokens.remove_tags(doc, ['<form>', '</form>'])) == txt.replace('<form>', '').replace('</form>', '')
+    assert tokens.to_string(tokens.insert(doc, {0: '<x/>', tokens.size(doc): '<y/>'})) == '<x/>' + txt + '<y/>'
+    assert tokens.to_string(doc) == txt